@@ -1,13 +1,36 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from typing import Any, AsyncIterator, List, Optional, Union
 
 from pydantic import BaseModel, Field, model_validator
 
+from app.agent.budget import RunBudget
+from app.agent.run_checkpoint import RunCheckpointLog, load_message
+from app.events import (
+    AgentEvent,
+    RunFinished,
+    StateChanged,
+    StepFinished,
+    StepStarted,
+    emit,
+    event_sink,
+)
 from app.llm import LLM
 from app.logger import logger
-from app.sandbox.client import SANDBOX_CLIENT
-from app.schema import ROLE_TYPE, AgentState, Memory, Message
+from app.prompt.budget import WRAP_UP_PROMPT
+from app.schema import (
+    ROLE_TYPE,
+    AgentState,
+    Memory,
+    Message,
+    MessageRecord,
+    as_record,
+)
+from app.session import current_session
+from app.tool.tool_metrics import metrics_agent
+from app.tracing import span
 
 
 class BaseAgent(BaseModel, ABC):
@@ -42,6 +65,17 @@ class BaseAgent(BaseModel, ABC):
 
     duplicate_threshold: int = 2
 
+    # Wall-clock / token / cost limits for a single run (defaults from [budget])
+    budget: Optional[RunBudget] = Field(
+        default_factory=RunBudget.from_settings,
+        description="Per-run budget enforced by the step loop",
+    )
+
+    # Crash-safe resume
+    checkpoint_log: Optional[RunCheckpointLog] = Field(
+        None, description="Append-only log written after every completed step"
+    )
+
     class Config:
         arbitrary_types_allowed = True
         extra = "allow"  # Allow extra fields for flexibility in subclasses
@@ -55,6 +89,17 @@ class BaseAgent(BaseModel, ABC):
             self.memory = Memory()
         return self
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "state":
+            previous = self.__dict__.get("state")
+            if value != previous:
+                emit(
+                    StateChanged,
+                    previous=getattr(previous, "value", str(previous)),
+                    state=getattr(value, "value", str(value)),
+                )
+        super().__setattr__(name, value)
+
     @asynccontextmanager
     async def state_context(self, new_state: AgentState):
         """Context manager for safe agent state transitions.
@@ -100,10 +145,10 @@ class BaseAgent(BaseModel, ABC):
             ValueError: If the role is unsupported.
         """
         message_map = {
-            "user": Message.user_message,
-            "system": Message.system_message,
-            "assistant": Message.assistant_message,
-            "tool": lambda content, **kw: Message.tool_message(content, **kw),
+            "user": MessageRecord.user_message,
+            "system": MessageRecord.system_message,
+            "assistant": MessageRecord.assistant_message,
+            "tool": lambda content, **kw: MessageRecord.tool_message(content, **kw),
         }
 
         if role not in message_map:
@@ -132,26 +177,155 @@ class BaseAgent(BaseModel, ABC):
             self.update_memory("user", request)
 
         results: List[str] = []
-        async with self.state_context(AgentState.RUNNING):
-            while (
-                self.current_step < self.max_steps and self.state != AgentState.FINISHED
+        budget = self.budget if self.budget and self.budget.enabled else None
+        if budget:
+            budget.start()
+        wrapping_up = False
+        with span("agent.run", agent=self.name), metrics_agent(self.name):
+            # The sandbox is cleaned up when the last overlapping run in the
+            # session finishes (sub-agents run inside their parent's run)
+            async with current_session().run_scope(), self.state_context(
+                AgentState.RUNNING
             ):
-                self.current_step += 1
-                logger.info(f"Executing step {self.current_step}/{self.max_steps}")
-                step_result = await self.step()
+                while (
+                    self.current_step < self.max_steps
+                    and self.state != AgentState.FINISHED
+                ):
+                    if wrapping_up:
+                        # The wrap-up step ran and the agent did not finish
+                        self.current_step = 0
+                        self.state = AgentState.IDLE
+                        results.append(
+                            f"Terminated: Run budget spent ({budget.describe()})"
+                        )
+                        break
+                    if budget and budget.nearly_spent():
+                        wrapping_up = True
+                        logger.warning(
+                            f"Run budget nearly spent ({budget.describe()}), "
+                            "giving the agent one step to wrap up"
+                        )
+                        self.update_memory(
+                            "user", WRAP_UP_PROMPT.format(usage=budget.describe())
+                        )
+
+                    self.current_step += 1
+                    logger.info(
+                        f"Executing step {self.current_step}/{self.max_steps}"
+                    )
+                    emit(
+                        StepStarted, step=self.current_step, max_steps=self.max_steps
+                    )
+                    step_start = time.perf_counter()
+                    step_result = await self.step()
+                    emit(
+                        StepFinished,
+                        step=self.current_step,
+                        result=str(step_result),
+                        duration_seconds=round(time.perf_counter() - step_start, 3),
+                    )
+
+                    # Check for stuck state
+                    if self.is_stuck():
+                        self.handle_stuck_state()
+
+                    results.append(f"Step {self.current_step}: {step_result}")
+
+                    if self.checkpoint_log:
+                        self.checkpoint_log.append_step(self)
+
+                if self.current_step >= self.max_steps:
+                    self.current_step = 0
+                    self.state = AgentState.IDLE
+                    results.append(
+                        f"Terminated: Reached max steps ({self.max_steps})"
+                    )
+        return "\n".join(results) if results else "No steps executed"
 
-                # Check for stuck state
-                if self.is_stuck():
-                    self.handle_stuck_state()
+    async def run_stream(
+        self, request: Optional[str] = None
+    ) -> AsyncIterator[AgentEvent]:
+        """Run the agent and yield typed events as they happen.
 
-                results.append(f"Step {self.current_step}: {step_result}")
+        Events cover step start/end, LLM token deltas, tool call start/finish,
+        state changes and usage updates; the last event is `RunFinished` with
+        the same summary `run()` returns. Exceptions raised by the run are
+        re-raised after the events emitted before the failure are delivered.
 
-            if self.current_step >= self.max_steps:
-                self.current_step = 0
-                self.state = AgentState.IDLE
-                results.append(f"Terminated: Reached max steps ({self.max_steps})")
-        await SANDBOX_CLIENT.cleanup()
-        return "\n".join(results) if results else "No steps executed"
+        Args:
+            request: Optional initial user request to process.
+
+        Yields:
+            AgentEvent: Events in the order they were emitted.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def run_with_sink() -> None:
+            # The task runs in a copy of the current context, so the sink
+            # only applies to this run
+            with event_sink(queue.put_nowait):
+                try:
+                    result = await self.run(request)
+                    emit(RunFinished, result=result)
+                finally:
+                    queue.put_nowait(done)
+
+        task = asyncio.create_task(run_with_sink())
+        try:
+            while (event := await queue.get()) is not done:
+                yield event
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+    def checkpoint_state(self) -> dict:
+        """Capture the agent state needed to resume after a crash.
+
+        Memory and the current step are recorded by the checkpoint log itself;
+        subclasses extend this with their own state (tools, design state, ...).
+        """
+        agent_state = {
+            "total_input_tokens": self.llm.total_input_tokens,
+            "total_completion_tokens": self.llm.total_completion_tokens,
+        }
+        # Only record the step prompt once it diverges (e.g. after stuck handling)
+        if self.next_step_prompt != type(self).model_fields["next_step_prompt"].default:
+            agent_state["next_step_prompt"] = self.next_step_prompt
+        return {"finished": self.state == AgentState.FINISHED, "agent": agent_state}
+
+    def restore_checkpoint_state(self, snapshot: dict) -> None:
+        """Restore state captured by `checkpoint_state` and the checkpoint log."""
+        self.memory.messages = [load_message(msg) for msg in snapshot.get("memory", [])]
+        self.current_step = snapshot.get("step", 0)
+        self.state = AgentState.IDLE
+
+        agent_state = snapshot.get("agent", {})
+        if "next_step_prompt" in agent_state:
+            self.next_step_prompt = agent_state["next_step_prompt"]
+        self.llm.total_input_tokens = agent_state.get(
+            "total_input_tokens", self.llm.total_input_tokens
+        )
+        self.llm.total_completion_tokens = agent_state.get(
+            "total_completion_tokens", self.llm.total_completion_tokens
+        )
+
+    def reset(self) -> None:
+        """Return the agent to a fresh state so it can serve a new request.
+
+        Memory, step counter, state and step prompt are reset; long-lived
+        resources (LLM client, tool instances, MCP connections) are kept.
+        """
+        self.memory = Memory(max_messages=self.memory.max_messages)
+        self.state = AgentState.IDLE
+        self.current_step = 0
+        self.next_step_prompt = type(self).model_fields["next_step_prompt"].default
+        self.checkpoint_log = None
 
     @abstractmethod
     async def step(self) -> str:
@@ -186,11 +360,11 @@ class BaseAgent(BaseModel, ABC):
         return duplicate_count >= self.duplicate_threshold
 
     @property
-    def messages(self) -> List[Message]:
+    def messages(self) -> List[MessageRecord]:
         """Retrieve a list of messages from the agent's memory."""
         return self.memory.messages
 
     @messages.setter
-    def messages(self, value: List[Message]):
+    def messages(self, value: List[Union[MessageRecord, Message]]):
         """Set the list of messages in the agent's memory."""
-        self.memory.messages = value
+        self.memory.messages = [as_record(message) for message in value]
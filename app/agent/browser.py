@@ -38,7 +38,9 @@ class BrowserAgent(ToolCallAgent):
 
     # Auto 설정으로 도구 사용과 자유 형식 응답 모두 허용
     tool_choices: ToolChoice = ToolChoice.AUTO
-    special_tool_names: list[str] = Field(default_factory=lambda: [Terminate().name])
+    special_tool_names: list[str] = Field(
+        default_factory=lambda: [Terminate.tool_name()]
+    )
 
     browser_context_helper: Optional[BrowserContextHelper] = None
 
@@ -9,7 +9,7 @@ from typing import TYPE_CHECKING, Optional
 
 from app.logger import logger
 from app.prompt.browser import NEXT_STEP_PROMPT
-from app.schema import Message
+from app.schema import MessageRecord
 from app.tool import BrowserUseTool
 
 if TYPE_CHECKING:
@@ -42,7 +42,7 @@ class BrowserContextHelper:
         Returns:
             브라우저 상태 딕셔너리 또는 None (실패 시)
         """
-        browser_tool = self.agent.available_tools.get_tool(BrowserUseTool().name)
+        browser_tool = self.agent.available_tools.get_tool(BrowserUseTool.tool_name())
         
         if not browser_tool or not hasattr(browser_tool, "get_current_state"):
             logger.warning("BrowserUseTool not found or doesn't have get_current_state")
@@ -90,10 +90,12 @@ class BrowserContextHelper:
                 content_below_info = f" ({pixels_below} pixels)"
 
             if self._current_base64_image:
-                image_message = Message.user_message(
+                image_message = MessageRecord.user_message(
                     content="Current browser screenshot:",
                     base64_image=self._current_base64_image,
                 )
+                # 이전 스크린샷은 요청에서 한 줄 요약으로 대체
+                image_message.supersession_key = "browser:screenshot"
                 self.agent.memory.add_message(image_message)
                 self._current_base64_image = None  # 이미지 사용 후 초기화
 
@@ -107,6 +109,6 @@ class BrowserContextHelper:
 
     async def cleanup_browser(self) -> None:
         """브라우저 리소스를 정리합니다."""
-        browser_tool = self.agent.available_tools.get_tool(BrowserUseTool().name)
+        browser_tool = self.agent.available_tools.get_tool(BrowserUseTool.tool_name())
         if browser_tool and hasattr(browser_tool, "cleanup"):
             await browser_tool.cleanup()
@@ -0,0 +1,139 @@
+"""
+Run Budget - 실행 예산 (시간/토큰/비용)
+=======================================
+`max_steps` 외에 실행 한 번에 쓸 수 있는 벽시계 시간, 총 토큰, 비용 상한을 둡니다.
+
+- 예산은 `BaseAgent.run` 시작 시점의 사용량을 기준으로 측정 (풀에서 재사용되는 에이전트도 실행 단위로 집계)
+- 토큰/비용은 현재 세션의 모든 LLM 인스턴스 합계 (비전 모델 등 보조 LLM 포함)
+- 비용 예산은 `[llm]`에 `input_cost_per_million`/`output_cost_per_million`이 설정된 경우에만 적용
+- 어느 예산이든 `wrap_up_at` 비율에 도달하면 에이전트에게 마무리 스텝을 한 번 주고,
+  그 스텝에서도 끝내지 못하면 실행을 종료
+
+설정 (config.toml):
+    [budget]
+    max_seconds = 900
+    max_tokens = 500000
+    max_cost = 2.0
+    wrap_up_at = 0.9
+"""
+
+import time
+from typing import Dict, Optional
+
+from app.config import BudgetSettings, config
+from app.logger import logger
+from app.session import current_session
+
+
+class RunBudget:
+    """실행 한 번에 대한 시간/토큰/비용 예산.
+
+    Args:
+        max_seconds: 벽시계 시간 상한(초)
+        max_tokens: 입력 + 출력 토큰 상한
+        max_cost: 비용 상한 (LLM 토큰 가격 설정 필요)
+        wrap_up_at: 마무리 스텝을 시작할 예산 사용 비율 (0~1)
+    """
+
+    def __init__(
+        self,
+        max_seconds: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        wrap_up_at: float = 0.9,
+    ):
+        if not 0 < wrap_up_at <= 1:
+            raise ValueError("wrap_up_at must be in (0, 1]")
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.wrap_up_at = wrap_up_at
+
+        self._started_at = time.perf_counter()
+        self._base_tokens = 0
+        self._base_cost = 0.0
+        self._cost_warning_logged = False
+
+    @classmethod
+    def from_settings(cls, settings: Optional[BudgetSettings] = None) -> "RunBudget":
+        settings = settings or config.budget_config
+        return cls(
+            max_seconds=settings.max_seconds,
+            max_tokens=settings.max_tokens,
+            max_cost=settings.max_cost,
+            wrap_up_at=settings.wrap_up_at,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return any(
+            limit is not None
+            for limit in (self.max_seconds, self.max_tokens, self.max_cost)
+        )
+
+    def start(self) -> None:
+        """현재 사용량을 기준점으로 측정을 시작합니다."""
+        self._started_at = time.perf_counter()
+        self._base_tokens = self._session_tokens()
+        self._base_cost = self._session_cost()
+
+    @staticmethod
+    def _session_tokens() -> int:
+        return current_session().token_usage["total_tokens"]
+
+    @staticmethod
+    def _session_cost() -> float:
+        return sum(
+            llm.total_cost for llm in current_session().llm_instances.values()
+        )
+
+    def _cost_tracked(self) -> bool:
+        priced = any(
+            llm.is_priced for llm in current_session().llm_instances.values()
+        )
+        if not priced and not self._cost_warning_logged:
+            logger.warning(
+                "max_cost budget is set but no LLM has token prices configured; "
+                "the cost budget is ignored"
+            )
+            self._cost_warning_logged = True
+        return priced
+
+    def usage(self) -> Dict[str, float]:
+        """실행 시작 이후 사용한 시간/토큰/비용."""
+        return {
+            "seconds": time.perf_counter() - self._started_at,
+            "tokens": self._session_tokens() - self._base_tokens,
+            "cost": self._session_cost() - self._base_cost,
+        }
+
+    def fractions(self) -> Dict[str, float]:
+        """설정된 예산별 사용 비율."""
+        used = self.usage()
+        fractions = {}
+        if self.max_seconds is not None:
+            fractions["seconds"] = used["seconds"] / self.max_seconds
+        if self.max_tokens is not None:
+            fractions["tokens"] = used["tokens"] / self.max_tokens
+        if self.max_cost is not None and self._cost_tracked():
+            fractions["cost"] = used["cost"] / self.max_cost
+        return fractions
+
+    def fraction_used(self) -> float:
+        """가장 많이 소진된 예산의 사용 비율."""
+        return max(self.fractions().values(), default=0.0)
+
+    def nearly_spent(self) -> bool:
+        return self.fraction_used() >= self.wrap_up_at
+
+    def describe(self) -> str:
+        """로그/결과에 남길 사용량 요약 (예: "812s/900s, 41203/500000 tokens")."""
+        used = self.usage()
+        parts = []
+        if self.max_seconds is not None:
+            parts.append(f"{used['seconds']:.0f}s/{self.max_seconds:g}s")
+        if self.max_tokens is not None:
+            parts.append(f"{used['tokens']}/{self.max_tokens} tokens")
+        if self.max_cost is not None:
+            parts.append(f"${used['cost']:.4f}/${self.max_cost:g}")
+        return ", ".join(parts)
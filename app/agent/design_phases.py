@@ -97,6 +97,28 @@ class PhaseDesign:
             self.modifications.append(f"[{self.modified_at.strftime('%H:%M')}] {reason}")
         self.confirmed = False
 
+    def to_dict(self) -> Dict[str, Any]:
+        """직렬화 가능한 딕셔너리로 변환합니다."""
+        return {
+            "phase": self.phase.value,
+            "content": self.content,
+            "confirmed": self.confirmed,
+            "modified_at": self.modified_at.isoformat() if self.modified_at else None,
+            "modifications": self.modifications,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PhaseDesign":
+        """`to_dict` 결과로부터 복원합니다."""
+        modified_at = data.get("modified_at")
+        return cls(
+            phase=DesignPhase(data["phase"]),
+            content=data.get("content", {}),
+            confirmed=data.get("confirmed", False),
+            modified_at=datetime.fromisoformat(modified_at) if modified_at else None,
+            modifications=data.get("modifications", []),
+        )
+
 
 @dataclass
 class DesignState:
@@ -153,6 +175,28 @@ class DesignState:
             },
         }
 
+    def to_dict(self) -> Dict[str, Any]:
+        """체크포인트 저장을 위한 직렬화 가능한 딕셔너리로 변환합니다."""
+        return {
+            "current_phase": self.current_phase.value,
+            "phases": [design.to_dict() for design in self.phases.values()],
+            "project_name": self.project_name,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DesignState":
+        """`to_dict` 결과로부터 설계 상태를 복원합니다."""
+        phases = [PhaseDesign.from_dict(item) for item in data.get("phases", [])]
+        return cls(
+            current_phase=DesignPhase(data.get("current_phase", DesignPhase.REQUIREMENTS)),
+            phases={design.phase: design for design in phases},
+            project_name=data.get("project_name", ""),
+            created_at=datetime.fromisoformat(data["created_at"])
+            if data.get("created_at")
+            else datetime.now(),
+        )
+
     def is_complete(self) -> bool:
         """모든 필수 단계가 완료되었는지 확인합니다."""
         required_phases = [
@@ -10,7 +10,7 @@ Interactive Agent (인터랙티브 에이전트)
 - 최종 Y/N 확인
 """
 
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import Field, model_validator
 
@@ -22,7 +22,7 @@ from app.agent.toolcall import ToolCallAgent
 from app.config import config
 from app.logger import logger
 from app.prompt.interactive_prompt import SYSTEM_PROMPT, NEXT_STEP_PROMPT, CHECKPOINT_MESSAGES
-from app.tool import PlanningTool, Terminate, ToolCollection
+from app.tool import PlanningTool, ReadBlob, Terminate, ToolCollection
 from app.tool.ask_human import AskHuman
 from app.tool.browser_use_tool import BrowserUseTool
 from app.tool.context_packager import ContextPackager
@@ -30,6 +30,35 @@ from app.tool.design_document import DesignDocumentTool
 from app.tool.mcp import MCPClients
 from app.tool.python_execute import PythonExecute
 from app.tool.str_replace_editor import StrReplaceEditor
+from app.tool.tool_router import ToolRouter
+from app.utils.archival_memory import ArchivalMemory
+
+
+# 설계 단계별로 항상 제공할 도구
+PHASE_TOOLS: Dict[DesignPhase, List[str]] = {
+    DesignPhase.REQUIREMENTS: [
+        PlanningTool.tool_name(), DesignDocumentTool.tool_name()
+    ],
+    DesignPhase.BACKEND: [DesignDocumentTool.tool_name(), StrReplaceEditor.tool_name()],
+    DesignPhase.FRONTEND: [
+        DesignDocumentTool.tool_name(), StrReplaceEditor.tool_name()
+    ],
+    DesignPhase.INTEGRATION: [
+        DesignDocumentTool.tool_name(), ContextPackager.tool_name()
+    ],
+    DesignPhase.REVIEW: [DesignDocumentTool.tool_name(), ContextPackager.tool_name()],
+    DesignPhase.COMPLETE: [ContextPackager.tool_name(), StrReplaceEditor.tool_name()],
+}
+
+# 한국어 대화에서 도구를 찾기 위한 키워드 (도구 설명은 영어)
+TOOL_ALIASES: Dict[str, List[str]] = {
+    PlanningTool.tool_name(): ["계획", "플랜"],
+    DesignDocumentTool.tool_name(): ["설계 문서", "설계서"],
+    ContextPackager.tool_name(): ["패키지", "컨텍스트", "내보내"],
+    PythonExecute.tool_name(): ["파이썬", "스크립트"],
+    BrowserUseTool.tool_name(): ["브라우저", "웹사이트", "사이트", "검색"],
+    StrReplaceEditor.tool_name(): ["파일", "편집"],
+}
 
 
 class InteractiveAgent(MCPMixin, ToolCallAgent):
@@ -59,6 +88,9 @@ class InteractiveAgent(MCPMixin, ToolCallAgent):
     max_observe: int = 15000
     max_steps: int = 50
 
+    # 긴 세션에서 메모리 창 밖으로 밀려난 이전 단계의 내용을 검색해 다시 제공
+    archival_memory: Optional[ArchivalMemory] = Field(default_factory=ArchivalMemory)
+
     # MCP 클라이언트
     mcp_clients: MCPClients = Field(default_factory=MCPClients)
 
@@ -71,13 +103,21 @@ class InteractiveAgent(MCPMixin, ToolCallAgent):
             PythonExecute(),
             BrowserUseTool(),
             StrReplaceEditor(),
+            ReadBlob(),
             AskHuman(),
             Terminate(),
         )
     )
 
-    special_tool_names: list[str] = Field(default_factory=lambda: [Terminate().name])
+    special_tool_names: list[str] = Field(
+        default_factory=lambda: [Terminate.tool_name()]
+    )
     browser_context_helper: Optional[BrowserContextHelper] = None
+
+    # 현재 설계 단계, 최근 사용, 키워드 일치로 매 요청에 보낼 도구를 고름
+    tool_router: Optional[ToolRouter] = Field(
+        default_factory=lambda: ToolRouter(aliases=TOOL_ALIASES)
+    )
     
     # 설계 상태 관리
     design_state: DesignState = Field(default_factory=DesignState)
@@ -115,7 +155,7 @@ class InteractiveAgent(MCPMixin, ToolCallAgent):
         original_prompt = self.next_step_prompt
         recent_messages = self.memory.messages[-3:] if self.memory.messages else []
         browser_in_use = any(
-            tc.function.name == BrowserUseTool().name
+            tc.function.name == BrowserUseTool.tool_name()
             for msg in recent_messages
             if msg.tool_calls
             for tc in msg.tool_calls
@@ -130,6 +170,30 @@ class InteractiveAgent(MCPMixin, ToolCallAgent):
         self.next_step_prompt = original_prompt
         return result
 
+    def reset(self) -> None:
+        """대화 상태와 함께 설계 상태를 초기화합니다."""
+        super().reset()
+        self.design_state = DesignState()
+        self.checkpoint_handler = CheckpointHandler(self.design_state)
+
+    def preferred_tools(self) -> List[str]:
+        """현재 설계 단계의 도구를 라우터에 우선 포함시킵니다."""
+        phase_tools = PHASE_TOOLS.get(self.design_state.current_phase, [])
+        return phase_tools + super().preferred_tools()
+
+    def checkpoint_state(self) -> dict:
+        """실행 체크포인트에 설계 상태를 추가합니다."""
+        state = super().checkpoint_state()
+        state["design_state"] = self.design_state.to_dict()
+        return state
+
+    def restore_checkpoint_state(self, snapshot: dict) -> None:
+        """실행 체크포인트에서 설계 상태까지 복원합니다."""
+        super().restore_checkpoint_state(snapshot)
+        if snapshot.get("design_state"):
+            self.design_state = DesignState.from_dict(snapshot["design_state"])
+            self.checkpoint_handler = CheckpointHandler(self.design_state)
+
     def get_checkpoint_message(self, summary: str = "") -> str:
         """현재 단계에 맞는 체크포인트 메시지를 반환합니다."""
         phase = self.design_state.current_phase
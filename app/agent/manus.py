@@ -13,12 +13,14 @@ from app.agent.mcp_mixin import MCPMixin
 from app.agent.toolcall import ToolCallAgent
 from app.config import config
 from app.prompt.manus import NEXT_STEP_PROMPT, SYSTEM_PROMPT
-from app.tool import PlanningTool, Terminate, ToolCollection
+from app.tool import PlanningTool, ReadBlob, Terminate, ToolCollection
 from app.tool.ask_human import AskHuman
 from app.tool.browser_use_tool import BrowserUseTool
-from app.tool.mcp import MCPClients
+from app.tool.mcp import MCPClients, MCPClientTool
 from app.tool.python_execute import PythonExecute
 from app.tool.str_replace_editor import StrReplaceEditor
+from app.tool.subagents import SpawnSubagents
+from app.tool.tool_router import ToolRouter
 
 
 class Manus(MCPMixin, ToolCallAgent):
@@ -47,20 +49,40 @@ class Manus(MCPMixin, ToolCallAgent):
             PythonExecute(),
             BrowserUseTool(),
             StrReplaceEditor(),
+            ReadBlob(),
+            SpawnSubagents(),
             AskHuman(),
             Terminate(),
         )
     )
 
-    special_tool_names: list[str] = Field(default_factory=lambda: [Terminate().name])
+    special_tool_names: list[str] = Field(
+        default_factory=lambda: [Terminate.tool_name()]
+    )
     browser_context_helper: Optional[BrowserContextHelper] = None
 
+    # MCP 도구가 많아져도 매 요청에는 관련 도구만 보냄 (기본 도구는 항상 포함)
+    tool_router: Optional[ToolRouter] = Field(default_factory=ToolRouter)
+
     @model_validator(mode="after")
     def initialize_helper(self) -> "Manus":
         """기본 컴포넌트를 동기적으로 초기화합니다."""
         self.browser_context_helper = BrowserContextHelper(self)
+        # 하위 에이전트는 MCP 도구를 포함한 부모 도구 모음에서 도구를 고름
+        spawn_tool = self.available_tools.get_tool(SpawnSubagents.tool_name())
+        if spawn_tool is not None and spawn_tool.tools is None:
+            spawn_tool.tools = self.available_tools
         return self
 
+    def pinned_tools(self) -> list[str]:
+        """기본 도구는 항상 보내고, MCP 도구만 라우팅합니다."""
+        builtin = [
+            tool.name
+            for tool in self.available_tools.tools
+            if not isinstance(tool, MCPClientTool)
+        ]
+        return super().pinned_tools() + builtin
+
     @classmethod
     async def create(cls, **kwargs) -> "Manus":
         """Manus 인스턴스를 생성하고 초기화하는 팩토리 메서드."""
@@ -86,7 +108,7 @@ class Manus(MCPMixin, ToolCallAgent):
         original_prompt = self.next_step_prompt
         recent_messages = self.memory.messages[-3:] if self.memory.messages else []
         browser_in_use = any(
-            tc.function.name == BrowserUseTool().name
+            tc.function.name == BrowserUseTool.tool_name()
             for msg in recent_messages
             if msg.tool_calls
             for tc in msg.tool_calls
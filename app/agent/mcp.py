@@ -5,7 +5,7 @@ from pydantic import Field
 from app.agent.toolcall import ToolCallAgent
 from app.logger import logger
 from app.prompt.mcp import MULTIMEDIA_RESPONSE_PROMPT, NEXT_STEP_PROMPT, SYSTEM_PROMPT
-from app.schema import AgentState, Message
+from app.schema import AgentState, MessageRecord
 from app.tool.base import ToolResult
 from app.tool.mcp import MCPClients
 
@@ -69,6 +69,7 @@ class MCPAgent(ToolCallAgent):
 
         # Set available_tools to our MCP instance
         self.available_tools = self.mcp_clients
+        self._attach_background_jobs()
 
         # Store initial tool schemas
         await self._refresh_tools()
@@ -79,7 +80,7 @@ class MCPAgent(ToolCallAgent):
 
         # Add system prompt and available tools information
         self.memory.add_message(
-            Message.system_message(
+            MessageRecord.system_message(
                 f"{self.system_prompt}\n\nAvailable MCP tools: {tools_info}"
             )
         )
@@ -117,12 +118,12 @@ class MCPAgent(ToolCallAgent):
         if added_tools:
             logger.info(f"Added MCP tools: {added_tools}")
             self.memory.add_message(
-                Message.system_message(f"New tools available: {', '.join(added_tools)}")
+                MessageRecord.system_message(f"New tools available: {', '.join(added_tools)}")
             )
         if removed_tools:
             logger.info(f"Removed MCP tools: {removed_tools}")
             self.memory.add_message(
-                Message.system_message(
+                MessageRecord.system_message(
                     f"Tools no longer available: {', '.join(removed_tools)}"
                 )
             )
@@ -159,7 +160,7 @@ class MCPAgent(ToolCallAgent):
         # Handle multimedia responses
         if isinstance(result, ToolResult) and result.base64_image:
             self.memory.add_message(
-                Message.system_message(
+                MessageRecord.system_message(
                     MULTIMEDIA_RESPONSE_PROMPT.format(tool_name=name)
                 )
             )
@@ -0,0 +1,180 @@
+"""
+Agent Pool - 미리 초기화된 에이전트 풀
+======================================
+MCP 서버 연결, 도구 생성, LLM 클라이언트 생성처럼 비용이 큰 초기화를
+요청마다 반복하지 않도록 초기화된 에이전트 N개를 유지합니다.
+
+- 에이전트마다 전용 세션(`app.session.Session`)을 가지며, 대여 중에는 해당 세션이 현재 세션
+- 대여 시 요청별 작업 디렉토리 지정 가능, 토큰 사용량은 요청 단위로 초기화
+- 반납 시 메모리/상태/도구 상태를 초기화하고 MCP 연결과 브라우저는 유지
+- 풀을 닫을 때 모든 에이전트와 세션 리소스를 정리
+
+사용 예:
+    async with AgentPool(Manus.create, size=4) as pool:
+        async with pool.acquire(workspace_root=project_dir) as agent:
+            result = await agent.run(prompt)
+"""
+
+import asyncio
+import copy
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.agent.base import BaseAgent
+from app.logger import logger
+from app.session import Session, session_scope
+
+
+AgentFactory = Callable[[], Awaitable[BaseAgent]]
+
+
+class _PoolSlot:
+    """풀에 속한 에이전트 하나와 그 전용 세션."""
+
+    def __init__(self, agent: BaseAgent, session: Session):
+        self.agent = agent
+        self.session = session
+        self.default_workspace = session.workspace_root
+        # 반납 시 되돌릴 초기 도구 상태
+        self.tool_states: Dict[str, dict] = {}
+        tools = getattr(agent, "available_tools", None)
+        for name, tool in (tools.tool_map.items() if tools else ()):
+            state = tool.dump_state()
+            if state is not None:
+                self.tool_states[name] = copy.deepcopy(state)
+
+
+class AgentPool:
+    """초기화된 에이전트를 대여하고 회수하는 풀.
+
+    Args:
+        agent_factory: 에이전트를 생성·초기화하는 비동기 팩토리 (예: `Manus.create`).
+            각 에이전트의 전용 세션 안에서 호출됩니다.
+        size: 유지할 에이전트 수
+        workspace_root: 대여 시 지정하지 않았을 때 사용할 작업 디렉토리
+    """
+
+    def __init__(
+        self,
+        agent_factory: AgentFactory,
+        size: int = 4,
+        workspace_root: Optional[Path] = None,
+    ):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.agent_factory = agent_factory
+        self.size = size
+        self.workspace_root = workspace_root
+        self._slots: List[_PoolSlot] = []
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._started = False
+        self._start_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AgentPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """에이전트들을 동시에 생성하고 초기화합니다."""
+        async with self._start_lock:
+            if self._started:
+                return
+            results = await asyncio.gather(
+                *(self._create_slot(index) for index in range(self.size)),
+                return_exceptions=True,
+            )
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                # 일부만 생성된 경우 이미 만든 에이전트를 정리하고 첫 오류를 전달
+                for slot in results:
+                    if isinstance(slot, _PoolSlot):
+                        await self._close_slot(slot)
+                raise errors[0]
+            for slot in results:
+                self._slots.append(slot)
+                self._idle.put_nowait(slot)
+            self._started = True
+            logger.info(f"Agent pool ready with {self.size} agents")
+
+    async def _create_slot(self, index: int) -> _PoolSlot:
+        session = Session(
+            session_id=f"pool-{index}", workspace_root=self.workspace_root
+        )
+        try:
+            with session_scope(session):
+                agent = await self.agent_factory()
+        except Exception:
+            await self._close_session(session)
+            raise
+        if hasattr(agent, "cleanup_on_finish"):
+            agent.cleanup_on_finish = False
+        return _PoolSlot(agent, session)
+
+    @asynccontextmanager
+    async def acquire(
+        self, workspace_root: Optional[Path] = None
+    ) -> AsyncIterator[BaseAgent]:
+        """유휴 에이전트를 대여합니다. 블록 안에서는 에이전트의 세션이 현재 세션입니다.
+
+        Args:
+            workspace_root: 이번 요청에서 사용할 작업 디렉토리
+
+        Yields:
+            BaseAgent: 초기화된 상태의 에이전트
+        """
+        await self.start()
+        slot: _PoolSlot = await self._idle.get()
+        slot.session.workspace_root = (
+            Path(workspace_root) if workspace_root else slot.default_workspace
+        )
+        # 요청 단위 토큰 사용량 집계를 위해 카운터 초기화
+        for llm in slot.session.llm_instances.values():
+            llm.total_input_tokens = 0
+            llm.total_completion_tokens = 0
+        try:
+            with session_scope(slot.session):
+                yield slot.agent
+        finally:
+            self._release(slot)
+
+    def _release(self, slot: _PoolSlot) -> None:
+        try:
+            slot.agent.reset()
+            for name, state in slot.tool_states.items():
+                slot.agent.available_tools.get_tool(name).load_state(
+                    copy.deepcopy(state)
+                )
+        except Exception as e:
+            logger.warning(f"Failed to reset pooled agent '{slot.agent.name}': {e}")
+        slot.session.workspace_root = slot.default_workspace
+        slot.session.data.clear()
+        self._idle.put_nowait(slot)
+
+    async def close(self) -> None:
+        """모든 에이전트의 리소스(브라우저, MCP 연결, 샌드박스)를 정리합니다."""
+        for slot in self._slots:
+            await self._close_slot(slot)
+        self._slots.clear()
+        self._idle = asyncio.Queue()
+        self._started = False
+
+    async def _close_slot(self, slot: _PoolSlot) -> None:
+        with session_scope(slot.session):
+            if hasattr(slot.agent, "cleanup"):
+                try:
+                    await slot.agent.cleanup()
+                except Exception as e:
+                    logger.warning(f"Cleanup failed for pooled agent: {e}")
+        await self._close_session(slot.session)
+
+    @staticmethod
+    async def _close_session(session: Session) -> None:
+        with session_scope(session):
+            try:
+                await session.close()
+            except Exception as e:
+                logger.warning(f"Failed to close pooled agent session: {e}")
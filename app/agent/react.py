@@ -6,6 +6,7 @@ from pydantic import Field
 from app.agent.base import BaseAgent
 from app.llm import LLM
 from app.schema import AgentState, Memory
+from app.tracing import span
 
 
 class ReActAgent(BaseAgent, ABC):
@@ -32,7 +33,10 @@ class ReActAgent(BaseAgent, ABC):
 
     async def step(self) -> str:
         """Execute a single step: think and act."""
-        should_act = await self.think()
-        if not should_act:
-            return "Thinking complete - no action needed"
-        return await self.act()
+        with span("agent.step", agent=self.name, step=self.current_step):
+            with span("agent.think"):
+                should_act = await self.think()
+            if not should_act:
+                return "Thinking complete - no action needed"
+            with span("agent.act"):
+                return await self.act()
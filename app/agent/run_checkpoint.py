@@ -0,0 +1,310 @@
+"""
+Run Checkpoint - 스텝 단위 실행 체크포인트
+==========================================
+에이전트가 스텝을 완료할 때마다 메모리, 현재 스텝, 도구 상태를
+추가 전용(append-only) 로그에 기록합니다. 프로세스가 중간에 종료되어도
+`--resume <run-id>`로 마지막으로 완료된 스텝부터 이어서 실행할 수 있습니다.
+
+로그 형식:
+- 한 줄(또는 gzip 멤버)에 레코드 하나
+- 첫 레코드는 실행 메타데이터(`meta`)
+- 이후 레코드는 스텝 스냅샷(`step`)이며, 메모리는 직전 레코드 대비 변경분만 기록
+  (이미 기록된 메시지가 나중에 대체(superseded)된 경우 `supersede` 항목으로 기록)
+- 마지막 레코드가 잘린 경우(쓰기 도중 종료) 해당 레코드는 무시
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Set
+
+from app.config import PROJECT_ROOT, config
+from app.logger import logger
+from app.schema import MessageRecord
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    from app.agent.base import BaseAgent
+
+
+def _dumps(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record, default=str)
+    return json.dumps(record, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _loads(data: bytes) -> dict:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def new_run_id() -> str:
+    """정렬 가능한 새 실행 ID를 생성합니다."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class RunCheckpointLog:
+    """실행 하나에 대한 추가 전용 체크포인트 로그.
+
+    Attributes:
+        run_id: 실행 식별자
+        path: 로그 파일 경로 (`.jsonl` 또는 압축 시 `.jsonl.gz`)
+    """
+
+    def __init__(
+        self,
+        run_id: Optional[str] = None,
+        directory: Optional[Path] = None,
+        compress: Optional[bool] = None,
+    ):
+        settings = config.checkpoint_config
+        self.run_id = run_id or new_run_id()
+        self.directory = Path(directory or PROJECT_ROOT / settings.directory)
+
+        plain_path = self.directory / f"{self.run_id}.jsonl"
+        gzip_path = self.directory / f"{self.run_id}.jsonl.gz"
+        if compress is None:
+            # 기존 로그를 이어 쓸 때는 기존 형식을 따릅니다
+            compress = gzip_path.exists() or (
+                settings.compress and not plain_path.exists()
+            )
+        self.compress = compress
+        self.path = gzip_path if compress else plain_path
+
+        # 변경분 기록을 위한 직전 상태
+        self._persisted_messages: List[int] = []
+        self._persisted_superseded: Set[int] = set()
+        self._tool_digests: Dict[str, str] = {}
+
+    @classmethod
+    def open(cls, run_id: str, directory: Optional[Path] = None) -> "RunCheckpointLog":
+        """기존 실행의 로그를 엽니다.
+
+        Raises:
+            FileNotFoundError: 해당 실행의 로그가 없는 경우
+        """
+        log = cls(run_id=run_id, directory=directory)
+        if not log.path.exists():
+            raise FileNotFoundError(f"No checkpoint log found for run: {run_id}")
+        return log
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    # ------------------------------------------------------------------ #
+    # 쓰기
+    # ------------------------------------------------------------------ #
+
+    def _append(self, record: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = _dumps(record) + b"\n"
+        if self.compress:
+            data = gzip.compress(data, compresslevel=1)
+        with open(self.path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def write_meta(self, agent: "BaseAgent", **extra: Any) -> None:
+        """실행 메타데이터를 기록합니다. 이미 로그가 있으면 건너뜁니다."""
+        if self.exists():
+            return
+        self._append(
+            {
+                "type": "meta",
+                "run_id": self.run_id,
+                "agent": agent.name,
+                "agent_class": type(agent).__name__,
+                "workspace_root": str(config.workspace_root),
+                "created_at": datetime.now().isoformat(),
+                **extra,
+            }
+        )
+
+    def append_step(self, agent: "BaseAgent") -> None:
+        """완료된 스텝의 스냅샷을 기록합니다.
+
+        메모리는 직전 기록 대비 앞에서 잘려나간 개수와 새로 추가된 메시지만,
+        도구 상태는 변경된 도구만 기록합니다.
+        """
+        try:
+            state = agent.checkpoint_state()
+            messages = agent.memory.messages
+            record: Dict[str, Any] = {
+                "type": "step",
+                "step": agent.current_step,
+                "finished": state.pop("finished", False),
+                "agent": state.pop("agent", {}),
+            }
+            record.update(self._memory_delta(messages))
+
+            tools = {}
+            for name, tool_state in state.pop("tools", {}).items():
+                digest = hashlib.sha1(_dumps(tool_state)).hexdigest()
+                if self._tool_digests.get(name) != digest:
+                    tools[name] = tool_state
+                    self._tool_digests[name] = digest
+            if tools:
+                record["tools"] = tools
+            record.update(state)
+
+            self._append(record)
+            self._mark_persisted(messages)
+        except Exception as e:
+            # 체크포인트 실패가 실행 자체를 멈추게 해서는 안 됩니다
+            logger.warning(f"Failed to write checkpoint for run {self.run_id}: {e}")
+
+    def _mark_persisted(self, messages: List[Any]) -> None:
+        self._persisted_messages = [id(msg) for msg in messages]
+        self._persisted_superseded = {
+            id(msg) for msg in messages if msg.superseded_by is not None
+        }
+
+    def _memory_delta(self, messages: List[Any]) -> Dict[str, Any]:
+        persisted = self._persisted_messages
+        if persisted and messages:
+            try:
+                dropped = persisted.index(id(messages[0]))
+            except ValueError:
+                dropped = -1
+            kept = len(persisted) - dropped
+            if (
+                dropped >= 0
+                and kept <= len(messages)
+                and [id(msg) for msg in messages[:kept]] == persisted[dropped:]
+            ):
+                delta: Dict[str, Any] = {
+                    "drop": dropped,
+                    "append": [dump_message(msg) for msg in messages[kept:]],
+                }
+                # 기록 후에 대체된 메시지는 제자리에서 바뀌므로 따로 기록
+                superseded = [
+                    [index, msg.superseded_by]
+                    for index, msg in enumerate(messages[:kept])
+                    if msg.superseded_by is not None
+                    and id(msg) not in self._persisted_superseded
+                ]
+                if superseded:
+                    delta["supersede"] = superseded
+                return delta
+        return {"memory": [dump_message(msg) for msg in messages]}
+
+    # ------------------------------------------------------------------ #
+    # 읽기
+    # ------------------------------------------------------------------ #
+
+    def records(self) -> Iterator[dict]:
+        """기록된 레코드를 순서대로 반환합니다. 잘린 마지막 레코드는 무시합니다."""
+        if not self.exists():
+            return
+        data = self.path.read_bytes()
+        if self.compress:
+            lines = (
+                line for member in _gzip_members(data) for line in member.split(b"\n")
+            )
+        else:
+            lines = iter(data.split(b"\n"))
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield _loads(line)
+            except ValueError:
+                logger.warning(
+                    f"Ignoring truncated checkpoint record in {self.path.name}"
+                )
+                return
+
+    def load(self) -> Optional[dict]:
+        """로그를 재생하여 마지막으로 완료된 스텝의 전체 상태를 복원합니다.
+
+        Returns:
+            `meta`, `step`, `finished`, `agent`, `memory`, `tools` 등을 담은
+            딕셔너리. 기록된 스텝이 없으면 `step`은 0입니다.
+        """
+        snapshot: Optional[dict] = None
+        memory: List[dict] = []
+        tools: Dict[str, Any] = {}
+        for record in self.records():
+            kind = record.pop("type", None)
+            if kind == "meta":
+                snapshot = {"meta": record, "step": 0, "finished": False}
+                continue
+            if kind != "step" or snapshot is None:
+                continue
+            if "memory" in record:
+                memory = record.pop("memory")
+            else:
+                memory = memory[record.pop("drop", 0) :] + record.pop("append", [])
+            for index, superseded_by in record.pop("supersede", []):
+                memory[index] = {**memory[index], "superseded_by": superseded_by}
+            tools.update(record.pop("tools", {}))
+            snapshot.update(record)
+
+        if snapshot is not None:
+            snapshot["memory"] = memory
+            snapshot["tools"] = tools
+        return snapshot
+
+    def resume(self, agent: "BaseAgent") -> Optional[dict]:
+        """에이전트에 마지막 체크포인트를 복원하고 이어 쓸 준비를 합니다."""
+        snapshot = self.load()
+        if snapshot is None:
+            return None
+        agent.restore_checkpoint_state(snapshot)
+        self._mark_persisted(agent.memory.messages)
+        self._tool_digests = {
+            name: hashlib.sha1(_dumps(state)).hexdigest()
+            for name, state in snapshot["tools"].items()
+        }
+        logger.info(
+            f"Resumed run {self.run_id} at step {snapshot['step']} "
+            f"with {len(agent.memory.messages)} messages"
+        )
+        return snapshot
+
+
+def dump_message(message: Any) -> dict:
+    """메시지를 기록용 딕셔너리로 변환합니다. 대체(supersession) 정보도 포함합니다."""
+    data = message.to_dict()
+    if message.supersession_key is not None:
+        data["supersession_key"] = message.supersession_key
+    if message.superseded_by is not None:
+        data["superseded_by"] = message.superseded_by
+    return data
+
+
+def load_message(data: dict) -> "MessageRecord":
+    """`dump_message`로 기록한 딕셔너리를 메시지로 복원합니다."""
+    data = dict(data)
+    supersession_key = data.pop("supersession_key", None)
+    superseded_by = data.pop("superseded_by", None)
+    record = MessageRecord.from_dict(data)
+    record.supersession_key = supersession_key
+    record.superseded_by = superseded_by
+    return record
+
+
+def _gzip_members(data: bytes) -> Iterator[bytes]:
+    """연결된 gzip 멤버들을 하나씩 해제합니다. 불완전한 마지막 멤버는 무시합니다."""
+    while data:
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            chunk = decompressor.decompress(data)
+        except zlib.error:
+            return
+        if not decompressor.eof:
+            return
+        yield chunk
+        data = decompressor.unused_data
@@ -44,7 +44,9 @@ class SandboxManus(ToolCallAgent):
         )
     )
 
-    special_tool_names: list[str] = Field(default_factory=lambda: [Terminate().name])
+    special_tool_names: list[str] = Field(
+        default_factory=lambda: [Terminate.tool_name()]
+    )
     browser_context_helper: Optional[BrowserContextHelper] = None
 
     # Track connected MCP servers
@@ -204,7 +206,7 @@ class SandboxManus(ToolCallAgent):
         original_prompt = self.next_step_prompt
         recent_messages = self.memory.messages[-3:] if self.memory.messages else []
         browser_in_use = any(
-            tc.function.name == SandboxBrowserTool().name
+            tc.function.name == SandboxBrowserTool.tool_name()
             for msg in recent_messages
             if msg.tool_calls
             for tc in msg.tool_calls
@@ -1,18 +1,38 @@
 import asyncio
 import json
-from typing import Any, List, Optional, Union
+import time
+from typing import Any, Dict, List, Optional, Union
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr, model_validator
 
 from app.agent.react import ReActAgent
+from app.events import ToolCallFinished, ToolCallStarted, emit
 from app.exceptions import TokenLimitExceeded
 from app.logger import logger
 from app.prompt.toolcall import NEXT_STEP_PROMPT, SYSTEM_PROMPT
-from app.schema import TOOL_CHOICE_TYPE, AgentState, Message, ToolCall, ToolChoice
+from app.schema import (
+    TOOL_CHOICE_TYPE,
+    AgentState,
+    MessageRecord,
+    ToolCall,
+    ToolChoice,
+)
 from app.tool import CreateChatCompletion, Terminate, ToolCollection
+from app.tool.background_jobs import JobManager, JobResult, JobStatus
+from app.tool.base import CachedToolResult
+from app.tool.blob_reader import ReadBlob
+from app.tool.tool_memo import ToolMemo
+from app.tool.tool_metrics import metrics_enabled, tool_metrics
+from app.tool.tool_router import RequestTools, ToolRouter
+from app.utils.archival_memory import ArchivalMemory
+from app.utils.blob_store import BlobStore
+from app.utils.json_repair import REPAIR_COMPLETED, parse_tool_arguments
+from app.utils.observation import ObservationCompressor
 
 
 TOOL_CALL_REQUIRED = "Tool calls required but none provided"
+# finish_reason values meaning the response hit the output token limit
+TRUNCATED_FINISH_REASONS = ("length", "max_tokens")
 
 
 class ToolCallAgent(ReActAgent):
@@ -24,34 +44,133 @@ class ToolCallAgent(ReActAgent):
     system_prompt: str = SYSTEM_PROMPT
     next_step_prompt: str = NEXT_STEP_PROMPT
 
-    available_tools: ToolCollection = ToolCollection(
-        CreateChatCompletion(), Terminate()
+    available_tools: ToolCollection = Field(
+        default_factory=lambda: ToolCollection(CreateChatCompletion(), Terminate())
     )
     tool_choices: TOOL_CHOICE_TYPE = ToolChoice.AUTO  # type: ignore
-    special_tool_names: List[str] = Field(default_factory=lambda: [Terminate().name])
+    special_tool_names: List[str] = Field(
+        default_factory=lambda: [Terminate.tool_name()]
+    )
 
     tool_calls: List[ToolCall] = Field(default_factory=list)
     _current_base64_image: Optional[str] = None
+    # Supersession keys of observations produced in this step, by tool call id
+    _observation_keys: Dict[str, str] = PrivateAttr(default_factory=dict)
+    # Arguments parsed (and possibly repaired) in think, by tool call id
+    _parsed_arguments: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _argument_repairs: Dict[str, List[str]] = PrivateAttr(default_factory=dict)
 
     max_steps: int = 30
     max_observe: Optional[Union[int, bool]] = None
 
+    # Strips ANSI codes and progress redraws from tool outputs (optionally
+    # repeated lines and JSON whitespace); also enforces the [observation] token cap
+    observation_compressor: ObservationCompressor = Field(
+        default_factory=ObservationCompressor
+    )
+
+    # Pooled agents keep their tools (browser, MCP sessions) alive between runs
+    cleanup_on_finish: bool = True
+
+    # Observations over max_observe or the [observation] token cap are offloaded
+    # to the blob store (when the agent can read them back) and replaced by a
+    # head/tail preview
+    blob_store: BlobStore = Field(default_factory=BlobStore)
+    blob_preview_head: int = 1500
+    blob_preview_tail: int = 500
+
+    # Messages evicted from memory are indexed here; before each think the
+    # most relevant snippets are recalled within a token budget
+    archival_memory: Optional[ArchivalMemory] = None
+    archive_top_k: int = 5
+    archive_token_budget: int = 1500
+    archive_query_messages: int = 4
+
+    # Identical idempotent tool calls within a run reuse the earlier result;
+    # large repeats point back at the earlier observation instead of resending it
+    memoize_tools: bool = True
+    memo_inline_chars: int = 1000
+
+    # Tools that support it can run as background jobs (`run_in_background`);
+    # finished jobs are announced before the next think
+    background_jobs: bool = True
+    max_background_jobs: int = 4
+    job_notice_inline_chars: int = 800
+
+    # When set, each request carries only the tools relevant to the current step
+    # (see ToolRouter); `request_tools` lists and enables the hidden ones
+    tool_router: Optional[ToolRouter] = None
+
+    @model_validator(mode="after")
+    def attach_archival_memory(self) -> "ToolCallAgent":
+        """Feed messages evicted from memory into the archival memory."""
+        if self.archival_memory is not None and self.memory.archive is None:
+            self.memory.archive = self.archival_memory
+        return self
+
+    @model_validator(mode="after")
+    def attach_background_jobs(self) -> "ToolCallAgent":
+        """Add the job tools when any available tool can run in the background."""
+        self._attach_background_jobs()
+        return self
+
+    def _attach_background_jobs(self) -> None:
+        # Agents that build their tools later (e.g. MCPAgent.initialize) call
+        # this again once `available_tools` is set
+        tools = self.available_tools
+        if not isinstance(tools, ToolCollection):
+            return
+        if not self.background_jobs or tools.jobs is not None:
+            return
+        if not any(tool.supports_background() for tool in tools):
+            return
+        status_tool = tools.get_tool(JobStatus.tool_name())
+        if status_tool is None:
+            manager = JobManager(max_running=self.max_background_jobs)
+            tools.add_tools(JobStatus(manager=manager), JobResult(manager=manager))
+        else:
+            manager = status_tool.manager
+        tools.jobs = manager
+
+    @model_validator(mode="after")
+    def attach_tool_router(self) -> "ToolCallAgent":
+        """Add the `request_tools` escape hatch when tools are routed."""
+        if self.tool_router is None or not isinstance(
+            self.available_tools, ToolCollection
+        ):
+            return self
+        request_tool = self.available_tools.get_tool(RequestTools.tool_name())
+        if request_tool is None:
+            self.available_tools.add_tool(RequestTools(router=self.tool_router))
+        else:
+            request_tool.router = self.tool_router
+        return self
+
     async def think(self) -> bool:
         """Process current state and decide next actions using tools"""
+        job_notice = self._finished_job_notice()
+        if job_notice:
+            self.memory.add_message(job_notice)
+
         if self.next_step_prompt:
-            user_msg = Message.user_message(self.next_step_prompt)
+            user_msg = MessageRecord.user_message(self.next_step_prompt)
             self.messages += [user_msg]
 
+        system_msgs = (
+            [MessageRecord.system_message(self.system_prompt)]
+            if self.system_prompt
+            else []
+        )
+        recall_msg = self._recall_archived_context()
+        if recall_msg:
+            system_msgs.append(recall_msg)
+
         try:
             # Get response with tool options
             response = await self.llm.ask_tool(
-                messages=self.messages,
-                system_msgs=(
-                    [Message.system_message(self.system_prompt)]
-                    if self.system_prompt
-                    else None
-                ),
-                tools=self.available_tools.to_params(),
+                messages=self.memory.request_messages(),
+                system_msgs=system_msgs or None,
+                tools=self._step_tools(),
                 tool_choice=self.tool_choices,
             )
         except ValueError:
@@ -64,7 +183,7 @@ class ToolCallAgent(ReActAgent):
                     f"🚨 Token limit error (from RetryError): {token_limit_error}"
                 )
                 self.memory.add_message(
-                    Message.assistant_message(
+                    MessageRecord.assistant_message(
                         f"Maximum token limit reached, cannot continue execution: {str(token_limit_error)}"
                     )
                 )
@@ -88,6 +207,9 @@ class ToolCallAgent(ReActAgent):
             )
             logger.info(f"🔧 Tool arguments: {tool_calls[0].function.arguments}")
 
+        if tool_calls:
+            self._parse_tool_arguments(tool_calls)
+
         try:
             if response is None:
                 raise RuntimeError("No response received from the LLM")
@@ -99,15 +221,15 @@ class ToolCallAgent(ReActAgent):
                         f"🤔 Hmm, {self.name} tried to use tools when they weren't available!"
                     )
                 if content:
-                    self.memory.add_message(Message.assistant_message(content))
+                    self.memory.add_message(MessageRecord.assistant_message(content))
                     return True
                 return False
 
             # Create and add assistant message
             assistant_msg = (
-                Message.from_tool_calls(content=content, tool_calls=self.tool_calls)
+                MessageRecord.from_tool_calls(content=content, tool_calls=self.tool_calls)
                 if self.tool_calls
-                else Message.assistant_message(content)
+                else MessageRecord.assistant_message(content)
             )
             self.memory.add_message(assistant_msg)
 
@@ -122,7 +244,7 @@ class ToolCallAgent(ReActAgent):
         except Exception as e:
             logger.error(f"🚨 Oops! The {self.name}'s thinking process hit a snag: {e}")
             self.memory.add_message(
-                Message.assistant_message(
+                MessageRecord.assistant_message(
                     f"Error encountered while processing: {str(e)}"
                 )
             )
@@ -142,27 +264,217 @@ class ToolCallAgent(ReActAgent):
             # Reset base64_image for each tool call
             self._current_base64_image = None
 
+            emit(
+                ToolCallStarted,
+                tool_call_id=command.id,
+                name=command.function.name,
+                arguments=command.function.arguments or "",
+            )
+            started = time.perf_counter()
             result = await self.execute_tool(command)
 
-            if self.max_observe:
-                result = result[: self.max_observe]
+            # Blob pages are already capped by read_blob; offloading one again
+            # would return another handle instead of the page
+            truncated = (
+                command.function.name != ReadBlob.tool_name()
+                and self.observation_compressor.exceeds_limit(
+                    result, self.max_observe, self.llm.count_tokens
+                )
+            )
+            if truncated:
+                result = self._offload_observation(result)
+            if metrics_enabled():
+                tool_metrics().record_observation(
+                    command.function.name, self.llm.count_tokens(result), truncated
+                )
+            emit(
+                ToolCallFinished,
+                tool_call_id=command.id,
+                name=command.function.name,
+                result=result,
+                is_error=result.startswith("Error:"),
+                duration_seconds=round(time.perf_counter() - started, 3),
+            )
 
             logger.info(
                 f"🎯 Tool '{command.function.name}' completed its mission! Result: {result}"
             )
 
             # Add tool response to memory
-            tool_msg = Message.tool_message(
+            tool_msg = MessageRecord.tool_message(
                 content=result,
                 tool_call_id=command.id,
                 name=command.function.name,
                 base64_image=self._current_base64_image,
             )
+            tool_msg.supersession_key = self._observation_keys.pop(command.id, None)
             self.memory.add_message(tool_msg)
             results.append(result)
 
         return "\n\n".join(results)
 
+    def _recall_archived_context(self) -> Optional[MessageRecord]:
+        """Build a system message with archived snippets relevant to the recent turns.
+
+        Snippets are taken in relevance order until the token budget is spent.
+        Returns None when nothing has been archived or nothing matches.
+        """
+        if not self.archival_memory or not len(self.archival_memory):
+            return None
+
+        query = "\n".join(
+            msg.content
+            for msg in self.messages[-self.archive_query_messages :]
+            if msg.content and msg.content != self.next_step_prompt
+        )
+        if not query:
+            return None
+
+        lines, used_tokens = [], 0
+        for _, snippet in self.archival_memory.search(query, self.archive_top_k):
+            entry = f"- [{snippet.source}] {snippet.text}"
+            entry_tokens = self.llm.count_tokens(entry)
+            if used_tokens + entry_tokens > self.archive_token_budget:
+                continue
+            lines.append(entry)
+            used_tokens += entry_tokens
+        if not lines:
+            return None
+
+        logger.info(f"📚 Recalled {len(lines)} archived snippets ({used_tokens} tokens)")
+        return MessageRecord.system_message(
+            "Relevant context recalled from earlier in this session "
+            "(no longer in the conversation window; it may be outdated):\n"
+            + "\n".join(lines)
+        )
+
+    def preferred_tools(self) -> List[str]:
+        """Tool names the router should offer in the current step.
+
+        Subclasses add the tools of their current phase; job tools are offered
+        while the run has background jobs.
+        """
+        jobs = self.available_tools.jobs
+        if jobs is not None and jobs.jobs:
+            return [JobStatus.tool_name(), JobResult.tool_name()]
+        return []
+
+    def pinned_tools(self) -> List[str]:
+        """Tool names the router always offers (by default the special tools)."""
+        return list(self.special_tool_names)
+
+    def _step_tools(self) -> List[dict]:
+        """Tool definitions for this step's request (all tools unless routed)."""
+        if self.tool_router is None:
+            return self.available_tools.to_params()
+        query = "\n".join(
+            msg.content
+            for msg in self.messages[-self.tool_router.settings.query_messages :]
+            if msg.content and msg.content != self.next_step_prompt
+        )
+        return self.tool_router.select(
+            self.available_tools,
+            self.messages,
+            query=query,
+            preferred=self.preferred_tools(),
+            pinned=self.pinned_tools(),
+        )
+
+    def _compress_observation(self, name: str, text: str) -> str:
+        """Compress a tool output, keeping file and shell content verbatim."""
+        tool = self.available_tools.get_tool(name)
+        verbatim = tool is not None and tool.verbatim_output()
+        return self.observation_compressor.compress(text, verbatim=verbatim)
+
+    def _finished_job_notice(self) -> Optional[MessageRecord]:
+        """Announce background jobs that finished since the last think."""
+        jobs = self.available_tools.jobs
+        finished = jobs.pop_finished() if jobs is not None else []
+        if not finished:
+            return None
+
+        lines = []
+        for job in finished:
+            line = (
+                f"Background job `{job.job_id}` ({job.tool}) {job.status} "
+                f"after {job.elapsed:.1f}s."
+            )
+            result = job.result()
+            output = self._compress_observation(job.tool, str(result)) if result else ""
+            if len(output) <= self.job_notice_inline_chars:
+                line += f" Output:\n{output}" if output else " No output."
+            else:
+                line += f" Use `job_result` with job_id `{job.job_id}` to read its output."
+            lines.append(line)
+        logger.info(f"📬 {len(finished)} background job(s) finished")
+        return MessageRecord.user_message("\n\n".join(lines))
+
+    def _offload_observation(self, result: str) -> str:
+        """Replace an oversized observation with a preview and a blob handle.
+
+        Falls back to plain truncation when the agent has no way to read the
+        stored blob back.
+        """
+        if ReadBlob.tool_name() not in self.available_tools.tool_map:
+            return self.observation_compressor.truncate(
+                result, self.max_observe, self.llm.count_tokens
+            )
+
+        try:
+            handle = self.blob_store.put(result)
+        except OSError as e:
+            logger.warning(f"Failed to store observation in blob store: {e}")
+            return self.observation_compressor.truncate(
+                result, self.max_observe, self.llm.count_tokens
+            )
+
+        head, tail = self.blob_preview_head, self.blob_preview_tail
+        if self.max_observe:
+            head = min(head, self.max_observe)
+            tail = min(tail, max(0, self.max_observe - head))
+        logger.info(f"📦 Stored {len(result)} chars of tool output as {handle}")
+        return self.blob_store.preview(result, handle, head, tail)
+
+    def _parse_tool_arguments(self, tool_calls: List[ToolCall]) -> None:
+        """Parse tool call arguments once, repairing malformed JSON.
+
+        Repaired arguments are written back so the assistant message in memory
+        carries valid JSON; calls that cannot be repaired are left for
+        `execute_tool` to report.
+        """
+        truncated = self.llm.last_finish_reason in TRUNCATED_FINISH_REASONS
+        for call in tool_calls:
+            try:
+                args, repairs = parse_tool_arguments(
+                    call.function.arguments, truncated=truncated
+                )
+            except json.JSONDecodeError:
+                continue
+            self._parsed_arguments[call.id] = args
+            if repairs:
+                logger.warning(
+                    f"🩹 Repaired malformed JSON arguments for '{call.function.name}': "
+                    f"{', '.join(repairs)}"
+                )
+                call.function.arguments = json.dumps(args, ensure_ascii=False)
+                self._argument_repairs[call.id] = repairs
+
+    @staticmethod
+    def _repair_notice(name: str, repairs: List[str]) -> str:
+        if not repairs:
+            return ""
+        if REPAIR_COMPLETED in repairs:
+            return (
+                "Note: your response was cut off at the output token limit, so the "
+                f"arguments for `{name}` were incomplete and were "
+                "closed automatically. String values (e.g. file content) may be "
+                "truncated; check the result and send the rest in a smaller call.\n"
+            )
+        return (
+            f"Note: the arguments for `{name}` were not valid JSON "
+            f"and were repaired ({', '.join(repairs)}).\n"
+        )
+
     async def execute_tool(self, command: ToolCall) -> str:
         """Execute a single tool call with robust error handling"""
         if not command or not command.function or not command.function.name:
@@ -172,17 +484,53 @@ class ToolCallAgent(ReActAgent):
         if name not in self.available_tools.tool_map:
             return f"Error: Unknown tool '{name}'"
 
+        repairs = self._argument_repairs.pop(command.id, None) or []
         try:
-            # Parse arguments
-            args = json.loads(command.function.arguments or "{}")
+            # Parse arguments (already done in think for calls from the LLM)
+            if command.id in self._parsed_arguments:
+                args = self._parsed_arguments.pop(command.id)
+            else:
+                args, _ = parse_tool_arguments(command.function.arguments)
+
+            # Completed (cut-off) arguments only run when the call has no side
+            # effects; a truncated file or shell command must not be executed
+            tool = self.available_tools.get_tool(name)
+            if REPAIR_COMPLETED in repairs and not tool.is_idempotent(**args):
+                logger.warning(f"✂️ Not running '{name}' with cut-off arguments")
+                return (
+                    "Error: your response was cut off at the output token limit, so "
+                    f"the arguments for `{name}` were incomplete. The call was not "
+                    "run, because running it could write a truncated file or run a "
+                    "partial command. Send it again in smaller parts (e.g. create "
+                    "the file with the first part, then add the rest with further "
+                    "edits)."
+                )
+            repair_notice = self._repair_notice(name, repairs)
 
             # Execute the tool
             logger.info(f"🔧 Activating tool: '{name}'...")
-            result = await self.available_tools.execute(name=name, tool_input=args)
+            result = await self.available_tools.execute(
+                name=name, tool_input=args, call_id=command.id
+            )
 
             # Handle special tools
             await self._handle_special_tool(name=name, result=result)
 
+            if isinstance(result, CachedToolResult) and self._observation_in_memory(
+                result.source_call_id
+            ):
+                if len(str(result)) > self.memo_inline_chars:
+                    return (
+                        f"Cmd `{name}` returned the same result as the earlier identical "
+                        f"call {result.source_call_id} (nothing has changed since); "
+                        "refer to that observation above."
+                    )
+
+            if not getattr(result, "error", None):
+                key = self.available_tools.get_tool(name).supersession_key(**args)
+                if key:
+                    self._observation_keys[command.id] = f"{name}:{key}"
+
             # Check if result is a ToolResult with base64_image
             if hasattr(result, "base64_image") and result.base64_image:
                 # Store the base64_image for later use in tool_message
@@ -190,14 +538,18 @@ class ToolCallAgent(ReActAgent):
 
             # Format result for display (standard case)
             observation = (
-                f"Observed output of cmd `{name}` executed:\n{str(result)}"
+                f"Observed output of cmd `{name}` executed:\n"
+                f"{self._compress_observation(name, str(result))}"
                 if result
                 else f"Cmd `{name}` completed with no output"
             )
 
-            return observation
-        except json.JSONDecodeError:
-            error_msg = f"Error parsing arguments for {name}: Invalid JSON format"
+            return repair_notice + observation
+        except json.JSONDecodeError as e:
+            error_msg = (
+                f"Error parsing arguments for {name}: Invalid JSON format "
+                f"({e.msg} at line {e.lineno} column {e.colno})"
+            )
             logger.error(
                 f"📝 Oops! The arguments for '{name}' don't make sense - invalid JSON, arguments:{command.function.arguments}"
             )
@@ -207,6 +559,13 @@ class ToolCallAgent(ReActAgent):
             logger.exception(error_msg)
             return f"Error: {error_msg}"
 
+    def _observation_in_memory(self, tool_call_id: Optional[str]) -> bool:
+        """Whether the observation of an earlier call is still sent in full."""
+        return bool(tool_call_id) and any(
+            msg.tool_call_id == tool_call_id and not msg.superseded_by
+            for msg in self.memory.messages
+        )
+
     async def _handle_special_tool(self, name: str, result: Any, **kwargs):
         """Handle special tool execution and state changes"""
         if not self._is_special_tool(name):
@@ -226,6 +585,43 @@ class ToolCallAgent(ReActAgent):
         """Check if tool name is in special tools list"""
         return name.lower() in [n.lower() for n in self.special_tool_names]
 
+    def checkpoint_state(self) -> dict:
+        """Add the state of stateful tools to the checkpoint."""
+        state = super().checkpoint_state()
+        tools = {}
+        for name, tool in self.available_tools.tool_map.items():
+            tool_state = tool.dump_state()
+            if tool_state is not None:
+                tools[name] = tool_state
+        state["tools"] = tools
+        return state
+
+    def restore_checkpoint_state(self, snapshot: dict) -> None:
+        """Restore agent and tool state from a checkpoint snapshot."""
+        super().restore_checkpoint_state(snapshot)
+        for name, tool_state in snapshot.get("tools", {}).items():
+            tool = self.available_tools.get_tool(name)
+            if tool:
+                tool.load_state(tool_state)
+            else:
+                logger.warning(f"Checkpointed tool '{name}' is not available, skipping")
+
+    def reset(self) -> None:
+        """Reset conversation state, including pending tool calls and the archive."""
+        super().reset()
+        self.tool_calls = []
+        self._current_base64_image = None
+        self._observation_keys.clear()
+        self._parsed_arguments.clear()
+        self._argument_repairs.clear()
+        if self.tool_router is not None:
+            self.tool_router.reset()
+        if self.available_tools.jobs is not None:
+            self.available_tools.jobs.clear()
+        if self.archival_memory is not None:
+            self.archival_memory = ArchivalMemory()
+            self.memory.archive = self.archival_memory
+
     async def cleanup(self):
         """Clean up resources used by the agent's tools."""
         logger.info(f"🧹 Cleaning up resources for agent '{self.name}'...")
@@ -244,7 +640,15 @@ class ToolCallAgent(ReActAgent):
 
     async def run(self, request: Optional[str] = None) -> str:
         """Run the agent with cleanup when done."""
+        self.available_tools.memo = ToolMemo() if self.memoize_tools else None
         try:
             return await super().run(request)
         finally:
-            await self.cleanup()
+            memo = self.available_tools.memo
+            if memo is not None and memo.hits:
+                logger.info(
+                    f"Reused {memo.hits} memoized tool result(s) in this run"
+                )
+            self.available_tools.memo = None
+            if self.cleanup_on_finish:
+                await self.cleanup()
@@ -0,0 +1,263 @@
+"""
+Batch Runner - 헤드리스 동시 배치 실행기
+========================================
+JSONL 파일의 요청들을 하나의 프로세스 안에서 동시에 처리합니다.
+
+- 요청마다 독립된 세션(`app.session`)과 작업 디렉토리에서 에이전트를 실행
+- 워커 수(`concurrency`)로 동시 실행 개수를 제한
+- 요청별 결과, 토큰 사용량, 소요 시간을 완료 즉시 출력 JSONL에 기록
+- 요청별 타임아웃 지원
+- `AgentPool`을 지정하면 미리 초기화된 에이전트를 재사용 (요청마다 MCP 연결 생략)
+- 재시작 시 이미 완료된 요청 ID는 건너뜀
+
+입력 형식 (한 줄에 하나):
+    {"request_id": "...", "prompt": "..."}
+    {"request_id": "...", "title": "...", "body": "..."}
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from app.agent.base import BaseAgent
+from app.agent.pool import AgentPool
+from app.config import config
+from app.logger import logger
+from app.session import Session, current_session, session_scope
+
+
+AgentFactory = Callable[[], Awaitable[BaseAgent]]
+
+
+class BatchRequest(BaseModel):
+    """배치 입력의 요청 하나."""
+
+    request_id: str
+    prompt: str
+    timeout: Optional[float] = Field(
+        None, description="Per-request timeout in seconds (overrides the runner default)"
+    )
+
+    @classmethod
+    def from_record(cls, record: dict) -> "BatchRequest":
+        """JSONL 레코드에서 요청을 생성합니다. `prompt`가 없으면 `title`과 `body`를 합칩니다."""
+        prompt = record.get("prompt") or "\n\n".join(
+            part for part in (record.get("title"), record.get("body")) if part
+        )
+        if not record.get("request_id") or not prompt:
+            raise ValueError("Each request needs a `request_id` and a prompt")
+        return cls(
+            request_id=str(record["request_id"]),
+            prompt=prompt,
+            timeout=record.get("timeout"),
+        )
+
+
+class BatchResult(BaseModel):
+    """요청 하나의 실행 결과 (출력 JSONL의 한 줄)."""
+
+    request_id: str
+    status: str = Field(..., description="completed, failed or timeout")
+    result: Optional[str] = None
+    error: Optional[str] = None
+    started_at: str
+    duration_seconds: float
+    usage: dict = Field(default_factory=dict)
+
+
+class BatchRunner:
+    """JSONL 요청 파일을 제한된 워커 풀로 처리하는 실행기.
+
+    Args:
+        input_path: 요청 JSONL 경로
+        output_path: 결과 JSONL 경로 (이어 쓰기)
+        agent_factory: 요청마다 새 에이전트를 생성하는 비동기 팩토리.
+            현재 세션 안에서 호출됩니다.
+        concurrency: 동시에 실행할 최대 요청 수
+        timeout: 요청별 기본 타임아웃(초), None이면 제한 없음
+        workspace_root: 요청별 작업 디렉토리의 상위 경로
+        pool: 에이전트 풀. 지정하면 `agent_factory` 대신 풀에서 에이전트를 대여
+    """
+
+    def __init__(
+        self,
+        input_path: Path,
+        output_path: Path,
+        agent_factory: AgentFactory,
+        concurrency: int = 4,
+        timeout: Optional[float] = None,
+        workspace_root: Optional[Path] = None,
+        pool: Optional[AgentPool] = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.input_path = Path(input_path)
+        self.output_path = Path(output_path)
+        self.agent_factory = agent_factory
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.workspace_root = Path(workspace_root or config.workspace_root)
+        self.pool = pool
+        self._write_lock = asyncio.Lock()
+
+    def load_requests(self) -> List[BatchRequest]:
+        """입력 파일에서 요청 목록을 읽습니다. 형식이 잘못된 줄은 건너뜁니다."""
+        requests = []
+        with self.input_path.open(encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    requests.append(BatchRequest.from_record(json.loads(line)))
+                except ValueError as e:
+                    logger.warning(
+                        f"Skipping invalid request on line {line_number} of {self.input_path}: {e}"
+                    )
+        return requests
+
+    def completed_ids(self) -> Set[str]:
+        """출력 파일에 이미 `completed`로 기록된 요청 ID를 반환합니다."""
+        if not self.output_path.exists():
+            return set()
+        completed = set()
+        with self.output_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("status") == "completed":
+                    completed.add(record.get("request_id"))
+        return completed
+
+    async def run(self) -> dict:
+        """모든 미완료 요청을 실행하고 상태별 집계를 반환합니다."""
+        requests = self.load_requests()
+        done = self.completed_ids()
+        pending = [request for request in requests if request.request_id not in done]
+        logger.info(
+            f"Batch: {len(requests)} requests, {len(requests) - len(pending)} already completed, "
+            f"{len(pending)} to run with concurrency {self.concurrency}"
+        )
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for request in pending:
+            queue.put_nowait(request)
+
+        summary = {
+            "completed": 0,
+            "failed": 0,
+            "timeout": 0,
+            "skipped": len(requests) - len(pending),
+        }
+
+        async def worker() -> None:
+            while True:
+                try:
+                    request = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                result = await self.run_request(request)
+                summary[result.status] += 1
+                await self._write_result(result)
+
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        workers = min(self.concurrency, len(pending))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        logger.info(f"Batch finished: {summary}")
+        return summary
+
+    async def run_request(self, request: BatchRequest) -> BatchResult:
+        """요청 하나를 독립된 세션(또는 풀에서 대여한 에이전트의 세션)에서 실행합니다."""
+        workspace_root = self.workspace_root / _safe_dirname(request.request_id)
+        workspace_root.mkdir(parents=True, exist_ok=True)
+        timeout = request.timeout if request.timeout is not None else self.timeout
+        started_at = datetime.now().isoformat()
+        start = time.perf_counter()
+
+        if self.pool is not None:
+            usage = {"input_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            try:
+                async with self.pool.acquire(workspace_root=workspace_root) as agent:
+                    status, output, error = await self._execute(
+                        agent, request, timeout
+                    )
+                    usage = current_session().token_usage
+            except Exception as e:
+                # 풀 초기화(에이전트 생성) 실패도 이 요청의 실패로만 기록
+                status, output, error = "failed", None, f"{type(e).__name__}: {e}"
+                logger.exception(f"Failed to acquire agent for {request.request_id}")
+        else:
+            session = Session(
+                session_id=request.request_id, workspace_root=workspace_root
+            )
+            with session_scope(session):
+                agent = None
+                try:
+                    agent = await self.agent_factory()
+                    status, output, error = await self._execute(
+                        agent, request, timeout
+                    )
+                except Exception as e:
+                    status, output, error = "failed", None, f"{type(e).__name__}: {e}"
+                    logger.exception(f"Failed to create agent for {request.request_id}")
+                finally:
+                    if agent is not None and hasattr(agent, "cleanup"):
+                        try:
+                            await agent.cleanup()
+                        except Exception as e:
+                            logger.warning(
+                                f"Cleanup failed for batch request {request.request_id}: {e}"
+                            )
+                    usage = session.token_usage
+                    try:
+                        await session.close()
+                    except Exception as e:
+                        logger.warning(
+                            f"Failed to close session for batch request {request.request_id}: {e}"
+                        )
+
+        result = BatchResult(
+            request_id=request.request_id,
+            status=status,
+            result=output,
+            error=error,
+            started_at=started_at,
+            duration_seconds=round(time.perf_counter() - start, 3),
+            usage=usage,
+        )
+        logger.info(
+            f"Batch request {request.request_id} {status} in {result.duration_seconds}s "
+            f"({usage['total_tokens']} tokens)"
+        )
+        return result
+
+    @staticmethod
+    async def _execute(
+        agent: BaseAgent, request: BatchRequest, timeout: Optional[float]
+    ) -> Tuple[str, Optional[str], Optional[str]]:
+        """에이전트로 요청을 실행하고 (status, result, error)를 반환합니다."""
+        try:
+            output = await asyncio.wait_for(agent.run(request.prompt), timeout)
+            return "completed", output, None
+        except asyncio.TimeoutError:
+            return "timeout", None, f"Timed out after {timeout} seconds"
+        except Exception as e:
+            logger.exception(f"Batch request {request.request_id} failed")
+            return "failed", None, f"{type(e).__name__}: {e}"
+
+    async def _write_result(self, result: BatchResult) -> None:
+        line = json.dumps(result.model_dump(), ensure_ascii=False) + "\n"
+        async with self._write_lock:
+            with self.output_path.open("a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+
+
+def _safe_dirname(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name) or "request"
@@ -10,6 +10,8 @@ from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from app.session import current_session, is_default_session
+
 
 def get_project_root() -> Path:
     """Get the project root directory"""
@@ -32,6 +34,16 @@ class LLMSettings(BaseModel):
     temperature: float = Field(1.0, description="Sampling temperature")
     api_type: str = Field(..., description="Azure, Openai, or Ollama")
     api_version: str = Field(..., description="Azure Openai version if AzureOpenai")
+    input_cost_per_million: Optional[float] = Field(
+        None, description="Price per million input tokens (enables cost budgets)"
+    )
+    output_cost_per_million: Optional[float] = Field(
+        None, description="Price per million completion tokens"
+    )
+    max_concurrent_requests: Optional[int] = Field(
+        None,
+        description="Process-wide cap on in-flight LLM requests (read from [llm]; None for unlimited)",
+    )
 
 
 class ProxySettings(BaseModel):
@@ -68,6 +80,11 @@ class RunflowSettings(BaseModel):
     use_data_analysis_agent: bool = Field(
         default=False, description="Enable data analysis agent in run flow"
     )
+    max_parallelism: int = Field(
+        default=4,
+        description="Maximum plan steps a planning flow runs at once (steps whose "
+        "dependencies are complete, one per executor agent)",
+    )
 
 
 class BrowserSettings(BaseModel):
@@ -128,6 +145,133 @@ class DaytonaSettings(BaseModel):
     )
 
 
+class CheckpointSettings(BaseModel):
+    """Configuration for per-step run checkpoints"""
+
+    enabled: bool = Field(True, description="Write a checkpoint after every step")
+    directory: str = Field(
+        "runs", description="Checkpoint directory (relative to the project root)"
+    )
+    compress: bool = Field(False, description="Gzip-compress checkpoint records")
+
+
+class ObservationSettings(BaseModel):
+    """Post-processing applied to tool outputs before they enter memory"""
+
+    enabled: bool = Field(True, description="Compress tool observations")
+    strip_ansi: bool = Field(True, description="Remove ANSI escape sequences")
+    collapse_progress: bool = Field(
+        True, description="Keep only the final state of carriage-return progress lines"
+    )
+    collapse_repeats: bool = Field(
+        False,
+        description="Run-length encode consecutive identical lines "
+        "(not applied to file or shell content)",
+    )
+    repeat_threshold: int = Field(
+        3, description="Minimum run of identical lines that gets collapsed"
+    )
+    minify_json: bool = Field(
+        False,
+        description="Re-serialize JSON outputs compactly; may change number "
+        "formatting and drop duplicate keys (not applied to file or shell content)",
+    )
+    max_tokens: Optional[int] = Field(
+        None, description="Token cap per observation (head + tail are kept)"
+    )
+    head_ratio: float = Field(
+        0.7, description="Share of a truncated observation taken from the head"
+    )
+
+
+class BudgetSettings(BaseModel):
+    """Default per-run budgets (unset means unlimited)"""
+
+    max_seconds: Optional[float] = Field(None, description="Wall-clock budget per run")
+    max_tokens: Optional[int] = Field(
+        None, description="Total (input + completion) token budget per run"
+    )
+    max_cost: Optional[float] = Field(
+        None, description="Cost budget per run (requires LLM token prices)"
+    )
+    wrap_up_at: float = Field(
+        0.9, description="Fraction of any budget at which the agent gets a final wrap-up step"
+    )
+
+
+class SubagentSettings(BaseModel):
+    """Configuration for the spawn_subagents tool"""
+
+    max_tasks: int = Field(6, description="Maximum sub-agents per spawn_subagents call")
+    max_parallel: int = Field(
+        3, description="Maximum sub-agents running at once within one call"
+    )
+    max_steps: int = Field(10, description="Default step limit per sub-agent")
+    max_messages: int = Field(
+        40, description="Memory size (messages) of each sub-agent"
+    )
+    result_chars: int = Field(
+        2000, description="Maximum characters of each sub-agent's condensed result"
+    )
+
+
+class ToolRouterSettings(BaseModel):
+    """Configuration for per-step tool routing"""
+
+    enabled: bool = Field(
+        True, description="Send only the tools relevant to the current step"
+    )
+    min_tools: int = Field(
+        8, description="Send every tool when the agent has at most this many"
+    )
+    max_tools: int = Field(8, description="Maximum tools sent per request")
+    top_k: int = Field(
+        3, description="Tools added by keyword match against the recent turns"
+    )
+    recent_steps: int = Field(
+        3, description="Tools used in this many recent steps stay available"
+    )
+    sticky_steps: int = Field(
+        5, description="Steps a tool enabled with request_tools stays available"
+    )
+    query_messages: int = Field(
+        4, description="Recent messages matched against the tool descriptions"
+    )
+
+
+class ToolMetricsSettings(BaseModel):
+    """Configuration for tool execution metrics"""
+
+    enabled: bool = Field(
+        True, description="Record count, latency, output size and truncation per tool"
+    )
+    directory: str = Field(
+        "metrics",
+        description="Where a JSON dump is written after each run, relative to the "
+        "project root (empty to only log the summary)",
+    )
+
+
+class TracingSettings(BaseModel):
+    """Configuration for hot-path tracing spans"""
+
+    enabled: bool = Field(
+        False, description="Record spans for agent steps, LLM and tool calls"
+    )
+    directory: str = Field(
+        "traces", description="Trace output directory (relative to the project root)"
+    )
+    chrome_trace: bool = Field(
+        True, description="Also write a Chrome trace file viewable as a flame chart"
+    )
+    endpoint: Optional[str] = Field(
+        None, description="OTLP/HTTP collector base URL (spans are POSTed to /v1/traces)"
+    )
+    service_name: str = Field(
+        "openmanus", description="OTLP service.name resource attribute"
+    )
+
+
 class MCPServerConfig(BaseModel):
     """Configuration for a single MCP server"""
 
@@ -193,6 +337,27 @@ class AppConfig(BaseModel):
     daytona_config: Optional[DaytonaSettings] = Field(
         None, description="Daytona configuration"
     )
+    checkpoint_config: Optional[CheckpointSettings] = Field(
+        None, description="Run checkpoint configuration"
+    )
+    tracing_config: Optional[TracingSettings] = Field(
+        None, description="Tracing configuration"
+    )
+    budget_config: Optional[BudgetSettings] = Field(
+        None, description="Run budget configuration"
+    )
+    observation_config: Optional[ObservationSettings] = Field(
+        None, description="Tool observation compression configuration"
+    )
+    subagent_config: Optional[SubagentSettings] = Field(
+        None, description="Sub-agent configuration"
+    )
+    tool_router_config: Optional[ToolRouterSettings] = Field(
+        None, description="Tool routing configuration"
+    )
+    tool_metrics_config: Optional[ToolMetricsSettings] = Field(
+        None, description="Tool metrics configuration"
+    )
 
     class Config:
         arbitrary_types_allowed = True
@@ -250,6 +415,9 @@ class Config:
             "temperature": base_llm.get("temperature", 1.0),
             "api_type": base_llm.get("api_type", ""),
             "api_version": base_llm.get("api_version", ""),
+            "input_cost_per_million": base_llm.get("input_cost_per_million"),
+            "output_cost_per_million": base_llm.get("output_cost_per_million"),
+            "max_concurrent_requests": base_llm.get("max_concurrent_requests"),
         }
 
         # handle browser config.
@@ -309,6 +477,48 @@ class Config:
         else:
             mcp_settings = MCPSettings(servers=MCPSettings.load_server_config())
 
+        checkpoint_config = raw_config.get("checkpoint")
+        if checkpoint_config:
+            checkpoint_settings = CheckpointSettings(**checkpoint_config)
+        else:
+            checkpoint_settings = CheckpointSettings()
+
+        observation_config = raw_config.get("observation")
+        if observation_config:
+            observation_settings = ObservationSettings(**observation_config)
+        else:
+            observation_settings = ObservationSettings()
+
+        budget_config = raw_config.get("budget")
+        if budget_config:
+            budget_settings = BudgetSettings(**budget_config)
+        else:
+            budget_settings = BudgetSettings()
+
+        subagent_config = raw_config.get("subagents")
+        if subagent_config:
+            subagent_settings = SubagentSettings(**subagent_config)
+        else:
+            subagent_settings = SubagentSettings()
+
+        tool_router_config = raw_config.get("tool_router")
+        if tool_router_config:
+            tool_router_settings = ToolRouterSettings(**tool_router_config)
+        else:
+            tool_router_settings = ToolRouterSettings()
+
+        tool_metrics_config = raw_config.get("tool_metrics")
+        if tool_metrics_config:
+            tool_metrics_settings = ToolMetricsSettings(**tool_metrics_config)
+        else:
+            tool_metrics_settings = ToolMetricsSettings()
+
+        tracing_config = raw_config.get("tracing")
+        if tracing_config:
+            tracing_settings = TracingSettings(**tracing_config)
+        else:
+            tracing_settings = TracingSettings()
+
         run_flow_config = raw_config.get("runflow")
         if run_flow_config:
             run_flow_settings = RunflowSettings(**run_flow_config)
@@ -328,6 +538,13 @@ class Config:
             "mcp_config": mcp_settings,
             "run_flow_config": run_flow_settings,
             "daytona_config": daytona_settings,
+            "checkpoint_config": checkpoint_settings,
+            "tracing_config": tracing_settings,
+            "budget_config": budget_settings,
+            "observation_config": observation_settings,
+            "subagent_config": subagent_settings,
+            "tool_router_config": tool_router_settings,
+            "tool_metrics_config": tool_metrics_settings,
         }
 
         self._config = AppConfig(**config_dict)
@@ -362,18 +579,63 @@ class Config:
         """Get the Run Flow configuration"""
         return self._config.run_flow_config
 
+    @property
+    def checkpoint_config(self) -> CheckpointSettings:
+        """Get the run checkpoint configuration"""
+        return self._config.checkpoint_config
+
+    @property
+    def observation_config(self) -> ObservationSettings:
+        """Get the tool observation compression configuration"""
+        return self._config.observation_config
+
+    @property
+    def budget_config(self) -> BudgetSettings:
+        """Get the default run budgets"""
+        return self._config.budget_config
+
+    @property
+    def subagent_config(self) -> SubagentSettings:
+        """Get the sub-agent configuration"""
+        return self._config.subagent_config
+
+    @property
+    def tool_router_config(self) -> ToolRouterSettings:
+        """Get the tool routing configuration"""
+        return self._config.tool_router_config
+
+    @property
+    def tool_metrics_config(self) -> ToolMetricsSettings:
+        """Get the tool metrics configuration"""
+        return self._config.tool_metrics_config
+
+    @property
+    def tracing_config(self) -> TracingSettings:
+        """Get the tracing configuration"""
+        return self._config.tracing_config
+
     @property
     def workspace_root(self) -> Path:
-        """Get the workspace root directory"""
+        """Get the workspace root directory (session override first)"""
+        session_root = current_session().workspace_root
+        if session_root is not None:
+            return session_root
         if not hasattr(self, "_workspace_root"):
             self._workspace_root = WORKSPACE_ROOT
         return self._workspace_root
 
     def set_workspace_root(self, path: Path) -> None:
-        """Set the workspace root directory"""
-        self._workspace_root = path
-        if not self._workspace_root.exists():
-            self._workspace_root.mkdir(parents=True, exist_ok=True)
+        """Set the workspace root directory
+
+        Inside an explicit session only that session's workspace is changed.
+        """
+        session = current_session()
+        if is_default_session(session):
+            self._workspace_root = path
+        else:
+            session.workspace_root = path
+        if not path.exists():
+            path.mkdir(parents=True, exist_ok=True)
 
     @property
     def root_path(self) -> Path:
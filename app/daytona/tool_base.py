@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Any, ClassVar, Dict, Optional
 
 from daytona import Daytona, DaytonaConfig, Sandbox, SandboxState
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 from app.config import config
 from app.daytona.sandbox import create_sandbox, start_supervisord_session
@@ -62,7 +62,7 @@ class SandboxToolsBase(BaseTool):
     _sandbox_id: Optional[str] = None
     _sandbox_pass: Optional[str] = None
     workspace_path: str = Field(default="/workspace", exclude=True)
-    _sessions: dict[str, str] = {}
+    _sessions: dict[str, str] = PrivateAttr(default_factory=dict)
 
     class Config:
         arbitrary_types_allowed = True  # Allow non-pydantic types like ThreadManager
@@ -0,0 +1,127 @@
+"""
+Events - 에이전트 실행 이벤트 스트림
+===================================
+`BaseAgent.run_stream()`이 내보내는 타입이 지정된 이벤트와,
+실행 중 각 계층(에이전트 루프, LLM, 도구 호출)에서 이벤트를 발행하는
+컨텍스트 범위 싱크를 정의합니다.
+
+- 싱크는 `contextvars`로 전달되므로 스트림을 구독한 실행에만 적용
+- 싱크가 없으면 `emit()`은 이벤트 객체를 만들지 않고 즉시 반환 (기존 `run()` 비용 없음)
+- 이벤트는 `model_dump()` / `model_dump_json()`으로 그대로 직렬화 가능 (SSE, JSONL 등)
+
+사용 예:
+    async for event in agent.run_stream(prompt):
+        if isinstance(event, TokenDelta):
+            print(event.text, end="", flush=True)
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Literal, Optional, Type
+
+from pydantic import BaseModel, Field
+
+
+class AgentEvent(BaseModel):
+    """모든 실행 이벤트의 기본 클래스."""
+
+    type: str
+    timestamp: float = Field(default_factory=time.time)
+
+
+class StepStarted(AgentEvent):
+    type: Literal["step_started"] = "step_started"
+    step: int
+    max_steps: int
+
+
+class StepFinished(AgentEvent):
+    type: Literal["step_finished"] = "step_finished"
+    step: int
+    result: str
+    duration_seconds: float
+
+
+class TokenDelta(AgentEvent):
+    """LLM 스트리밍 응답의 텍스트 조각."""
+
+    type: Literal["token_delta"] = "token_delta"
+    text: str
+
+
+class ToolCallStarted(AgentEvent):
+    type: Literal["tool_call_started"] = "tool_call_started"
+    tool_call_id: str
+    name: str
+    arguments: str
+
+
+class ToolCallProgress(AgentEvent):
+    """실행 중인 도구 호출의 부분 출력/진행 상황 (스트리밍을 지원하는 도구만)."""
+
+    type: Literal["tool_call_progress"] = "tool_call_progress"
+    tool_call_id: str
+    name: str
+    output: str = ""
+    error: str = ""
+    message: Optional[str] = None
+    progress: Optional[float] = None
+
+
+class ToolCallFinished(AgentEvent):
+    type: Literal["tool_call_finished"] = "tool_call_finished"
+    tool_call_id: str
+    name: str
+    result: str
+    is_error: bool = False
+    duration_seconds: float
+
+
+class StateChanged(AgentEvent):
+    type: Literal["state_changed"] = "state_changed"
+    previous: str
+    state: str
+
+
+class UsageUpdated(AgentEvent):
+    """LLM 호출 후 누적 토큰 사용량."""
+
+    type: Literal["usage_updated"] = "usage_updated"
+    model: str
+    input_tokens: int
+    completion_tokens: int
+    total_input_tokens: int
+    total_completion_tokens: int
+
+
+class RunFinished(AgentEvent):
+    type: Literal["run_finished"] = "run_finished"
+    result: str
+
+
+EventSink = Callable[[AgentEvent], None]
+
+_event_sink: ContextVar[Optional[EventSink]] = ContextVar("agent_event_sink", default=None)
+
+
+def has_event_sink() -> bool:
+    """현재 컨텍스트에 이벤트 구독자가 있는지 확인합니다."""
+    return _event_sink.get() is not None
+
+
+def emit(event_type: Type[AgentEvent], **fields) -> None:
+    """현재 싱크로 이벤트를 발행합니다. 싱크가 없으면 아무 것도 하지 않습니다."""
+    sink = _event_sink.get()
+    if sink is not None:
+        sink(event_type(**fields))
+
+
+@contextmanager
+def event_sink(sink: EventSink) -> Iterator[None]:
+    """블록 안에서 발행되는 이벤트를 `sink`로 전달합니다."""
+    token = _event_sink.set(sink)
+    try:
+        yield
+    finally:
+        _event_sink.reset(token)
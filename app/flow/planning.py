@@ -1,16 +1,21 @@
+import asyncio
 import json
+import re
 import time
 from enum import Enum
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from pydantic import Field
 
 from app.agent.base import BaseAgent
+from app.config import config
 from app.flow.base import BaseFlow
 from app.llm import LLM
 from app.logger import logger
 from app.schema import AgentState, Message, ToolChoice
+from app.session import current_session
 from app.tool import PlanningTool
+from app.tool.planning import linear_dependencies, plan_dependencies
 
 
 class PlanStepStatus(str, Enum):
@@ -43,13 +48,25 @@ class PlanStepStatus(str, Enum):
 
 
 class PlanningFlow(BaseFlow):
-    """A flow that manages planning and execution of tasks using agents."""
+    """A flow that manages planning and execution of tasks using agents.
+
+    Plan steps form a dependency graph (see `PlanningTool` `step_dependencies`;
+    plans without dependencies run in order). Every step whose dependencies are
+    completed starts as soon as an executor agent is free, up to
+    `max_parallelism` steps at once. Each agent runs one step at a time. A
+    failed step is marked blocked, and so is every step that depends on it;
+    independent steps keep running.
+    """
 
     llm: LLM = Field(default_factory=lambda: LLM())
     planning_tool: PlanningTool = Field(default_factory=PlanningTool)
     executor_keys: List[str] = Field(default_factory=list)
     active_plan_id: str = Field(default_factory=lambda: f"plan_{int(time.time())}")
+    # Index of the most recently started step
     current_step_index: Optional[int] = None
+    max_parallelism: int = Field(
+        default_factory=lambda: config.run_flow_config.max_parallelism
+    )
 
     def __init__(
         self, agents: Union[BaseAgent, List[BaseAgent], Dict[str, BaseAgent]], **data
@@ -108,31 +125,54 @@ class PlanningFlow(BaseFlow):
                     )
                     return f"Failed to create plan for: {input_text}"
 
-            result = ""
-            while True:
-                # Get current step to execute
-                self.current_step_index, step_info = await self._get_current_step_info()
-
-                # Exit if no more steps or plan completed
-                if self.current_step_index is None:
-                    result += await self._finalize_plan()
-                    break
-
-                # Execute current step with appropriate agent
-                step_type = step_info.get("type") if step_info else None
-                executor = self.get_executor(step_type)
-                step_result = await self._execute_step(executor, step_info)
-                result += step_result + "\n"
-
-                # Check if agent wants to terminate
-                if hasattr(executor, "state") and executor.state == AgentState.FINISHED:
-                    break
+            # Steps share the session sandbox; it is cleaned up once the whole
+            # plan is done instead of after each step's agent run
+            async with current_session().run_scope():
+                result, finished = await self._run_steps()
 
+            if not finished:
+                result += await self._finalize_plan()
             return result
         except Exception as e:
             logger.error(f"Error in PlanningFlow: {str(e)}")
             return f"Execution failed: {str(e)}"
 
+    async def _run_steps(self) -> Tuple[str, bool]:
+        """Run plan steps as their dependencies complete.
+
+        Returns the step results and whether an executor agent finished the
+        run (the plan is then not finalized).
+        """
+        result = ""
+        finished = False
+        # Running step -> (step index, executor key)
+        running: Dict[asyncio.Task, Tuple[int, str]] = {}
+        try:
+            while True:
+                if not finished:
+                    await self._start_ready_steps(running)
+
+                # Exit when no step is running and none can start
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    _, key = running.pop(task)
+                    result += task.result() + "\n"
+
+                    # Check if agent wants to terminate; running steps still finish
+                    if self.agents[key].state == AgentState.FINISHED:
+                        finished = True
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        return result, finished
+
     async def _create_initial_plan(self, request: str) -> None:
         """Create an initial plan based on the request using the flow's LLM and PlanningTool."""
         logger.info(f"Creating initial plan with ID: {self.active_plan_id}")
@@ -140,7 +180,9 @@ class PlanningFlow(BaseFlow):
         system_message_content = (
             "You are a planning assistant. Create a concise, actionable plan with clear steps. "
             "Focus on key milestones rather than detailed sub-steps. "
-            "Optimize for clarity and efficiency."
+            "Optimize for clarity and efficiency. "
+            "When steps do not need each other's results, set `step_dependencies` "
+            "so they can run in parallel."
         )
         agents_description = []
         for key in self.executor_keys:
@@ -210,75 +252,120 @@ class PlanningFlow(BaseFlow):
             }
         )
 
-    async def _get_current_step_info(self) -> tuple[Optional[int], Optional[dict]]:
+    async def _start_ready_steps(self, running: Dict[asyncio.Task, Tuple[int, str]]):
+        """Start every ready step that has a free executor, up to `max_parallelism`."""
+        busy = {key for _, key in running.values()}
+        running_steps = {index for index, _ in running.values()}
+        for index, step_info in await self._ready_steps(running_steps):
+            if len(running) >= max(self.max_parallelism, 1):
+                break
+            key = self._free_executor(step_info.get("type"), busy)
+            if key is None:
+                continue
+
+            await self._mark_step(index, PlanStepStatus.IN_PROGRESS.value)
+            self.current_step_index = index
+            busy.add(key)
+            task = asyncio.create_task(
+                self._execute_step(self.agents[key], index, step_info),
+                name=f"plan-step-{index}",
+            )
+            running[task] = (index, key)
+
+    async def _ready_steps(self, running: Set[int]) -> List[Tuple[int, dict]]:
         """
-        Parse the current plan to identify the first non-completed step's index and info.
-        Returns (None, None) if no active step is found.
+        Find the steps that can start: not completed, blocked or running, with
+        every dependency completed. Steps that depend on a blocked step are
+        marked blocked first.
         """
         if (
             not self.active_plan_id
             or self.active_plan_id not in self.planning_tool.plans
         ):
             logger.error(f"Plan with ID {self.active_plan_id} not found")
-            return None, None
+            return []
 
         try:
             # Direct access to plan data from planning tool storage
             plan_data = self.planning_tool.plans[self.active_plan_id]
             steps = plan_data.get("steps", [])
             step_statuses = plan_data.get("step_statuses", [])
+            while len(step_statuses) < len(steps):
+                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
+            dependencies = plan_dependencies(plan_data)
+
+            await self._block_dependents(step_statuses, dependencies, running)
 
-            # Find first non-completed step
+            active = PlanStepStatus.get_active_statuses()
+            ready = []
             for i, step in enumerate(steps):
-                if i >= len(step_statuses):
-                    status = PlanStepStatus.NOT_STARTED.value
-                else:
-                    status = step_statuses[i]
-
-                if status in PlanStepStatus.get_active_statuses():
-                    # Extract step type/category if available
-                    step_info = {"text": step}
-
-                    # Try to extract step type from the text (e.g., [SEARCH] or [CODE])
-                    import re
-
-                    type_match = re.search(r"\[([A-Z_]+)\]", step)
-                    if type_match:
-                        step_info["type"] = type_match.group(1).lower()
-
-                    # Mark current step as in_progress
-                    try:
-                        await self.planning_tool.execute(
-                            command="mark_step",
-                            plan_id=self.active_plan_id,
-                            step_index=i,
-                            step_status=PlanStepStatus.IN_PROGRESS.value,
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error marking step as in_progress: {e}")
-                        # Update step status directly if needed
-                        if i < len(step_statuses):
-                            step_statuses[i] = PlanStepStatus.IN_PROGRESS.value
-                        else:
-                            while len(step_statuses) < i:
-                                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-                            step_statuses.append(PlanStepStatus.IN_PROGRESS.value)
-
-                        plan_data["step_statuses"] = step_statuses
-
-                    return i, step_info
-
-            return None, None  # No active step found
+                if i in running or step_statuses[i] not in active:
+                    continue
+                if all(
+                    step_statuses[dep] == PlanStepStatus.COMPLETED.value
+                    for dep in dependencies[i]
+                ):
+                    ready.append((i, self._step_info(step)))
+            return ready
 
         except Exception as e:
-            logger.warning(f"Error finding current step index: {e}")
-            return None, None
-
-    async def _execute_step(self, executor: BaseAgent, step_info: dict) -> str:
-        """Execute the current step with the specified agent using agent.run()."""
+            logger.warning(f"Error finding ready steps: {e}")
+            return []
+
+    async def _block_dependents(
+        self, step_statuses: List[str], dependencies: List[List[int]], running: Set[int]
+    ) -> None:
+        """Mark steps blocked when any step they depend on is blocked."""
+        active = PlanStepStatus.get_active_statuses()
+        changed = True
+        while changed:
+            changed = False
+            for i, deps in enumerate(dependencies):
+                if i in running or step_statuses[i] not in active:
+                    continue
+                blockers = [
+                    dep
+                    for dep in deps
+                    if step_statuses[dep] == PlanStepStatus.BLOCKED.value
+                ]
+                if blockers:
+                    await self._mark_step(
+                        i,
+                        PlanStepStatus.BLOCKED.value,
+                        f"Blocked: depends on blocked step {blockers[0]}",
+                    )
+                    changed = True
+
+    @staticmethod
+    def _step_info(step: str) -> dict:
+        """Step text and type ([SEARCH] or [CODE] selects the agent with that key)."""
+        step_info = {"text": step}
+        type_match = re.search(r"\[([A-Z_]+)\]", step)
+        if type_match:
+            step_info["type"] = type_match.group(1).lower()
+        return step_info
+
+    def _free_executor(self, step_type: Optional[str], busy: Set[str]) -> Optional[str]:
+        """
+        Key of an idle agent for a step: the agent named by the step type, else
+        the first idle executor. None if the step has to wait.
+        """
+        if step_type and step_type in self.agents:
+            return None if step_type in busy else step_type
+
+        keys = [key for key in self.executor_keys if key in self.agents]
+        for key in keys or [self.primary_agent_key]:
+            if key not in busy:
+                return key
+        return None
+
+    async def _execute_step(
+        self, executor: BaseAgent, step_index: int, step_info: dict
+    ) -> str:
+        """Execute one step with the specified agent using agent.run()."""
         # Prepare context for the agent with current plan status
         plan_status = await self._get_plan_text()
-        step_text = step_info.get("text", f"Step {self.current_step_index}")
+        step_text = step_info.get("text", f"Step {step_index}")
 
         # Create a prompt for the agent to execute the current step
         step_prompt = f"""
@@ -286,9 +373,9 @@ class PlanningFlow(BaseFlow):
         {plan_status}
 
         YOUR CURRENT TASK:
-        You are now working on step {self.current_step_index}: "{step_text}"
+        You are now working on step {step_index}: "{step_text}"
 
-        Please only execute this current step using the appropriate tools. When you're done, provide a summary of what you accomplished.
+        Please only execute this current step using the appropriate tools. Other steps marked in progress may be running in parallel; do not work on them. When you're done, provide a summary of what you accomplished.
         """
 
         # Use agent.run() to execute the step
@@ -296,28 +383,31 @@ class PlanningFlow(BaseFlow):
             step_result = await executor.run(step_prompt)
 
             # Mark the step as completed after successful execution
-            await self._mark_step_completed()
+            await self._mark_step(step_index, PlanStepStatus.COMPLETED.value)
 
             return step_result
         except Exception as e:
-            logger.error(f"Error executing step {self.current_step_index}: {e}")
-            return f"Error executing step {self.current_step_index}: {str(e)}"
-
-    async def _mark_step_completed(self) -> None:
-        """Mark the current step as completed."""
-        if self.current_step_index is None:
-            return
+            logger.error(f"Error executing step {step_index}: {e}")
+            # Steps that depend on this one are blocked before the next ones start
+            await self._mark_step(
+                step_index, PlanStepStatus.BLOCKED.value, f"Failed: {e}"
+            )
+            return f"Error executing step {step_index}: {str(e)}"
 
+    async def _mark_step(
+        self, step_index: int, status: str, notes: Optional[str] = None
+    ) -> None:
+        """Set the status (and optional notes) of a step."""
         try:
-            # Mark the step as completed
             await self.planning_tool.execute(
                 command="mark_step",
                 plan_id=self.active_plan_id,
-                step_index=self.current_step_index,
-                step_status=PlanStepStatus.COMPLETED.value,
+                step_index=step_index,
+                step_status=status,
+                step_notes=notes,
             )
             logger.info(
-                f"Marked step {self.current_step_index} as completed in plan {self.active_plan_id}"
+                f"Marked step {step_index} as {status} in plan {self.active_plan_id}"
             )
         except Exception as e:
             logger.warning(f"Failed to update plan status: {e}")
@@ -327,11 +417,11 @@ class PlanningFlow(BaseFlow):
                 step_statuses = plan_data.get("step_statuses", [])
 
                 # Ensure the step_statuses list is long enough
-                while len(step_statuses) <= self.current_step_index:
+                while len(step_statuses) <= step_index:
                     step_statuses.append(PlanStepStatus.NOT_STARTED.value)
 
                 # Update the status
-                step_statuses[self.current_step_index] = PlanStepStatus.COMPLETED.value
+                step_statuses[step_index] = status
                 plan_data["step_statuses"] = step_statuses
 
     async def _get_plan_text(self) -> str:
@@ -385,6 +475,8 @@ class PlanningFlow(BaseFlow):
             plan_text += "Steps:\n"
 
             status_marks = PlanStepStatus.get_status_marks()
+            dependencies = plan_dependencies(plan_data)
+            linear = dependencies == linear_dependencies(len(steps))
 
             for i, (step, status, notes) in enumerate(
                 zip(steps, step_statuses, step_notes)
@@ -393,8 +485,13 @@ class PlanningFlow(BaseFlow):
                 status_mark = status_marks.get(
                     status, status_marks[PlanStepStatus.NOT_STARTED.value]
                 )
+                after = (
+                    f" (after {', '.join(map(str, dependencies[i]))})"
+                    if dependencies[i] and not linear
+                    else ""
+                )
 
-                plan_text += f"{i}. {status_mark} {step}\n"
+                plan_text += f"{i}. {status_mark} {step}{after}\n"
                 if notes:
                     plan_text += f"   Notes: {notes}\n"
 
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import ast
-from typing import Dict, List, Optional, Union
+import asyncio
+import functools
+import weakref
+from contextvars import ContextVar
+from typing import List, Optional, Union
 
 import tiktoken
 from openai import (
@@ -12,7 +16,12 @@ from openai import (
     OpenAIError,
     RateLimitError,
 )
-from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat import (
+    ChatCompletion,
+    ChatCompletionMessage,
+    ChatCompletionMessageToolCall,
+)
+from openai.types.chat.chat_completion_message_tool_call import Function
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -22,13 +31,18 @@ from tenacity import (
 
 from app.bedrock import BedrockClient
 from app.config import LLMSettings, config
+from app.events import TokenDelta, UsageUpdated, emit, has_event_sink
 from app.exceptions import TokenLimitExceeded
 from app.logger import logger  # Assuming a logger is set up in your app
+from app.replay import recordable
+from app.session import current_session
+from app.tracing import set_span_attributes, traced
 from app.schema import (
     ROLE_VALUES,
     TOOL_CHOICE_TYPE,
     TOOL_CHOICE_VALUES,
     Message,
+    MessageRecord,
     ToolChoice,
 )
 
@@ -173,17 +187,74 @@ class TokenCounter:
         return total_tokens
 
 
+# finish_reason of the latest ask_tool response, per task: agents running
+# concurrently (sub-agents, batch workers) share one LLM instance per session
+_last_finish_reason: ContextVar[Optional[str]] = ContextVar(
+    "llm_last_finish_reason", default=None
+)
+
+
+def get_last_finish_reason() -> Optional[str]:
+    """finish_reason of the latest `ask_tool` response in the current task."""
+    return _last_finish_reason.get()
+
+
+def set_last_finish_reason(reason: Optional[str]) -> None:
+    """Set the reported finish_reason (replay restores recorded responses' values)."""
+    _last_finish_reason.set(reason)
+
+# Semaphore per event loop: asyncio primitives cannot be shared across loops
+_request_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _request_slot() -> Optional[asyncio.Semaphore]:
+    """Return the process-wide semaphore limiting in-flight LLM requests, if configured."""
+    limit = config.llm["default"].max_concurrent_requests
+    if not limit:
+        return None
+    loop = asyncio.get_running_loop()
+    slots = _request_slots.get(loop)
+    if slots is None:
+        slots = _request_slots[loop] = asyncio.Semaphore(limit)
+    return slots
+
+
+def limit_concurrency(func):
+    """Hold a request slot for the duration of one attempt (including streaming).
+
+    Applied below `@retry` so that a request waiting out its backoff does not
+    keep a slot that other agents or sub-agents could use.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        slots = _request_slot()
+        if slots is None:
+            return await func(*args, **kwargs)
+        async with slots:
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
 class LLM:
-    _instances: Dict[str, "LLM"] = {}
+    """LLM client, one instance per config name within the current session.
+
+    Instances (and their token counters) are scoped to `app.session.current_session()`
+    so that concurrent sessions in one process do not share usage accounting.
+    """
 
     def __new__(
         cls, config_name: str = "default", llm_config: Optional[LLMSettings] = None
     ):
-        if config_name not in cls._instances:
+        instances = current_session().llm_instances
+        if config_name not in instances:
             instance = super().__new__(cls)
             instance.__init__(config_name, llm_config)
-            cls._instances[config_name] = instance
-        return cls._instances[config_name]
+            instances[config_name] = instance
+        return instances[config_name]
 
     def __init__(
         self, config_name: str = "default", llm_config: Optional[LLMSettings] = None
@@ -207,6 +278,12 @@ class LLM:
                 if hasattr(llm_config, "max_input_tokens")
                 else None
             )
+            self.input_cost_per_million = getattr(
+                llm_config, "input_cost_per_million", None
+            )
+            self.output_cost_per_million = getattr(
+                llm_config, "output_cost_per_million", None
+            )
 
             # Initialize tokenizer
             try:
@@ -227,6 +304,9 @@ class LLM:
                 self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
 
             self.token_counter = TokenCounter(self.tokenizer)
+            # Token count of the last tool list; ToolCollection.to_params returns
+            # the same list object until the collection changes
+            self._tools_tokens_cache: Optional[tuple] = None
 
     def count_tokens(self, text: str) -> int:
         """Calculate the number of tokens in a text"""
@@ -234,6 +314,24 @@ class LLM:
             return 0
         return len(self.tokenizer.encode(text))
 
+    @property
+    def last_finish_reason(self) -> Optional[str]:
+        """finish_reason of the latest `ask_tool` response in the current task
+        ("length" means the output was cut off at max_tokens)."""
+        return _last_finish_reason.get()
+
+    def count_tools_tokens(self, tools: Optional[List[dict]]) -> int:
+        """Calculate the tokens used by tool definitions (cached per tool list)"""
+        if not tools:
+            return 0
+        cache = self._tools_tokens_cache
+        if cache is not None and cache[0] is tools:
+            return cache[1]
+        tokens = sum(self.count_tokens(str(tool)) for tool in tools)
+        # Holding the list keeps its identity from being reused by another list
+        self._tools_tokens_cache = (tools, tokens)
+        return tokens
+
     def count_message_tokens(self, messages: List[dict]) -> int:
         return self.token_counter.count_message_tokens(messages)
 
@@ -247,6 +345,38 @@ class LLM:
             f"Cumulative Input={self.total_input_tokens}, Cumulative Completion={self.total_completion_tokens}, "
             f"Total={input_tokens + completion_tokens}, Cumulative Total={self.total_input_tokens + self.total_completion_tokens}"
         )
+        self._emit_usage(input_tokens, completion_tokens)
+        set_span_attributes(
+            model=self.model,
+            input_tokens=input_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+    def _emit_usage(self, input_tokens: int, completion_tokens: int) -> None:
+        emit(
+            UsageUpdated,
+            model=self.model,
+            input_tokens=input_tokens,
+            completion_tokens=completion_tokens,
+            total_input_tokens=self.total_input_tokens,
+            total_completion_tokens=self.total_completion_tokens,
+        )
+
+    @property
+    def is_priced(self) -> bool:
+        """Whether token prices are configured for this model"""
+        return (
+            self.input_cost_per_million is not None
+            or self.output_cost_per_million is not None
+        )
+
+    @property
+    def total_cost(self) -> float:
+        """Cumulative cost of all requests, from the configured token prices"""
+        return (
+            self.total_input_tokens * (self.input_cost_per_million or 0.0)
+            + self.total_completion_tokens * (self.output_cost_per_million or 0.0)
+        ) / 1_000_000
 
     def check_token_limit(self, input_tokens: int) -> bool:
         """Check if token limits are exceeded"""
@@ -267,7 +397,8 @@ class LLM:
 
     @staticmethod
     def format_messages(
-        messages: List[Union[dict, Message]], supports_images: bool = False
+        messages: List[Union[dict, Message, MessageRecord]],
+        supports_images: bool = False,
     ) -> List[dict]:
         """
         Format messages for LLM by converting them to OpenAI message format.
@@ -294,8 +425,8 @@ class LLM:
         formatted_messages = []
 
         for message in messages:
-            # Convert Message objects to dictionaries
-            if isinstance(message, Message):
+            # Convert Message objects and records to dictionaries
+            if isinstance(message, (Message, MessageRecord)):
                 message = message.to_dict()
 
             if isinstance(message, dict):
@@ -353,6 +484,8 @@ class LLM:
 
         return formatted_messages
 
+    @traced("llm.ask")
+    @recordable("llm.ask")
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
@@ -360,10 +493,11 @@ class LLM:
             (OpenAIError, Exception, ValueError)
         ),  # Don't retry TokenLimitExceeded
     )
+    @limit_concurrency
     async def ask(
         self,
-        messages: List[Union[dict, Message]],
-        system_msgs: Optional[List[Union[dict, Message]]] = None,
+        messages: List[Union[dict, Message, MessageRecord]],
+        system_msgs: Optional[List[Union[dict, Message, MessageRecord]]] = None,
         stream: bool = True,
         temperature: Optional[float] = None,
     ) -> str:
@@ -441,13 +575,19 @@ class LLM:
 
             collected_messages = []
             completion_text = ""
+            # Stream subscribers receive the deltas instead of stdout
+            to_stdout = not has_event_sink()
             async for chunk in response:
                 chunk_message = chunk.choices[0].delta.content or ""
                 collected_messages.append(chunk_message)
                 completion_text += chunk_message
-                print(chunk_message, end="", flush=True)
+                if to_stdout:
+                    print(chunk_message, end="", flush=True)
+                elif chunk_message:
+                    emit(TokenDelta, text=chunk_message)
 
-            print()  # Newline after streaming
+            if to_stdout:
+                print()  # Newline after streaming
             full_response = "".join(collected_messages).strip()
             if not full_response:
                 raise ValueError("Empty response from streaming LLM")
@@ -458,6 +598,7 @@ class LLM:
                 f"Estimated completion tokens for streaming response: {completion_tokens}"
             )
             self.total_completion_tokens += completion_tokens
+            self._emit_usage(0, completion_tokens)
 
             return full_response
 
@@ -480,6 +621,8 @@ class LLM:
             logger.exception(f"Unexpected error in ask")
             raise
 
+    @traced("llm.ask_with_images")
+    @recordable("llm.ask_with_images")
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
@@ -487,11 +630,12 @@ class LLM:
             (OpenAIError, Exception, ValueError)
         ),  # Don't retry TokenLimitExceeded
     )
+    @limit_concurrency
     async def ask_with_images(
         self,
-        messages: List[Union[dict, Message]],
+        messages: List[Union[dict, Message, MessageRecord]],
         images: List[Union[str, dict]],
-        system_msgs: Optional[List[Union[dict, Message]]] = None,
+        system_msgs: Optional[List[Union[dict, Message, MessageRecord]]] = None,
         stream: bool = False,
         temperature: Optional[float] = None,
     ) -> str:
@@ -605,12 +749,17 @@ class LLM:
             response = await self.client.chat.completions.create(**params)
 
             collected_messages = []
+            to_stdout = not has_event_sink()
             async for chunk in response:
                 chunk_message = chunk.choices[0].delta.content or ""
                 collected_messages.append(chunk_message)
-                print(chunk_message, end="", flush=True)
+                if to_stdout:
+                    print(chunk_message, end="", flush=True)
+                elif chunk_message:
+                    emit(TokenDelta, text=chunk_message)
 
-            print()  # Newline after streaming
+            if to_stdout:
+                print()  # Newline after streaming
             full_response = "".join(collected_messages).strip()
 
             if not full_response:
@@ -636,6 +785,8 @@ class LLM:
             logger.error(f"Unexpected error in ask_with_images: {e}")
             raise
 
+    @traced("llm.ask_tool")
+    @recordable("llm.ask_tool")
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
@@ -643,10 +794,11 @@ class LLM:
             (OpenAIError, Exception, ValueError)
         ),  # Don't retry TokenLimitExceeded
     )
+    @limit_concurrency
     async def ask_tool(
         self,
-        messages: List[Union[dict, Message]],
-        system_msgs: Optional[List[Union[dict, Message]]] = None,
+        messages: List[Union[dict, Message, MessageRecord]],
+        system_msgs: Optional[List[Union[dict, Message, MessageRecord]]] = None,
         timeout: int = 300,
         tools: Optional[List[dict]] = None,
         tool_choice: TOOL_CHOICE_TYPE = ToolChoice.AUTO,  # type: ignore
@@ -693,12 +845,7 @@ class LLM:
             input_tokens = self.count_message_tokens(messages)
 
             # If there are tools, calculate token count for tool descriptions
-            tools_tokens = 0
-            if tools:
-                for tool in tools:
-                    tools_tokens += self.count_tokens(str(tool))
-
-            input_tokens += tools_tokens
+            input_tokens += self.count_tools_tokens(tools)
 
             # Check if token limits are exceeded
             if not self.check_token_limit(input_tokens):
@@ -730,7 +877,12 @@ class LLM:
                     temperature if temperature is not None else self.temperature
                 )
 
-            params["stream"] = False  # Always use non-streaming for tool requests
+            if has_event_sink() and self.api_type != "aws":
+                # Stream the assistant's thoughts to subscribers as they arrive
+                return await self._stream_tool_response(params, input_tokens)
+
+            params["stream"] = False  # Non-streaming unless someone is listening
+            _last_finish_reason.set(None)
             response: ChatCompletion = await self.client.chat.completions.create(
                 **params
             )
@@ -740,6 +892,7 @@ class LLM:
                 print(response)
                 # raise ValueError("Invalid or empty response from LLM")
                 return None
+            _last_finish_reason.set(response.choices[0].finish_reason)
 
             # Update token counts
             self.update_token_count(
@@ -766,3 +919,66 @@ class LLM:
         except Exception as e:
             logger.error(f"Unexpected error in ask_tool: {e}")
             raise
+
+    async def _stream_tool_response(
+        self, params: dict, input_tokens: int
+    ) -> ChatCompletionMessage | None:
+        """Run a tool request in streaming mode, emitting content deltas.
+
+        Tool call fragments are reassembled by index so the result matches the
+        non-streaming `ChatCompletionMessage`.
+        """
+        _last_finish_reason.set(None)
+        response = await self.client.chat.completions.create(**params, stream=True)
+
+        content_parts: List[str] = []
+        tool_calls: dict = {}
+        usage = None
+        async for chunk in response:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            if chunk.choices[0].finish_reason:
+                _last_finish_reason.set(chunk.choices[0].finish_reason)
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content_parts.append(delta.content)
+                emit(TokenDelta, text=delta.content)
+            for call in delta.tool_calls or []:
+                entry = tool_calls.setdefault(
+                    call.index, {"id": "", "name": "", "arguments": ""}
+                )
+                if call.id:
+                    entry["id"] = call.id
+                if call.function:
+                    entry["name"] += call.function.name or ""
+                    entry["arguments"] += call.function.arguments or ""
+
+        content = "".join(content_parts)
+        if not content and not tool_calls:
+            return None
+
+        if usage:
+            self.update_token_count(usage.prompt_tokens, usage.completion_tokens)
+        else:
+            # Most providers omit usage when streaming; estimate it
+            completion_tokens = self.count_tokens(content) + sum(
+                self.count_tokens(call["name"] + call["arguments"])
+                for call in tool_calls.values()
+            )
+            self.update_token_count(input_tokens, completion_tokens)
+
+        return ChatCompletionMessage(
+            role="assistant",
+            content=content or None,
+            tool_calls=[
+                ChatCompletionMessageToolCall(
+                    id=call["id"],
+                    type="function",
+                    function=Function(name=call["name"], arguments=call["arguments"]),
+                )
+                for _, call in sorted(tool_calls.items())
+            ]
+            or None,
+        )
@@ -43,7 +43,7 @@ class MCPServer:
         # Define the async function to be registered
         async def tool_method(**kwargs):
             logger.info(f"Executing {tool_name}: {kwargs}")
-            result = await tool.execute(**kwargs)
+            result = await tool.call_with_timeout(**kwargs)
 
             logger.info(f"Result of {tool_name}: {result}")
 
@@ -0,0 +1,3 @@
+WRAP_UP_PROMPT = """The run budget is almost spent ({usage}). This is your final step.
+Do not start new work. Summarize what you have accomplished, state clearly what is left unfinished, \
+save any important results, and then use the `terminate` tool/function call to finish."""
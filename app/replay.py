@@ -0,0 +1,368 @@
+"""
+Replay - 에이전트 실행 기록/재생 하네스
+=======================================
+실제 LLM 응답과 도구 부작용에 의존하는 에이전트 실행을 결정적으로 재현합니다.
+
+- 기록(`record_run`): 모든 `LLM.ask*` 요청/응답(`ask_tool`은 `finish_reason` 포함)과
+  `ToolCollection.execute` 입력/출력을 소요 시간과 함께 JSONL 트레이스 파일에 기록
+- 재생(`replay_run`): 네트워크·샌드박스 없이 기록된 응답을 순서대로 돌려주며
+  `ToolCallAgent`를 다시 구동. `time_scale`로 기록된 지연 시간을 축소(0이면 즉시 응답)
+- 재생 결과로 스텝당 프레임워크 오버헤드(전체 시간 - 재생된 지연 시간)를 측정
+
+명령줄 재생은 MCP 서버에 연결하지 않으므로, 에이전트에 없는 기록된 도구(MCP 도구 등)는
+`add_recorded_tools`로 자리표시 도구를 등록해 기록된 결과를 그대로 돌려받습니다.
+
+제한 사항:
+- `ToolCollection.execute`를 거치지 않는 도구 호출(예: 브라우저 상태 조회)은 재생되지 않음
+- 에이전트 로직이 바뀌어 호출 순서가 달라지면 경고를 남기고 기록 순서대로 응답
+
+사용 예:
+    with record_run("trace.jsonl", prompt=prompt, agent=agent):
+        await agent.run(prompt)
+
+    report = await replay_agent(agent, "trace.jsonl", time_scale=0.0)
+
+    # 명령줄
+    python -m app.replay trace.jsonl --time-scale 0
+"""
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Union
+
+from app.logger import logger
+
+
+TRACE_VERSION = 1
+
+
+class ReplayError(Exception):
+    """재생할 기록이 없거나 트레이스 파일이 잘못된 경우 발생합니다."""
+
+
+# ---------------------------------------------------------------------- #
+# 직렬화
+# ---------------------------------------------------------------------- #
+
+
+def _message_dict(message: Any) -> Any:
+    return message.to_dict() if hasattr(message, "to_dict") else message
+
+
+def _summarize_llm_request(args: tuple, kwargs: dict) -> dict:
+    """LLM 요청 요약: 전체 대화 대신 메시지 수, 다이제스트, 마지막 메시지만 기록."""
+    messages = kwargs.get("messages", args[1] if len(args) > 1 else [])
+    dumped = [_message_dict(message) for message in messages]
+    summary = {
+        "message_count": len(dumped),
+        "digest": hashlib.sha1(
+            json.dumps(dumped, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16],
+        "last_message": dumped[-1] if dumped else None,
+    }
+    tools = kwargs.get("tools")
+    if tools:
+        summary["tools"] = [tool["function"]["name"] for tool in tools]
+    return summary
+
+
+def _serialize_response(kind: str, result: Any) -> Any:
+    if kind == "llm.ask_tool":
+        return result.model_dump(exclude_none=True) if result is not None else None
+    if kind == "tool.execute":
+        if hasattr(result, "model_dump"):
+            return {"class": type(result).__name__, **result.model_dump()}
+        return {"class": None, "output": result}
+    return result
+
+
+def _deserialize_response(kind: str, data: Any) -> Any:
+    if kind == "llm.ask_tool":
+        from openai.types.chat import ChatCompletionMessage
+
+        return ChatCompletionMessage.model_validate(data) if data is not None else None
+    if kind == "tool.execute":
+        from app.tool.base import CachedToolResult, CLIResult, ToolFailure, ToolResult
+
+        classes = {
+            cls.__name__: cls
+            for cls in (ToolResult, ToolFailure, CLIResult, CachedToolResult)
+        }
+        data = dict(data)
+        class_name = data.pop("class", None)
+        if class_name is None:
+            return data.get("output")
+        return classes.get(class_name, ToolResult)(**data)
+    return data
+
+
+# ---------------------------------------------------------------------- #
+# 기록 / 재생
+# ---------------------------------------------------------------------- #
+
+
+class RunRecorder:
+    """호출을 가로채 트레이스 파일에 기록합니다."""
+
+    def __init__(self, path: Union[str, Path], **metadata: Any):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("w", encoding="utf-8")
+        self._sequence = 0
+        self._write(
+            {
+                "type": "header",
+                "version": TRACE_VERSION,
+                "created_at": datetime.now().isoformat(),
+                **metadata,
+            }
+        )
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    async def handle(
+        self, kind: str, func: Callable, args: tuple, kwargs: dict
+    ) -> Any:
+        if kind == "tool.execute":
+            request = {"name": kwargs.get("name"), "input": kwargs.get("tool_input")}
+        else:
+            request = _summarize_llm_request(args, kwargs)
+
+        record = {"type": "call", "seq": self._sequence, "kind": kind, "request": request}
+        self._sequence += 1
+        start = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            record["error"] = {"type": type(e).__name__, "message": str(e)}
+            record["duration"] = time.perf_counter() - start
+            self._write(record)
+            raise
+        record["duration"] = time.perf_counter() - start
+        record["response"] = _serialize_response(kind, result)
+        if kind == "llm.ask_tool":
+            from app.llm import get_last_finish_reason
+
+            # 잘린 응답의 인자 복구(`REPAIR_COMPLETED`)가 재생에서도 똑같이 일어나도록
+            record["finish_reason"] = get_last_finish_reason()
+        self._write(record)
+        return result
+
+
+class RunReplayer:
+    """트레이스 파일의 응답을 기록된 순서대로 돌려줍니다.
+
+    Args:
+        path: 트레이스 파일 경로
+        time_scale: 기록된 지연 시간에 곱할 배율 (0이면 대기 없음)
+    """
+
+    def __init__(self, path: Union[str, Path], time_scale: float = 0.0):
+        self.path = Path(path)
+        self.time_scale = time_scale
+        self.header: Dict[str, Any] = {}
+        self._calls: Dict[str, Deque[dict]] = {}
+        self.replayed_calls = 0
+        self.simulated_seconds = 0.0
+        self.mismatches = 0
+
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get("type") == "header":
+                    self.header = record
+                elif record.get("type") == "call":
+                    self._calls.setdefault(record["kind"], deque()).append(record)
+        if self.header.get("version") != TRACE_VERSION:
+            raise ReplayError(f"Unsupported trace version in {self.path}")
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(calls) for calls in self._calls.values())
+
+    @property
+    def recorded_tool_names(self) -> List[str]:
+        """기록된 `tool.execute` 호출의 도구 이름 (처음 등장한 순서)."""
+        names = (
+            record["request"]["name"] for record in self._calls.get("tool.execute", ())
+        )
+        return list(dict.fromkeys(names))
+
+    async def handle(
+        self, kind: str, func: Callable, args: tuple, kwargs: dict
+    ) -> Any:
+        queue = self._calls.get(kind)
+        if not queue:
+            raise ReplayError(f"No recorded `{kind}` call left to replay")
+        record = queue.popleft()
+
+        if kind == "tool.execute" and record["request"]["name"] != kwargs.get("name"):
+            self.mismatches += 1
+            logger.warning(
+                f"Replay mismatch at call {record['seq']}: recorded tool "
+                f"'{record['request']['name']}', agent called '{kwargs.get('name')}'"
+            )
+
+        delay = record.get("duration", 0.0) * self.time_scale
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.simulated_seconds += delay
+        self.replayed_calls += 1
+
+        if kind == "llm.ask_tool":
+            from app.llm import set_last_finish_reason
+
+            set_last_finish_reason(record.get("finish_reason"))
+
+        if "error" in record:
+            raise ReplayError(
+                f"Recorded {record['error']['type']}: {record['error']['message']}"
+            )
+        return _deserialize_response(kind, record.get("response"))
+
+
+_harness: ContextVar[Optional[Union[RunRecorder, RunReplayer]]] = ContextVar(
+    "replay_harness", default=None
+)
+
+
+def recordable(kind: str):
+    """LLM 호출이나 도구 실행을 기록/재생 대상으로 만드는 데코레이터.
+
+    하네스가 없으면 원래 함수를 그대로 호출합니다.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            harness = _harness.get()
+            if harness is None:
+                return await func(*args, **kwargs)
+            return await harness.handle(kind, func, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def record_run(
+    path: Union[str, Path], prompt: Optional[str] = None, agent: Any = None
+) -> Iterator[RunRecorder]:
+    """블록 안의 LLM/도구 호출을 `path`에 기록합니다."""
+    metadata: Dict[str, Any] = {"prompt": prompt}
+    if agent is not None:
+        metadata.update(agent=agent.name, agent_class=type(agent).__name__)
+    recorder = RunRecorder(path, **metadata)
+    token = _harness.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _harness.reset(token)
+        recorder.close()
+
+
+@contextmanager
+def replay_run(
+    path: Union[str, Path], time_scale: float = 0.0
+) -> Iterator[RunReplayer]:
+    """블록 안의 LLM/도구 호출을 `path`의 기록으로 대체합니다."""
+    replayer = RunReplayer(path, time_scale)
+    token = _harness.set(replayer)
+    try:
+        yield replayer
+    finally:
+        _harness.reset(token)
+
+
+async def replay_agent(
+    agent: Any, path: Union[str, Path], time_scale: float = 0.0
+) -> Dict[str, Any]:
+    """기록된 실행을 `agent`로 재생하고 오버헤드 측정 결과를 반환합니다."""
+    with replay_run(path, time_scale) as replayer:
+        prompt = replayer.header.get("prompt")
+        start = time.perf_counter()
+        result = await agent.run(prompt)
+        wall_seconds = time.perf_counter() - start
+
+    steps: List[str] = [line for line in result.split("\n") if line.startswith("Step ")]
+    overhead = wall_seconds - replayer.simulated_seconds
+    return {
+        "steps": len(steps),
+        "replayed_calls": replayer.replayed_calls,
+        "unreplayed_calls": replayer.remaining,
+        "mismatches": replayer.mismatches,
+        "wall_seconds": round(wall_seconds, 4),
+        "simulated_seconds": round(replayer.simulated_seconds, 4),
+        "overhead_seconds": round(overhead, 4),
+        "overhead_per_step_ms": round(overhead / max(len(steps), 1) * 1000, 3),
+    }
+
+
+def add_recorded_tools(agent: Any, names: List[str]) -> List[str]:
+    """`agent`에 없는 기록된 도구(예: MCP 도구)를 자리표시 도구로 등록합니다.
+
+    자리표시 도구의 실행은 트레이스의 기록으로 대체되므로 실제로 호출되지 않습니다.
+    등록한 도구 이름을 반환합니다.
+    """
+    from app.tool.base import BaseTool, ToolResult
+
+    class RecordedTool(BaseTool):
+        description: str = "Tool from the recorded run; results come from the trace."
+        parameters: dict = {"type": "object", "properties": {}}
+
+        async def execute(self, **kwargs) -> ToolResult:
+            raise ReplayError(f"`{self.name}` is only available while replaying")
+
+    tools = getattr(agent, "available_tools", None)
+    if tools is None:
+        return []
+    missing = [name for name in names if name and name not in tools.tool_map]
+    tools.add_tools(*(RecordedTool(name=name) for name in missing))
+    return missing
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded agent run offline")
+    parser.add_argument("trace", help="Trace file written with --record")
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=0.0,
+        help="Multiply recorded latencies by this factor (0 = no waiting)",
+    )
+    args = parser.parse_args()
+
+    import app.agent
+
+    trace = RunReplayer(args.trace)
+    agent_class = getattr(app.agent, trace.header.get("agent_class") or "Manus")
+    # MCP 서버에는 연결하지 않습니다 (도구 호출은 기록으로 대체)
+    agent = agent_class()
+    if hasattr(agent, "_initialized"):
+        agent._initialized = True
+    stubbed = add_recorded_tools(agent, trace.recorded_tool_names)
+    if stubbed:
+        logger.info(f"Replaying recorded tools without a server: {', '.join(stubbed)}")
+    report = await replay_agent(agent, args.trace, args.time_scale)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -13,6 +13,7 @@ from docker.models.containers import Container
 from app.config import SandboxSettings
 from app.sandbox.core.exceptions import SandboxTimeoutError
 from app.sandbox.core.terminal import AsyncDockerizedTerminal
+from app.tracing import span
 
 
 class DockerSandbox:
@@ -155,9 +156,10 @@ class DockerSandbox:
             raise RuntimeError("Sandbox not initialized")
 
         try:
-            return await self.terminal.run_command(
-                cmd, timeout=timeout or self.config.timeout
-            )
+            with span("sandbox.run_command", command=cmd[:200]):
+                return await self.terminal.run_command(
+                    cmd, timeout=timeout or self.config.timeout
+                )
         except TimeoutError:
             raise SandboxTimeoutError(
                 f"Command execution timed out after {timeout or self.config.timeout} seconds"
@@ -1,7 +1,11 @@
+import sys
+from dataclasses import dataclass
 from enum import Enum
 from typing import Any, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, SkipValidation
+
+from app.utils.archival_memory import ArchivalMemory
 
 
 class Role(str, Enum):
@@ -16,6 +20,9 @@ class Role(str, Enum):
 ROLE_VALUES = tuple(role.value for role in Role)
 ROLE_TYPE = Literal[ROLE_VALUES]  # type: ignore
 
+# Role (or its plain string value) -> interned plain string, shared by all records
+_INTERNED_ROLES = {role.value: sys.intern(role.value) for role in Role}
+
 
 class ToolChoice(str, Enum):
     """Tool choice options"""
@@ -155,30 +162,266 @@ class Message(BaseModel):
             **kwargs,
         )
 
+    def to_record(self) -> "MessageRecord":
+        """Convert this validated message to the compact in-memory form"""
+        return MessageRecord(
+            role=self.role,
+            content=self.content,
+            tool_calls=(
+                [
+                    ToolCallRecord(
+                        id=call.id,
+                        function=FunctionRecord(
+                            call.function.name, call.function.arguments
+                        ),
+                        type=call.type,
+                    )
+                    for call in self.tool_calls
+                ]
+                if self.tool_calls is not None
+                else None
+            ),
+            name=self.name,
+            tool_call_id=self.tool_call_id,
+            base64_image=self.base64_image,
+        )
+
+
+# Compact message representation used inside Memory and the agent loop.
+# Pydantic `Message` validation is kept for API edges (external input,
+# checkpoint files); records are trusted and only check their role.
+
+
+@dataclass(slots=True)
+class FunctionRecord:
+    name: str
+    arguments: str
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "arguments": self.arguments}
+
+
+@dataclass(slots=True)
+class ToolCallRecord:
+    """Compact tool call; attribute-compatible with `ToolCall`"""
+
+    id: str
+    function: FunctionRecord
+    type: str = "function"
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "type": self.type, "function": self.function.to_dict()}
+
+    @classmethod
+    def from_raw(cls, call: Any) -> "ToolCallRecord":
+        """Build from an LLM tool call object or its dict form"""
+        if isinstance(call, dict):
+            function = call["function"]
+            return cls(
+                id=call["id"],
+                function=FunctionRecord(function["name"], function["arguments"]),
+                type=call.get("type", "function"),
+            )
+        return cls(
+            id=call.id,
+            function=FunctionRecord(call.function.name, call.function.arguments),
+        )
+
+
+@dataclass(slots=True)
+class MessageRecord:
+    """Slotted, attribute-compatible counterpart of `Message`"""
+
+    role: str
+    content: Optional[str] = None
+    tool_calls: Optional[List[ToolCallRecord]] = None
+    name: Optional[str] = None
+    tool_call_id: Optional[str] = None
+    base64_image: Optional[str] = None
+    # In-memory bookkeeping only (never sent to the LLM): observations with the
+    # same key supersede each other, e.g. views of the same file
+    supersession_key: Optional[str] = None
+    superseded_by: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        try:
+            self.role = _INTERNED_ROLES[self.role]
+        except KeyError:
+            raise ValueError(f"Invalid role: {self.role}")
+
+    def __add__(self, other) -> List["MessageRecord"]:
+        if isinstance(other, list):
+            return [self] + other
+        elif isinstance(other, (Message, MessageRecord)):
+            return [self, other]
+        else:
+            raise TypeError(
+                f"unsupported operand type(s) for +: '{type(self).__name__}' and '{type(other).__name__}'"
+            )
+
+    def __radd__(self, other) -> List["MessageRecord"]:
+        if isinstance(other, list):
+            return other + [self]
+        else:
+            raise TypeError(
+                f"unsupported operand type(s) for +: '{type(other).__name__}' and '{type(self).__name__}'"
+            )
+
+    def to_dict(self) -> dict:
+        """Convert message to dictionary format"""
+        message = {"role": self.role}
+        if self.content is not None:
+            message["content"] = self.content
+        if self.tool_calls is not None:
+            message["tool_calls"] = [call.to_dict() for call in self.tool_calls]
+        if self.name is not None:
+            message["name"] = self.name
+        if self.tool_call_id is not None:
+            message["tool_call_id"] = self.tool_call_id
+        if self.base64_image is not None:
+            message["base64_image"] = self.base64_image
+        return message
+
+    def as_stub(self) -> "MessageRecord":
+        """One-line placeholder for a superseded observation"""
+        return MessageRecord(
+            self.role,
+            f"[Superseded by {self.superseded_by}; the original is archived]",
+            tool_calls=self.tool_calls,
+            name=self.name,
+            tool_call_id=self.tool_call_id,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MessageRecord":
+        """Validate an untrusted message dict (API edge) and convert it"""
+        return Message(**data).to_record()
+
+    @classmethod
+    def user_message(
+        cls, content: str, base64_image: Optional[str] = None
+    ) -> "MessageRecord":
+        """Create a user message"""
+        return cls(Role.USER.value, content, base64_image=base64_image)
+
+    @classmethod
+    def system_message(cls, content: str) -> "MessageRecord":
+        """Create a system message"""
+        return cls(Role.SYSTEM.value, content)
+
+    @classmethod
+    def assistant_message(
+        cls, content: Optional[str] = None, base64_image: Optional[str] = None
+    ) -> "MessageRecord":
+        """Create an assistant message"""
+        return cls(Role.ASSISTANT.value, content, base64_image=base64_image)
+
+    @classmethod
+    def tool_message(
+        cls, content: str, name, tool_call_id: str, base64_image: Optional[str] = None
+    ) -> "MessageRecord":
+        """Create a tool message"""
+        return cls(
+            Role.TOOL.value,
+            content,
+            name=name,
+            tool_call_id=tool_call_id,
+            base64_image=base64_image,
+        )
+
+    @classmethod
+    def from_tool_calls(
+        cls,
+        tool_calls: List[Any],
+        content: Union[str, List[str]] = "",
+        base64_image: Optional[str] = None,
+        **kwargs,
+    ) -> "MessageRecord":
+        """Create an assistant message from raw LLM tool calls without a dict round-trip"""
+        return cls(
+            Role.ASSISTANT.value,
+            content,
+            tool_calls=[ToolCallRecord.from_raw(call) for call in tool_calls],
+            base64_image=base64_image,
+            **kwargs,
+        )
+
+
+def as_record(message: Union[MessageRecord, Message, dict]) -> MessageRecord:
+    """Normalize any supported message form to a `MessageRecord`"""
+    if isinstance(message, MessageRecord):
+        return message
+    if isinstance(message, Message):
+        return message.to_record()
+    if isinstance(message, dict):
+        return MessageRecord.from_dict(message)
+    raise TypeError(f"Unsupported message type: {type(message)}")
+
 
 class Memory(BaseModel):
-    messages: List[Message] = Field(default_factory=list)
+    # Records are trusted, so skip re-validating the list on construction
+    messages: SkipValidation[List[MessageRecord]] = Field(default_factory=list)
     max_messages: int = Field(default=100)
+    # Messages evicted by the limit are indexed here for later recall
+    archive: Optional[ArchivalMemory] = Field(default=None, exclude=True)
+
+    class Config:
+        arbitrary_types_allowed = True
 
-    def add_message(self, message: Message) -> None:
+    def add_message(self, message: Union[MessageRecord, Message]) -> None:
         """Add a message to memory"""
-        self.messages.append(message)
-        # Optional: Implement message limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages :]
+        record = as_record(message)
+        self.messages.append(record)
+        if record.supersession_key:
+            self._supersede(record)
+        self._enforce_limit()
 
-    def add_messages(self, messages: List[Message]) -> None:
+    def add_messages(self, messages: List[Union[MessageRecord, Message]]) -> None:
         """Add multiple messages to memory"""
-        self.messages.extend(messages)
-        # Optional: Implement message limit
+        for message in messages:
+            record = as_record(message)
+            self.messages.append(record)
+            if record.supersession_key:
+                self._supersede(record)
+        self._enforce_limit()
+
+    def _supersede(self, latest: MessageRecord) -> None:
+        """Mark the previous message with the same supersession key as superseded.
+
+        Earlier ones were already marked when that message was added.
+        """
+        for earlier in reversed(self.messages[:-1]):
+            if earlier.supersession_key != latest.supersession_key:
+                continue
+            if earlier.superseded_by is None:
+                earlier.superseded_by = (
+                    f"the later `{latest.name}` result ({latest.tool_call_id})"
+                    if latest.tool_call_id
+                    else "a later message"
+                )
+                # Keep the full original searchable once it stops being sent
+                if self.archive is not None:
+                    self.archive.add_message(earlier)
+            return
+
+    def request_messages(self) -> List[MessageRecord]:
+        """Messages to send to the LLM, with superseded observations stubbed out"""
+        return [
+            message.as_stub() if message.superseded_by else message
+            for message in self.messages
+        ]
+
+    def _enforce_limit(self) -> None:
         if len(self.messages) > self.max_messages:
+            if self.archive is not None:
+                self.archive.add_messages(self.messages[: -self.max_messages])
             self.messages = self.messages[-self.max_messages :]
 
     def clear(self) -> None:
         """Clear all messages"""
         self.messages.clear()
 
-    def get_recent_messages(self, n: int) -> List[Message]:
+    def get_recent_messages(self, n: int) -> List[MessageRecord]:
         """Get n most recent messages"""
         return self.messages[-n:]
 
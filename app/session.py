@@ -0,0 +1,154 @@
+"""
+Session - 세션 범위 상태 관리
+=============================
+한 프로세스에서 여러 세션을 동시에 안전하게 실행할 수 있도록
+프로세스 전역으로 공유되던 상태를 세션 단위로 분리합니다.
+
+세션이 소유하는 상태:
+- LLM 인스턴스(설정 이름별 싱글턴)와 토큰 사용량 카운터
+- 샌드박스 클라이언트
+- 작업 디렉토리(workspace root)
+- 기타 세션 범위 데이터(`data`)
+
+현재 세션은 `contextvars`로 추적되므로, `session_scope()` 안에서 생성된
+asyncio 태스크는 자동으로 같은 세션을 사용합니다. 세션을 지정하지 않으면
+기존 동작과 동일한 프로세스 기본 세션이 사용됩니다.
+
+사용 예:
+    async def handle(prompt: str):
+        with session_scope(Session(workspace_root=project_dir)) as session:
+            agent = await Manus.create()
+            await agent.run(prompt)
+            await session.close()
+"""
+
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, Optional
+
+
+if TYPE_CHECKING:
+    from app.llm import LLM
+    from app.sandbox.client import BaseSandboxClient
+
+
+class Session:
+    """하나의 사용자 세션이 소유하는 프로세스 내 상태.
+
+    Attributes:
+        session_id: 세션 식별자
+        workspace_root: 세션 전용 작업 디렉토리 (None이면 전역 설정 사용)
+        llm_instances: 설정 이름별 LLM 인스턴스
+        data: 세션 범위로 공유되는 기타 데이터
+    """
+
+    def __init__(
+        self, session_id: Optional[str] = None, workspace_root: Optional[Path] = None
+    ):
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        self.workspace_root = Path(workspace_root) if workspace_root else None
+        self.llm_instances: Dict[str, "LLM"] = {}
+        self.data: Dict[str, Any] = {}
+        self._sandbox_client: Optional["BaseSandboxClient"] = None
+        # 진행 중인 에이전트 실행 수 (하위 에이전트, 동시에 실행되는 플랜 단계 포함)
+        self._active_runs = 0
+
+    @property
+    def sandbox_client(self) -> "BaseSandboxClient":
+        """세션 전용 샌드박스 클라이언트를 반환합니다 (최초 사용 시 생성)."""
+        if self._sandbox_client is None:
+            from app.sandbox.client import create_sandbox_client
+
+            self._sandbox_client = create_sandbox_client()
+        return self._sandbox_client
+
+    @property
+    def token_usage(self) -> Dict[str, int]:
+        """세션의 모든 LLM 인스턴스에서 사용한 토큰 합계를 반환합니다."""
+        input_tokens = sum(llm.total_input_tokens for llm in self.llm_instances.values())
+        completion_tokens = sum(
+            llm.total_completion_tokens for llm in self.llm_instances.values()
+        )
+        return {
+            "input_tokens": input_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": input_tokens + completion_tokens,
+        }
+
+    @asynccontextmanager
+    async def run_scope(self) -> AsyncIterator[None]:
+        """에이전트 실행 하나의 범위. 겹치는 실행이 모두 끝났을 때만 샌드박스를 정리합니다.
+
+        하위 에이전트나 동시에 실행되는 플랜 단계는 부모와 같은 샌드박스를 쓰므로,
+        먼저 끝난 실행이 아직 실행 중인 다른 실행의 샌드박스를 지우면 안 됩니다.
+        """
+        self._active_runs += 1
+        try:
+            yield
+        finally:
+            self._active_runs -= 1
+            if self._active_runs == 0:
+                await self.cleanup_sandbox()
+
+    async def cleanup_sandbox(self) -> None:
+        """생성된 샌드박스가 있으면 정리합니다."""
+        if self._sandbox_client is not None:
+            await self._sandbox_client.cleanup()
+
+    async def close(self) -> None:
+        """세션이 소유한 리소스를 모두 정리합니다."""
+        await self.cleanup_sandbox()
+        self.llm_instances.clear()
+        self.data.clear()
+
+
+class _DefaultSession(Session):
+    """세션을 지정하지 않았을 때 사용하는 프로세스 기본 세션.
+
+    기존 전역 `SANDBOX_CLIENT`와 전역 작업 디렉토리를 그대로 사용합니다.
+    """
+
+    @property
+    def sandbox_client(self) -> "BaseSandboxClient":
+        from app.sandbox.client import SANDBOX_CLIENT
+
+        return SANDBOX_CLIENT
+
+    async def cleanup_sandbox(self) -> None:
+        await self.sandbox_client.cleanup()
+
+
+_DEFAULT_SESSION = _DefaultSession(session_id="default")
+_current_session: ContextVar[Optional[Session]] = ContextVar(
+    "current_session", default=None
+)
+
+
+def current_session() -> Session:
+    """현재 컨텍스트의 세션을 반환합니다. 없으면 프로세스 기본 세션을 반환합니다."""
+    return _current_session.get() or _DEFAULT_SESSION
+
+
+def is_default_session(session: Optional[Session] = None) -> bool:
+    """주어진(또는 현재) 세션이 프로세스 기본 세션인지 확인합니다."""
+    return (session or current_session()) is _DEFAULT_SESSION
+
+
+@contextmanager
+def session_scope(session: Optional[Session] = None) -> Iterator[Session]:
+    """블록 안에서 `session`을 현재 세션으로 설정합니다.
+
+    Args:
+        session: 사용할 세션 (None이면 새 세션 생성)
+
+    Yields:
+        Session: 활성화된 세션
+    """
+    session = session or Session()
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
@@ -1,5 +1,7 @@
+from app.tool.background_jobs import JobResult, JobStatus
 from app.tool.base import BaseTool
 from app.tool.bash import Bash
+from app.tool.blob_reader import ReadBlob
 from app.tool.browser_use_tool import BrowserUseTool
 from app.tool.context_packager import ContextPackager
 from app.tool.crawl4ai import Crawl4aiTool
@@ -20,7 +22,10 @@ __all__ = [
     "Crawl4aiTool",
     "CreateChatCompletion",
     "DesignDocumentTool",
+    "JobResult",
+    "JobStatus",
     "PlanningTool",
+    "ReadBlob",
     "StrReplaceEditor",
     "Terminate",
     "ToolCollection",
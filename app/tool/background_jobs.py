@@ -0,0 +1,280 @@
+"""
+Background Jobs - 백그라운드 도구 작업
+======================================
+오래 걸리는 도구 호출(`bash` 빌드, 여러 URL 크롤링 등)을 백그라운드 작업으로 실행하고
+즉시 작업 핸들을 돌려줍니다. 에이전트는 그동안 다른 작업을 계획하거나 수행할 수 있습니다.
+
+- 백그라운드 실행을 지원하는 도구(`BaseTool.supports_background`)는 도구 스키마에
+  `run_in_background` 인자가 추가됨 (`ToolCollection.to_params`)
+- `job_status`: 작업 목록/상태 조회 및 취소 (스트리밍 도구는 최근 부분 출력 포함)
+- `job_result`: 작업 결과 조회 (선택적으로 완료될 때까지 대기, 실행 중이면 부분 출력)
+- 완료된 작업은 다음 `think` 전에 에이전트에게 알림 메시지로 전달
+
+사용 예:
+    bash(command="npm run build", run_in_background=true)
+    -> Started background job `job-1` ...
+    job_result(job_id="job-1", wait_seconds=60)
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Dict, List, Optional
+
+from pydantic import Field
+
+from app.exceptions import ToolError
+from app.logger import logger
+from app.tool.base import BaseTool, ToolFailure, ToolProgress, ToolResult
+
+
+BACKGROUND_PARAMETER = "run_in_background"
+BACKGROUND_PARAMETER_SCHEMA = {
+    "type": "boolean",
+    "description": (
+        "Start this call as a background job and return a job id immediately. "
+        "Use it for slow calls so you can keep working; you are notified when "
+        "the job finishes, and `job_result` returns its output."
+    ),
+}
+MAX_WAIT_SECONDS = 600
+# Upper bound for any background job; the tool's `cancel` hook runs when it expires
+JOB_TIMEOUT = 3600.0
+# Partial output kept per running job (the latest characters)
+PARTIAL_OUTPUT_CHARS = 2000
+
+
+@dataclass
+class BackgroundJob:
+    """백그라운드에서 실행 중이거나 끝난 도구 호출 하나."""
+
+    job_id: str
+    tool: str
+    arguments: Dict[str, Any]
+    task: asyncio.Task
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    notified: bool = False
+    # Latest partial output and status of a streaming tool while it runs
+    partial_output: str = ""
+    progress_message: Optional[str] = None
+
+    def record(self, update: ToolProgress) -> None:
+        text = update.output + update.error
+        if text:
+            self.partial_output = (self.partial_output + text)[-PARTIAL_OUTPUT_CHARS:]
+        if update.message:
+            self.progress_message = update.message
+
+    @property
+    def done(self) -> bool:
+        return self.task.done()
+
+    @property
+    def status(self) -> str:
+        if not self.task.done():
+            return "running"
+        if self.task.cancelled():
+            return "cancelled"
+        if self.task.exception() is not None:
+            return "failed"
+        result = self.task.result()
+        return "failed" if getattr(result, "error", None) else "completed"
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def result(self) -> Any:
+        """완료된 작업의 결과 (실패/취소 시 `ToolFailure`)."""
+        if self.task.cancelled():
+            return ToolFailure(error=f"Job {self.job_id} was cancelled")
+        error = self.task.exception()
+        if isinstance(error, ToolError):
+            return ToolFailure(error=error.message)
+        if error is not None:
+            return ToolFailure(error=f"{type(error).__name__}: {error}")
+        return self.task.result()
+
+    def describe(self) -> str:
+        arguments = ", ".join(f"{k}={v!r}" for k, v in self.arguments.items())
+        if len(arguments) > 120:
+            arguments = arguments[:117] + "..."
+        line = (
+            f"{self.job_id}  {self.status:<9}  {self.elapsed:7.1f}s  "
+            f"{self.tool}({arguments})"
+        )
+        if self.progress_message and not self.done:
+            line += f"  [{self.progress_message}]"
+        return line
+
+    def describe_partial(self) -> str:
+        """Status line plus the latest partial output of a running job."""
+        if not self.partial_output:
+            return self.describe()
+        return f"{self.describe()}\nLatest output:\n{self.partial_output.rstrip()}"
+
+
+class JobManager:
+    """에이전트 하나의 백그라운드 작업을 관리합니다.
+
+    Args:
+        max_running: 동시에 실행할 수 있는 최대 작업 수
+    """
+
+    def __init__(self, max_running: int = 4):
+        self.max_running = max_running
+        self.jobs: Dict[str, BackgroundJob] = {}
+        self._counter = 0
+
+    @property
+    def running(self) -> List[BackgroundJob]:
+        return [job for job in self.jobs.values() if not job.done]
+
+    def start(
+        self, tool: str, arguments: Dict[str, Any], coroutine: Awaitable[Any]
+    ) -> BackgroundJob:
+        if len(self.running) >= self.max_running:
+            coroutine.close()
+            raise ToolError(
+                f"Too many background jobs running ({self.max_running}); "
+                "wait for one with `job_result` or cancel one with `job_status`"
+            )
+        self._counter += 1
+        job_id = f"job-{self._counter}"
+        task = asyncio.create_task(coroutine, name=f"background-{job_id}")
+        job = BackgroundJob(job_id=job_id, tool=tool, arguments=arguments, task=task)
+        task.add_done_callback(lambda _: self._on_done(job))
+        self.jobs[job_id] = job
+        logger.info(f"⏳ Started background job {job_id} ({tool})")
+        return job
+
+    @staticmethod
+    def _on_done(job: BackgroundJob) -> None:
+        job.finished_at = time.monotonic()
+        logger.info(f"✅ Background job {job.job_id} ({job.tool}) {job.status}")
+
+    def get(self, job_id: str) -> BackgroundJob:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise ToolError(f"Unknown job id: {job_id}")
+        return job
+
+    def pop_finished(self) -> List[BackgroundJob]:
+        """아직 알리지 않은 완료된 작업을 반환하고 알림 처리합니다."""
+        finished = [job for job in self.jobs.values() if job.done and not job.notified]
+        for job in finished:
+            job.notified = True
+        return finished
+
+    def cancel_all(self) -> None:
+        for job in self.running:
+            job.task.cancel()
+
+    async def shutdown(self) -> None:
+        """실행 중인 작업을 모두 취소하고 종료를 기다립니다."""
+        running = self.running
+        self.cancel_all()
+        if running:
+            await asyncio.gather(*(job.task for job in running), return_exceptions=True)
+
+    def clear(self) -> None:
+        self.cancel_all()
+        self.jobs.clear()
+        self._counter = 0
+
+
+class JobStatus(BaseTool):
+    """백그라운드 작업 상태 조회/취소 도구."""
+
+    name: str = "job_status"
+    description: str = (
+        "List background jobs with their status and running time, or show one job "
+        "(with its latest output while it runs). Set `cancel` to stop a running job, "
+        "e.g. once its output shows what you needed."
+    )
+    parameters: dict = {
+        "type": "object",
+        "properties": {
+            "job_id": {
+                "type": "string",
+                "description": "(optional) Job to show. Omit to list all jobs.",
+            },
+            "cancel": {
+                "type": "boolean",
+                "description": "(optional) Cancel the given running job.",
+            },
+        },
+    }
+
+    manager: JobManager = Field(default_factory=JobManager, exclude=True)
+
+    def modified_paths(self, **kwargs) -> Optional[List[str]]:
+        return []
+
+    async def execute(
+        self, job_id: Optional[str] = None, cancel: bool = False, **kwargs
+    ) -> ToolResult:
+        if job_id is None:
+            if not self.manager.jobs:
+                return ToolResult(output="No background jobs.")
+            return ToolResult(
+                output="\n".join(job.describe() for job in self.manager.jobs.values())
+            )
+
+        job = self.manager.get(job_id)
+        if cancel and not job.done:
+            job.task.cancel()
+            return ToolResult(output=f"Cancellation requested for {job_id}.")
+        return ToolResult(output=job.describe_partial())
+
+    async def cleanup(self) -> None:
+        await self.manager.shutdown()
+
+
+class JobResult(BaseTool):
+    """백그라운드 작업 결과 조회 도구."""
+
+    name: str = "job_result"
+    description: str = (
+        "Get the output of a background job. If the job is still running, "
+        "optionally wait up to `wait_seconds` for it to finish; a running job "
+        "shows its latest output so far."
+    )
+    parameters: dict = {
+        "type": "object",
+        "properties": {
+            "job_id": {
+                "type": "string",
+                "description": "The job id returned when the job was started.",
+            },
+            "wait_seconds": {
+                "type": "number",
+                "description": f"(optional) Seconds to wait for a running job (max {MAX_WAIT_SECONDS}). Default 0.",
+            },
+        },
+        "required": ["job_id"],
+    }
+
+    manager: JobManager = Field(default_factory=JobManager, exclude=True)
+
+    def modified_paths(self, **kwargs) -> Optional[List[str]]:
+        return []
+
+    async def execute(
+        self, job_id: str, wait_seconds: float = 0, **kwargs
+    ) -> Any:
+        job = self.manager.get(job_id)
+        if not job.done and wait_seconds > 0:
+            await asyncio.wait({job.task}, timeout=min(wait_seconds, MAX_WAIT_SECONDS))
+        if not job.done:
+            partial = (
+                f"\nLatest output so far:\n{job.partial_output.rstrip()}"
+                if job.partial_output
+                else ""
+            )
+            return ToolResult(
+                output=f"Job {job_id} is still running ({job.elapsed:.1f}s).{partial}"
+            )
+        job.notified = True
+        return job.result()
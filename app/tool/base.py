@@ -1,12 +1,18 @@
+import asyncio
 import json
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Union
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field
 
+from app.exceptions import ToolError
 from app.logger import logger
 
 
+# Seconds a `cancel` hook may take before it is abandoned
+CANCEL_GRACE_SECONDS = 10.0
+
+
 # class BaseTool(ABC, BaseModel):
 #     name: str
 #     description: str
@@ -75,6 +81,44 @@ class ToolResult(BaseModel):
         return type(self)(**{**self.dict(), **kwargs})
 
 
+class ToolProgress(BaseModel):
+    """A partial update yielded by a streaming tool call (see `BaseTool.stream`)."""
+
+    # New output since the previous update
+    output: str = Field(default="")
+    error: str = Field(default="")
+    # Short status line, e.g. "Crawled 3/20 URLs"
+    message: Optional[str] = Field(default=None)
+    # Fraction of the work done (0-1), when known
+    progress: Optional[float] = Field(default=None)
+
+
+# Receives each update of a streaming call; returning a reason stops the call early
+ProgressCallback = Callable[[ToolProgress], Optional[str]]
+
+
+class ToolDescriptor(BaseModel):
+    """A tool's name and schema, read from its class without constructing it."""
+
+    name: str
+    description: str
+    parameters: Optional[dict] = None
+
+    def to_param(self) -> Dict:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters,
+            },
+        }
+
+
+# Descriptors per tool class (class-level defaults never change after import)
+_DESCRIPTORS: Dict[type, ToolDescriptor] = {}
+
+
 class BaseTool(ABC, BaseModel):
     """Consolidated base class for all tools combining BaseModel and Tool functionality.
 
@@ -94,6 +138,9 @@ class BaseTool(ABC, BaseModel):
     name: str
     description: str
     parameters: Optional[dict] = None
+    # Seconds a call may run before it is cancelled (None for no limit);
+    # see `timeout_for` and `call_with_timeout`
+    default_timeout: Optional[float] = None
     # _schemas: Dict[str, List[ToolSchema]] = {}
 
     class Config:
@@ -113,6 +160,31 @@ class BaseTool(ABC, BaseModel):
     #             self._schemas[name] = method.tool_schemas
     #             logger.debug(f"Registered schemas for method '{name}' in {self.__class__.__name__}")
 
+    @classmethod
+    def descriptor(cls) -> ToolDescriptor:
+        """The tool's name and schema from its class defaults.
+
+        Use this (or `tool_name`) instead of `SomeTool().name`: constructing a
+        tool may build clients, sessions and an LLM just to read a string.
+        """
+        descriptor = _DESCRIPTORS.get(cls)
+        if descriptor is None:
+            fields = cls.model_fields
+            if fields["name"].is_required() or fields["description"].is_required():
+                raise TypeError(f"{cls.__name__} does not define a default name")
+            descriptor = ToolDescriptor(
+                name=fields["name"].default,
+                description=fields["description"].default,
+                parameters=fields["parameters"].get_default(call_default_factory=True),
+            )
+            _DESCRIPTORS[cls] = descriptor
+        return descriptor
+
+    @classmethod
+    def tool_name(cls) -> str:
+        """The tool's name, without constructing the tool."""
+        return cls.descriptor().name
+
     async def __call__(self, **kwargs) -> Any:
         """Execute the tool with given parameters."""
         return await self.execute(**kwargs)
@@ -121,6 +193,95 @@ class BaseTool(ABC, BaseModel):
     async def execute(self, **kwargs) -> Any:
         """Execute the tool with given parameters."""
 
+    async def stream(self, **kwargs) -> AsyncIterator[Any]:
+        """Execute the tool, yielding `ToolProgress` updates and then the result.
+
+        Tools with long-running calls override this and implement `execute`
+        as `await self.collect_stream(**kwargs)`. The default yields only the
+        result of `execute`.
+        """
+        yield await self.execute(**kwargs)
+
+    def supports_streaming(self) -> bool:
+        """Whether the tool reports partial output while a call runs."""
+        return type(self).stream is not BaseTool.stream
+
+    async def collect_stream(
+        self, on_progress: Optional[ProgressCallback] = None, **kwargs
+    ) -> Any:
+        """Run `stream` to completion and return its result.
+
+        Each update is passed to `on_progress`. When it returns a reason, the
+        call is stopped (the `cancel` hook runs) and the output seen so far is
+        returned instead of the final result.
+        """
+        output: List[str] = []
+        error: List[str] = []
+        result = reason = None
+        updates = self.stream(**kwargs)
+        try:
+            async for item in updates:
+                if not isinstance(item, ToolProgress):
+                    result = item
+                    continue
+                output.append(item.output)
+                error.append(item.error)
+                if on_progress is not None:
+                    reason = on_progress(item)
+                    if reason:
+                        break
+        finally:
+            await updates.aclose()
+        if not reason:
+            return result
+
+        note = await self._cancel_call(kwargs)
+        # Stopping on request is not a failure: report stdout, stderr and why in one output
+        parts = ["".join(output).rstrip("\n"), "".join(error).rstrip("\n")]
+        parts.append(f"(Stopped early: {reason}." + (f" {note})" if note else ")"))
+        return ToolResult(output="\n".join(part for part in parts if part))
+
+    async def call_with_timeout(
+        self,
+        call_timeout: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        **kwargs,
+    ) -> Any:
+        """Execute the tool, cancelling it when it runs over its time limit.
+
+        Args:
+            call_timeout: Limit for this call; defaults to `timeout_for(**kwargs)`
+            on_progress: Receives partial updates of streaming tools (see `collect_stream`)
+            **kwargs: Tool arguments
+
+        Raises:
+            ToolError: If the call timed out. The `cancel` hook has been run by then.
+        """
+        limit = call_timeout if call_timeout is not None else self.timeout_for(**kwargs)
+        scope = asyncio.timeout(limit)
+        try:
+            async with scope:
+                if on_progress is not None and self.supports_streaming():
+                    return await self.collect_stream(on_progress, **kwargs)
+                return await self(**kwargs)
+        except TimeoutError:
+            if not scope.expired():
+                raise  # Raised by the tool itself, not by our limit
+            note = await self._cancel_call(kwargs)
+            message = f"Tool `{self.name}` timed out after {limit:g}s and was cancelled."
+            raise ToolError(f"{message} {note}" if note else message) from None
+        except asyncio.CancelledError:
+            # Stop whatever the call started (e.g. a job or the whole run was cancelled)
+            await asyncio.shield(self._cancel_call(kwargs))
+            raise
+
+    async def _cancel_call(self, kwargs: Dict[str, Any]) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self.cancel(**kwargs), CANCEL_GRACE_SECONDS)
+        except Exception as e:
+            logger.warning(f"Error cancelling '{self.name}' call: {e}")
+            return None
+
     def to_param(self) -> Dict:
         """Convert tool to function call format.
 
@@ -136,6 +297,90 @@ class BaseTool(ABC, BaseModel):
             },
         }
 
+    def dump_state(self) -> Optional[Dict[str, Any]]:
+        """Return the tool's mutable state for run checkpoints.
+
+        Returns:
+            A JSON-serializable dictionary, or None for stateless tools
+        """
+        return None
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restore state previously returned by `dump_state`."""
+
+    def is_idempotent(self, **kwargs) -> bool:
+        """Whether a call with these arguments is read-only and may be memoized.
+
+        Memoized results are reused for identical calls within a run until
+        they are invalidated (see `dependent_paths` and `modified_paths`).
+        """
+        return False
+
+    def dependent_paths(self, **kwargs) -> List[str]:
+        """Files whose modification invalidates a memoized result of this call."""
+        return []
+
+    def modified_paths(self, **kwargs) -> Optional[List[str]]:
+        """Paths a non-idempotent call may modify.
+
+        Returns:
+            The affected paths, an empty list if the call never touches files,
+            or None if it may modify any file (e.g. shell commands)
+        """
+        return None
+
+    def verbatim_output(self) -> bool:
+        """Whether outputs are file or command content the agent copies verbatim.
+
+        Such outputs (e.g. text later used as a `str_replace` `old_str`) skip
+        the lossy observation compression steps (repeat collapsing, JSON
+        minification).
+        """
+        return False
+
+    def timeout_for(self, **kwargs) -> Optional[float]:
+        """Time limit in seconds for a call with these arguments (None for no limit)."""
+        return self.default_timeout
+
+    async def cancel(self, **kwargs) -> Optional[str]:
+        """Stop what a timed-out or cancelled call left running.
+
+        Tools override this to kill subprocess groups, close browser pages or
+        stop sandbox sessions.
+
+        Returns:
+            An optional note for the model about what was reset
+        """
+        return None
+
+    def supports_background(self) -> bool:
+        """Whether calls may run as background jobs (`run_in_background`)."""
+        return False
+
+    def background_instance(self) -> "BaseTool":
+        """The instance a background job runs on.
+
+        Tools with per-instance sessions return a fresh instance so the
+        foreground one stays usable; it is cleaned up when the job ends.
+        """
+        return self
+
+    def supersession_key(self, **kwargs) -> Optional[str]:
+        """Key shared by calls whose newest observation makes older ones obsolete.
+
+        Older observations with the same key are replaced by a one-line stub
+        in outgoing requests (e.g. earlier full views of the same file).
+        """
+        return None
+
+    def memo_version(self) -> Any:
+        """A value that changes whenever state read by memoized calls changes.
+
+        Tools whose state can also be changed outside `ToolCollection.execute`
+        override this so stale memoized results are detected.
+        """
+        return None
+
     # def get_schemas(self) -> Dict[str, List[ToolSchema]]:
     #     """Get all registered tool schemas.
 
@@ -179,3 +424,9 @@ class CLIResult(ToolResult):
 
 class ToolFailure(ToolResult):
     """A ToolResult that represents a failure."""
+
+
+class CachedToolResult(ToolResult):
+    """A ToolResult reused from an earlier identical call in the same run."""
+
+    source_call_id: Optional[str] = Field(default=None)
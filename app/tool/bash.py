@@ -3,18 +3,26 @@ from __future__ import annotations
 import asyncio
 
 import os
-from typing import Optional
+import signal
+from typing import AsyncIterator, Optional, Union
 
 from app.exceptions import ToolError
-from app.tool.base import BaseTool, CLIResult
+from app.tool.base import BaseTool, CLIResult, ToolProgress
 
 
 _BASH_DESCRIPTION = """Execute a bash command in the terminal.
 * Long running commands: For commands that may run indefinitely, it should be run in the background and the output should be redirected to a file, e.g. command = `python3 app.py > server.log 2>&1 &`.
 * Interactive: If a bash command returns exit code `-1`, this means the process is not yet finished. The assistant must then send a second call to terminal with an empty `command` (which will retrieve any additional logs), or it can send additional text (set `command` to the text) to STDIN of the running process, or it can send command=`ctrl+c` to interrupt the process.
-* Timeout: If a command execution result says "Command timed out. Sending SIGINT to the process", the assistant should retry running the command in the background.
+* Timeout: Commands are killed after {default_timeout:.0f} seconds unless `timeout` is set (max {max_timeout:.0f}). A timed-out command kills the shell, and the next call starts a fresh one (working directory and environment are reset). Run long commands in the background instead.
+* Background jobs: When `run_in_background` is set, the command runs in a separate shell that starts in the default directory (so `cd` first) with a {timeout:.0f}-second timeout.
 """
 
+# Timeout for commands run as background jobs
+BACKGROUND_TIMEOUT = 1800.0
+# Foreground commands: default and largest per-call `timeout`
+DEFAULT_TIMEOUT = 120.0
+MAX_TIMEOUT = 1800.0
+
 
 class _BashSession:
     """A session of a bash shell."""
@@ -24,12 +32,15 @@ class _BashSession:
 
     command: str = "/bin/bash"
     _output_delay: float = 0.2  # seconds
-    _timeout: float = 120.0  # seconds
+    # None: no limit of its own (foreground calls are limited by `Bash.timeout_for`)
+    _timeout: Optional[float] = None  # seconds
     _sentinel: str = "<<exit>>"
 
-    def __init__(self):
+    def __init__(self, timeout: Optional[float] = None):
         self._started = False
         self._timed_out = False
+        if timeout is not None:
+            self._timeout = timeout
 
     async def start(self):
         if self._started:
@@ -55,15 +66,41 @@ class _BashSession:
             return
         self._process.terminate()
 
+    async def kill(self) -> None:
+        """Kill the shell and everything it started (its whole process group)."""
+        if not self._started:
+            return
+        process = self._process
+        try:
+            # The shell is started with setsid, so its pid is the process group id
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await process.wait()
+        process._transport.close()  # pyright: ignore[reportAttributeAccessIssue]
+
     async def run(self, command: str):
         """Execute a command in the bash shell."""
+        result = None
+        async for item in self.stream(command):
+            result = item
+        return result
+
+    async def stream(
+        self, command: str
+    ) -> AsyncIterator[Union[ToolProgress, CLIResult]]:
+        """Execute a command, yielding complete lines of output as they arrive.
+
+        The last item is the `CLIResult` of the whole command.
+        """
         if not self._started:
             raise ToolError("Session has not started.")
         if self._process.returncode is not None:
-            return CLIResult(
+            yield CLIResult(
                 system="tool must be restarted",
                 error=f"bash has exited with returncode {self._process.returncode}",
             )
+            return
         if self._timed_out:
             raise ToolError(
                 f"timed out: bash has not returned in {self._timeout} seconds and must be restarted",
@@ -81,23 +118,36 @@ class _BashSession:
         await self._process.stdin.drain()
 
         # read output from the process, until the sentinel is found
+        stdout_buffer = self._process.stdout._buffer  # pyright: ignore[reportAttributeAccessIssue]
+        stderr_buffer = self._process.stderr._buffer  # pyright: ignore[reportAttributeAccessIssue]
+        sent_output = sent_error = 0
         try:
             async with asyncio.timeout(self._timeout):
                 while True:
                     await asyncio.sleep(self._output_delay)
                     # if we read directly from stdout/stderr, it will wait forever for
                     # EOF. use the StreamReader buffer directly instead.
-                    output = (
-                        self._process.stdout._buffer.decode()
-                    )  # pyright: ignore[reportAttributeAccessIssue]
+                    # (a multi-byte character may still be incomplete at the end)
+                    output = stdout_buffer.decode(errors="ignore")
                     if self._sentinel in output:
                         # strip the sentinel and break
                         output = output[: output.index(self._sentinel)]
                         break
+                    # Report only complete lines: the sentinel may be half written
+                    error = stderr_buffer.decode(errors="ignore")
+                    output_end = output.rfind("\n") + 1
+                    error_end = error.rfind("\n") + 1
+                    if output_end > sent_output or error_end > sent_error:
+                        yield ToolProgress(
+                            output=output[sent_output:output_end],
+                            error=error[sent_error:error_end],
+                        )
+                        sent_output, sent_error = output_end, error_end
         except asyncio.TimeoutError:
             self._timed_out = True
+            await self.kill()
             raise ToolError(
-                f"timed out: bash has not returned in {self._timeout} seconds and must be restarted",
+                f"timed out: bash has not returned in {self._timeout} seconds; the shell was killed",
             ) from None
 
         if output.endswith("\n"):
@@ -110,17 +160,21 @@ class _BashSession:
             error = error[:-1]
 
         # clear the buffers so that the next output can be read correctly
-        self._process.stdout._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
-        self._process.stderr._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
+        stdout_buffer.clear()
+        stderr_buffer.clear()
 
-        return CLIResult(output=output, error=error)
+        yield CLIResult(output=output, error=error)
 
 
 class Bash(BaseTool):
     """A tool for executing bash commands"""
 
     name: str = "bash"
-    description: str = _BASH_DESCRIPTION
+    description: str = _BASH_DESCRIPTION.format(
+        timeout=BACKGROUND_TIMEOUT,
+        default_timeout=DEFAULT_TIMEOUT,
+        max_timeout=MAX_TIMEOUT,
+    )
     parameters: dict = {
         "type": "object",
         "properties": {
@@ -128,31 +182,89 @@ class Bash(BaseTool):
                 "type": "string",
                 "description": "The bash command to execute. Can be empty to view additional logs when previous exit code is `-1`. Can be `ctrl+c` to interrupt the currently running process.",
             },
+            "timeout": {
+                "type": "number",
+                "description": f"(optional) Seconds before the command is killed. Default {DEFAULT_TIMEOUT:.0f}, max {MAX_TIMEOUT:.0f}.",
+                "exclusiveMinimum": 0,
+            },
         },
         "required": ["command"],
     }
+    default_timeout: Optional[float] = DEFAULT_TIMEOUT
 
     _session: Optional[_BashSession] = None
+    _session_timeout: Optional[float] = None
+
+    def verbatim_output(self) -> bool:
+        return True
+
+    def supports_background(self) -> bool:
+        return True
+
+    def background_instance(self) -> "Bash":
+        # A separate shell, so the foreground session stays usable meanwhile
+        instance = Bash()
+        instance._session_timeout = BACKGROUND_TIMEOUT
+        return instance
+
+    def timeout_for(self, timeout: Optional[float] = None, **kwargs) -> Optional[float]:
+        if timeout:
+            return min(float(timeout), MAX_TIMEOUT)
+        return self.default_timeout
+
+    async def cancel(self, **kwargs) -> Optional[str]:
+        """Kill the hung command together with its shell."""
+        session, self._session = self._session, None
+        if session is None:
+            return None
+        await session.kill()
+        return (
+            "The shell was killed and the next call starts a fresh one "
+            "(working directory and environment variables are reset)."
+        )
+
+    async def cleanup(self) -> None:
+        """Terminate the shell and wait for it to exit."""
+        session, self._session = self._session, None
+        if session is None or not session._started:
+            return
+        process = session._process
+        # EOF on stdin ends the shell right away; SIGTERM alone may be ignored
+        process.stdin.close()
+        session.stop()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+        # Close the pipes now rather than when the transport is collected
+        process._transport.close()  # pyright: ignore[reportAttributeAccessIssue]
 
     async def execute(
         self, command: str | None = None, restart: bool = False, **kwargs
     ) -> CLIResult:
+        return await self.collect_stream(command=command, restart=restart, **kwargs)
+
+    async def stream(
+        self, command: str | None = None, restart: bool = False, **kwargs
+    ) -> AsyncIterator[Union[ToolProgress, CLIResult]]:
         if restart:
             if self._session:
                 self._session.stop()
-            self._session = _BashSession()
+            self._session = _BashSession(timeout=self._session_timeout)
             await self._session.start()
 
-            return CLIResult(system="tool has been restarted.")
+            yield CLIResult(system="tool has been restarted.")
+            return
 
-        if self._session is None:
-            self._session = _BashSession()
+        if self._session is None or self._session._timed_out:
+            self._session = _BashSession(timeout=self._session_timeout)
             await self._session.start()
 
-        if command is not None:
-            return await self._session.run(command)
-
-        raise ToolError("no command provided.")
+        if command is None:
+            raise ToolError("no command provided.")
+        async for item in self._session.stream(command):
+            yield item
 
 
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+"""
+Read Blob Tool - 저장된 대용량 출력 조회 도구
+=============================================
+`BlobStore`에 보관된 도구 출력을 오프셋, 줄 범위, grep 방식으로
+페이지 단위로 읽어옵니다.
+"""
+
+import re
+from typing import Optional
+
+from pydantic import Field
+
+from app.exceptions import ToolError
+from app.tool.base import BaseTool, ToolResult
+from app.utils.blob_store import BlobStore
+
+
+_READ_BLOB_DESCRIPTION = """Read a stored tool output by its handle (e.g. `blob:3f2a9c0d1e4b5a67`).
+Large tool outputs are kept out of the conversation and replaced by a short preview plus a handle.
+Use this tool to page through the full content:
+* `offset`/`length`: read a character window of the blob
+* `start_line`/`end_line`: read a 1-based inclusive line range (shown with line numbers)
+* `grep`: list the lines matching a regular expression (with optional `context` lines)
+"""
+
+MAX_READ_CHARS = 8000
+MAX_GREP_MATCHES = 200
+
+
+class ReadBlob(BaseTool):
+    """A tool for paging through large tool outputs kept in the blob store."""
+
+    name: str = "read_blob"
+    description: str = _READ_BLOB_DESCRIPTION
+    parameters: dict = {
+        "type": "object",
+        "properties": {
+            "handle": {
+                "type": "string",
+                "description": "The blob handle shown in the truncated observation, e.g. `blob:3f2a9c0d1e4b5a67`.",
+            },
+            "offset": {
+                "type": "integer",
+                "description": "Character offset to start reading from (0-based).",
+            },
+            "length": {
+                "type": "integer",
+                "description": f"Number of characters to read. Defaults to and is capped at {MAX_READ_CHARS}.",
+            },
+            "start_line": {
+                "type": "integer",
+                "description": "First line to read (1-based, inclusive).",
+            },
+            "end_line": {
+                "type": "integer",
+                "description": "Last line to read (1-based, inclusive). Use -1 for the end of the blob.",
+            },
+            "grep": {
+                "type": "string",
+                "description": "Regular expression; only matching lines are returned with their line numbers.",
+            },
+            "context": {
+                "type": "integer",
+                "description": "Number of context lines to show around each grep match. Defaults to 0.",
+            },
+        },
+        "required": ["handle"],
+    }
+
+    blob_store: BlobStore = Field(default_factory=BlobStore, exclude=True)
+
+    def verbatim_output(self) -> bool:
+        return True
+
+    def is_idempotent(self, **kwargs) -> bool:
+        # Blobs are content-addressed and never change once stored
+        return True
+
+    async def execute(
+        self,
+        handle: str,
+        offset: Optional[int] = None,
+        length: Optional[int] = None,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        grep: Optional[str] = None,
+        context: int = 0,
+        **kwargs,
+    ) -> ToolResult:
+        """Read a window of a stored blob."""
+        try:
+            text = self.blob_store.get(handle)
+        except (ValueError, FileNotFoundError) as e:
+            raise ToolError(str(e))
+
+        if grep:
+            return ToolResult(output=self._grep(text, grep, context or 0))
+        if start_line is not None or end_line is not None:
+            return ToolResult(output=self._read_lines(text, start_line, end_line))
+        return ToolResult(output=self._read_chars(text, offset or 0, length))
+
+    @staticmethod
+    def _read_chars(text: str, offset: int, length: Optional[int]) -> str:
+        if offset < 0 or offset > len(text):
+            raise ToolError(
+                f"Invalid `offset`: {offset}. It should be within [0, {len(text)}]."
+            )
+        length = min(length or MAX_READ_CHARS, MAX_READ_CHARS)
+        chunk = text[offset : offset + length]
+        end = offset + len(chunk)
+        footer = (
+            f"\n[chars {offset}-{end} of {len(text)}; continue with offset={end}]"
+            if end < len(text)
+            else f"\n[chars {offset}-{end} of {len(text)}; end of blob]"
+        )
+        return chunk + footer
+
+    @staticmethod
+    def _read_lines(
+        text: str, start_line: Optional[int], end_line: Optional[int]
+    ) -> str:
+        lines = text.split("\n")
+        start = start_line or 1
+        end = len(lines) if end_line in (None, -1) else end_line
+        if start < 1 or start > len(lines):
+            raise ToolError(
+                f"Invalid `start_line`: {start}. It should be within [1, {len(lines)}]."
+            )
+        if end < start:
+            raise ToolError(
+                f"Invalid `end_line`: {end}. It should be larger or equal than `start_line` {start}."
+            )
+
+        output, size = [], 0
+        for number in range(start, min(end, len(lines)) + 1):
+            line = f"{number:6}\t{lines[number - 1]}"
+            if size + len(line) > MAX_READ_CHARS:
+                output.append(
+                    f"[output capped at {MAX_READ_CHARS} chars; continue with start_line={number}]"
+                )
+                break
+            output.append(line)
+            size += len(line) + 1
+        return "\n".join(output)
+
+    @staticmethod
+    def _grep(text: str, pattern: str, context: int) -> str:
+        try:
+            regex = re.compile(pattern)
+        except re.error as e:
+            raise ToolError(f"Invalid `grep` pattern: {e}")
+
+        lines = text.split("\n")
+        matches = [i for i, line in enumerate(lines) if regex.search(line)]
+        if not matches:
+            return f"No lines matching `{pattern}`."
+
+        shown, output, size = set(), [], 0
+        for index in matches[:MAX_GREP_MATCHES]:
+            for i in range(max(0, index - context), min(len(lines), index + context + 1)):
+                if i in shown:
+                    continue
+                shown.add(i)
+                marker = ":" if i == index else "-"
+                line = f"{i + 1:6}{marker}\t{lines[i]}"
+                if size + len(line) > MAX_READ_CHARS:
+                    output.append(f"[output capped at {MAX_READ_CHARS} chars]")
+                    return "\n".join(output)
+                output.append(line)
+                size += len(line) + 1
+
+        header = f"{len(matches)} matching line(s) for `{pattern}`"
+        if len(matches) > MAX_GREP_MATCHES:
+            header += f" (showing first {MAX_GREP_MATCHES})"
+        return header + ":\n" + "\n".join(output)
@@ -18,6 +18,7 @@ from app.config import config
 from app.llm import LLM
 from app.tool.base import BaseTool, ToolResult
 from app.tool.web_search import WebSearch
+from app.tracing import span
 
 
 _BROWSER_DESCRIPTION = """\
@@ -129,12 +130,17 @@ class BrowserUseTool(BaseTool, Generic[Context]):
     browser: Optional[BrowserUseBrowser] = Field(default=None, exclude=True)
     context: Optional[BrowserContext] = Field(default=None, exclude=True)
     dom_service: Optional[DomService] = Field(default=None, exclude=True)
-    web_search_tool: WebSearch = Field(default_factory=WebSearch, exclude=True)
+    # Created on first use so listing or constructing the tool stays cheap
+    web_search_tool: Optional[WebSearch] = Field(default=None, exclude=True)
 
     # Context for generic functionality
     tool_context: Optional[Context] = Field(default=None, exclude=True)
 
-    llm: Optional[LLM] = Field(default_factory=LLM)
+    # Created on first `extract_content`
+    llm: Optional[LLM] = Field(default=None)
+
+    # A hung page load or action is cancelled and the browser is reset
+    default_timeout: Optional[float] = 120.0
 
     @field_validator("parameters", mode="before")
     def validate_parameters(cls, v: dict, info: ValidationInfo) -> dict:
@@ -258,6 +264,8 @@ class BrowserUseTool(BaseTool, Generic[Context]):
                             error="Query is required for 'web_search' action"
                         )
                     # Execute the web search and return results directly without browser navigation
+                    if self.web_search_tool is None:
+                        self.web_search_tool = WebSearch()
                     search_response = await self.web_search_tool.execute(
                         query=query, fetch_content=True, num_results=1
                     )
@@ -432,6 +440,8 @@ Page content:
                     }
 
                     # Use LLM to extract content with required function calling
+                    if self.llm is None:
+                        self.llm = LLM()
                     response = await self.llm.ask_tool(
                         messages,
                         tools=[extraction_function],
@@ -508,9 +518,10 @@ Page content:
             await page.bring_to_front()
             await page.wait_for_load_state()
 
-            screenshot = await page.screenshot(
-                full_page=True, animations="disabled", type="jpeg", quality=100
-            )
+            with span("browser.screenshot", url=state.url):
+                screenshot = await page.screenshot(
+                    full_page=True, animations="disabled", type="jpeg", quality=100
+                )
 
             screenshot = base64.b64encode(screenshot).decode("utf-8")
 
@@ -542,6 +553,11 @@ Page content:
         except Exception as e:
             return ToolResult(error=f"Failed to get browser state: {str(e)}")
 
+    async def cancel(self, **kwargs) -> Optional[str]:
+        """Close the browser after a hung action; the next call opens a new one."""
+        await self.cleanup()
+        return "The browser was closed; open the page again to continue."
+
     async def cleanup(self):
         """Clean up browser resources."""
         async with self.lock:
@@ -6,11 +6,11 @@ providing fast, precise, and AI-ready data extraction with clean Markdown genera
 """
 
 import asyncio
-from typing import List, Union
+from typing import AsyncIterator, List, Optional, Union
 from urllib.parse import urlparse
 
 from app.logger import logger
-from app.tool.base import BaseTool, ToolResult
+from app.tool.base import BaseTool, ToolProgress, ToolResult
 
 
 class Crawl4aiTool(BaseTool):
@@ -62,6 +62,17 @@ class Crawl4aiTool(BaseTool):
         "required": ["urls"],
     }
 
+    def supports_background(self) -> bool:
+        # Crawling many URLs can take minutes
+        return True
+
+    def timeout_for(
+        self, urls: Union[str, List[str]] = (), timeout: int = 30, **kwargs
+    ) -> Optional[float]:
+        # `timeout` applies per page; allow for starting the crawler
+        count = 1 if isinstance(urls, str) else max(len(urls), 1)
+        return timeout * count + 30
+
     async def execute(
         self,
         urls: Union[str, List[str]],
@@ -81,6 +92,22 @@ class Crawl4aiTool(BaseTool):
         Returns:
             ToolResult with crawl results
         """
+        return await self.collect_stream(
+            urls=urls,
+            timeout=timeout,
+            bypass_cache=bypass_cache,
+            word_count_threshold=word_count_threshold,
+        )
+
+    async def stream(
+        self,
+        urls: Union[str, List[str]],
+        timeout: int = 30,
+        bypass_cache: bool = False,
+        word_count_threshold: int = 10,
+        **kwargs,
+    ) -> AsyncIterator[Union[ToolProgress, ToolResult]]:
+        """Crawl the URLs one by one, yielding each page's result as it finishes."""
         # Normalize URLs to list
         if isinstance(urls, str):
             url_list = [urls]
@@ -96,7 +123,8 @@ class Crawl4aiTool(BaseTool):
                 logger.warning(f"Invalid URL skipped: {url}")
 
         if not valid_urls:
-            return ToolResult(error="No valid URLs provided")
+            yield ToolResult(error="No valid URLs provided")
+            return
 
         try:
             # Import crawl4ai components
@@ -106,7 +134,14 @@ class Crawl4aiTool(BaseTool):
                 CacheMode,
                 CrawlerRunConfig,
             )
+        except ImportError:
+            error_msg = "Crawl4AI is not installed. Please install it with: pip install crawl4ai"
+            logger.error(error_msg)
+            yield ToolResult(error=error_msg)
+            return
 
+        results = []
+        try:
             # Configure browser settings
             browser_config = BrowserConfig(
                 headless=True,
@@ -128,134 +163,125 @@ class Crawl4aiTool(BaseTool):
                 wait_until="domcontentloaded",
             )
 
-            results = []
-            successful_count = 0
-            failed_count = 0
-
             # Process each URL
             async with AsyncWebCrawler(config=browser_config) as crawler:
-                for url in valid_urls:
-                    try:
-                        logger.info(f"🕷️ Crawling URL: {url}")
-                        start_time = asyncio.get_event_loop().time()
-
-                        result = await crawler.arun(url=url, config=run_config)
-
-                        end_time = asyncio.get_event_loop().time()
-                        execution_time = end_time - start_time
-
-                        if result.success:
-                            # Count words in markdown
-                            word_count = 0
-                            if hasattr(result, "markdown") and result.markdown:
-                                word_count = len(result.markdown.split())
-
-                            # Count links
-                            links_count = 0
-                            if hasattr(result, "links") and result.links:
-                                internal_links = result.links.get("internal", [])
-                                external_links = result.links.get("external", [])
-                                links_count = len(internal_links) + len(external_links)
-
-                            # Count images
-                            images_count = 0
-                            if hasattr(result, "media") and result.media:
-                                images = result.media.get("images", [])
-                                images_count = len(images)
-
-                            results.append(
-                                {
-                                    "url": url,
-                                    "success": True,
-                                    "status_code": getattr(result, "status_code", 200),
-                                    "title": result.metadata.get("title")
-                                    if result.metadata
-                                    else None,
-                                    "markdown": result.markdown
-                                    if hasattr(result, "markdown")
-                                    else None,
-                                    "word_count": word_count,
-                                    "links_count": links_count,
-                                    "images_count": images_count,
-                                    "execution_time": execution_time,
-                                }
-                            )
-                            successful_count += 1
-                            logger.info(
-                                f"✅ Successfully crawled {url} in {execution_time:.2f}s"
-                            )
-
-                        else:
-                            results.append(
-                                {
-                                    "url": url,
-                                    "success": False,
-                                    "error_message": getattr(
-                                        result, "error_message", "Unknown error"
-                                    ),
-                                    "execution_time": execution_time,
-                                }
-                            )
-                            failed_count += 1
-                            logger.warning(f"❌ Failed to crawl {url}")
-
-                    except Exception as e:
-                        error_msg = f"Error crawling {url}: {str(e)}"
-                        logger.error(error_msg)
-                        results.append(
-                            {"url": url, "success": False, "error_message": error_msg}
-                        )
-                        failed_count += 1
-
-            # Format output
-            output_lines = [f"🕷️ Crawl4AI Results Summary:"]
-            output_lines.append(f"📊 Total URLs: {len(valid_urls)}")
-            output_lines.append(f"✅ Successful: {successful_count}")
-            output_lines.append(f"❌ Failed: {failed_count}")
-            output_lines.append("")
-
-            for i, result in enumerate(results, 1):
-                output_lines.append(f"{i}. {result['url']}")
-
-                if result["success"]:
-                    output_lines.append(
-                        f"   ✅ Status: Success (HTTP {result.get('status_code', 'N/A')})"
-                    )
-                    if result.get("title"):
-                        output_lines.append(f"   📄 Title: {result['title']}")
-
-                    if result.get("markdown"):
-                        # Show first 300 characters of markdown content
-                        content_preview = result["markdown"]
-                        if len(result["markdown"]) > 300:
-                            content_preview += "..."
-                        output_lines.append(f"   📝 Content: {content_preview}")
-
-                    output_lines.append(
-                        f"   📊 Stats: {result.get('word_count', 0)} words, {result.get('links_count', 0)} links, {result.get('images_count', 0)} images"
+                for index, url in enumerate(valid_urls, 1):
+                    result = await self._crawl_url(crawler, url, run_config)
+                    results.append(result)
+                    status = "ok" if result["success"] else "failed"
+                    yield ToolProgress(
+                        output="\n".join(self._format_result(index, result)) + "\n",
+                        message=f"Crawled {index}/{len(valid_urls)} URLs ({url}: {status})",
+                        progress=index / len(valid_urls),
                     )
+        except Exception as e:
+            error_msg = f"Crawl4AI execution failed: {str(e)}"
+            logger.error(error_msg)
+            yield ToolResult(error=error_msg)
+            return
 
-                    if result.get("execution_time"):
-                        output_lines.append(
-                            f"   ⏱️ Time: {result['execution_time']:.2f}s"
-                        )
-                else:
-                    output_lines.append(f"   ❌ Status: Failed")
-                    if result.get("error_message"):
-                        output_lines.append(f"   🚫 Error: {result['error_message']}")
+        successful_count = sum(1 for result in results if result["success"])
 
-                output_lines.append("")
+        # Format output
+        output_lines = [f"🕷️ Crawl4AI Results Summary:"]
+        output_lines.append(f"📊 Total URLs: {len(valid_urls)}")
+        output_lines.append(f"✅ Successful: {successful_count}")
+        output_lines.append(f"❌ Failed: {len(results) - successful_count}")
+        output_lines.append("")
 
-            return ToolResult(output="\n".join(output_lines))
+        for i, result in enumerate(results, 1):
+            output_lines.extend(self._format_result(i, result))
+
+        yield ToolResult(output="\n".join(output_lines))
+
+    async def _crawl_url(self, crawler, url: str, run_config) -> dict:
+        """Crawl one URL and collect its stats."""
+        try:
+            logger.info(f"🕷️ Crawling URL: {url}")
+            start_time = asyncio.get_event_loop().time()
+
+            result = await crawler.arun(url=url, config=run_config)
+
+            end_time = asyncio.get_event_loop().time()
+            execution_time = end_time - start_time
+
+            if not result.success:
+                logger.warning(f"❌ Failed to crawl {url}")
+                return {
+                    "url": url,
+                    "success": False,
+                    "error_message": getattr(result, "error_message", "Unknown error"),
+                    "execution_time": execution_time,
+                }
+
+            # Count words in markdown
+            word_count = 0
+            if hasattr(result, "markdown") and result.markdown:
+                word_count = len(result.markdown.split())
+
+            # Count links
+            links_count = 0
+            if hasattr(result, "links") and result.links:
+                internal_links = result.links.get("internal", [])
+                external_links = result.links.get("external", [])
+                links_count = len(internal_links) + len(external_links)
+
+            # Count images
+            images_count = 0
+            if hasattr(result, "media") and result.media:
+                images = result.media.get("images", [])
+                images_count = len(images)
+
+            logger.info(f"✅ Successfully crawled {url} in {execution_time:.2f}s")
+            return {
+                "url": url,
+                "success": True,
+                "status_code": getattr(result, "status_code", 200),
+                "title": result.metadata.get("title") if result.metadata else None,
+                "markdown": result.markdown if hasattr(result, "markdown") else None,
+                "word_count": word_count,
+                "links_count": links_count,
+                "images_count": images_count,
+                "execution_time": execution_time,
+            }
 
-        except ImportError:
-            error_msg = "Crawl4AI is not installed. Please install it with: pip install crawl4ai"
-            logger.error(error_msg)
-            return ToolResult(error=error_msg)
         except Exception as e:
-            error_msg = f"Crawl4AI execution failed: {str(e)}"
+            error_msg = f"Error crawling {url}: {str(e)}"
             logger.error(error_msg)
-            return ToolResult(error=error_msg)
+            return {"url": url, "success": False, "error_message": error_msg}
+
+    @staticmethod
+    def _format_result(index: int, result: dict) -> List[str]:
+        """Output lines for one crawled URL."""
+        output_lines = [f"{index}. {result['url']}"]
+
+        if result["success"]:
+            output_lines.append(
+                f"   ✅ Status: Success (HTTP {result.get('status_code', 'N/A')})"
+            )
+            if result.get("title"):
+                output_lines.append(f"   📄 Title: {result['title']}")
+
+            if result.get("markdown"):
+                # Show first 300 characters of markdown content
+                content_preview = result["markdown"]
+                if len(result["markdown"]) > 300:
+                    content_preview += "..."
+                output_lines.append(f"   📝 Content: {content_preview}")
+
+            output_lines.append(
+                f"   📊 Stats: {result.get('word_count', 0)} words, {result.get('links_count', 0)} links, {result.get('images_count', 0)} images"
+            )
+
+            if result.get("execution_time"):
+                output_lines.append(f"   ⏱️ Time: {result['execution_time']:.2f}s")
+        else:
+            output_lines.append(f"   ❌ Status: Failed")
+            if result.get("error_message"):
+                output_lines.append(f"   🚫 Error: {result['error_message']}")
+
+        output_lines.append("")
+        return output_lines
 
     def _is_valid_url(self, url: str) -> bool:
         """Validate if a URL is properly formatted."""
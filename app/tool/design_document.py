@@ -7,6 +7,8 @@ Design Document Tool - 설계 문서 관리 도구
 import json
 from typing import Any, Dict, Optional
 
+from pydantic import PrivateAttr
+
 from app.tool.base import BaseTool, ToolResult
 
 
@@ -45,8 +47,8 @@ class DesignDocumentTool(BaseTool):
         "required": ["action"]
     }
     
-    # 내부 설계 문서 저장소
-    _document: Dict[str, Dict[str, Any]] = {}
+    # 내부 설계 문서 저장소 (도구 인스턴스별)
+    _document: Dict[str, Dict[str, Any]] = PrivateAttr(default_factory=dict)
     
     async def execute(
         self,
@@ -173,6 +175,14 @@ class DesignDocumentTool(BaseTool):
             "sections": list(self._document.keys())
         })
 
+    def dump_state(self) -> Dict[str, Any]:
+        """체크포인트용 설계 문서 상태를 반환합니다."""
+        return {"document": self._document}
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """체크포인트에서 설계 문서를 복원합니다."""
+        self._document = state.get("document", {})
+
     def reset(self) -> None:
         """설계 문서를 초기화합니다."""
         self._document = {}
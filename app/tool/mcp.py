@@ -10,6 +10,7 @@ from mcp.types import ListToolsResult, TextContent
 from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
 from app.tool.tool_collection import ToolCollection
+from app.tracing import span
 
 
 class MCPClientTool(BaseTool):
@@ -18,6 +19,7 @@ class MCPClientTool(BaseTool):
     session: Optional[ClientSession] = None
     server_id: str = ""  # Add server identifier
     original_name: str = ""
+    default_timeout: Optional[float] = 120.0
 
     async def execute(self, **kwargs) -> ToolResult:
         """Execute the tool by making a remote call to the MCP server."""
@@ -26,7 +28,8 @@ class MCPClientTool(BaseTool):
 
         try:
             logger.info(f"Executing tool: {self.original_name}")
-            result = await self.session.call_tool(self.original_name, kwargs)
+            with span("mcp.call_tool", server=self.server_id, tool=self.original_name):
+                result = await self.session.call_tool(self.original_name, kwargs)
             content_str = ", ".join(
                 item.text for item in result.content if isinstance(item, TextContent)
             )
@@ -40,13 +43,14 @@ class MCPClients(ToolCollection):
     A collection of tools that connects to multiple MCP servers and manages available tools through the Model Context Protocol.
     """
 
-    sessions: Dict[str, ClientSession] = {}
-    exit_stacks: Dict[str, AsyncExitStack] = {}
     description: str = "MCP client tools for server interaction"
 
     def __init__(self):
         super().__init__()  # Initialize with empty tools list
         self.name = "mcp"  # Keep name for backward compatibility
+        # Per-instance so that agents in different sessions never share connections
+        self.sessions: Dict[str, ClientSession] = {}
+        self.exit_stacks: Dict[str, AsyncExitStack] = {}
 
     async def connect_sse(self, server_url: str, server_id: str = "") -> None:
         """Connect to an MCP server using SSE transport."""
@@ -1,6 +1,9 @@
 # tool/planning.py
+import json
 from typing import Dict, List, Literal, Optional
 
+from pydantic import Field
+
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, ToolResult
 
@@ -8,9 +11,68 @@ from app.tool.base import BaseTool, ToolResult
 _PLANNING_TOOL_DESCRIPTION = """
 A planning tool that allows the agent to create and manage plans for solving complex tasks.
 The tool provides functionality for creating plans, updating plan steps, and tracking progress.
+Steps may declare the steps they depend on; steps whose dependencies are completed can run in parallel.
 """
 
 
+def linear_dependencies(count: int) -> List[List[int]]:
+    """Dependencies of a plan whose steps run in order, each after the previous one."""
+    return [[] if i == 0 else [i - 1] for i in range(count)]
+
+
+def plan_dependencies(plan: Dict) -> List[List[int]]:
+    """Step dependencies of a plan (plans saved without them run in order)."""
+    dependencies = plan.get("step_dependencies")
+    if dependencies is None or len(dependencies) != len(plan["steps"]):
+        return linear_dependencies(len(plan["steps"]))
+    return dependencies
+
+
+def _validate_dependencies(dependencies, count: int) -> List[List[int]]:
+    """Check that every step has valid dependencies and that there is no cycle."""
+    if not isinstance(dependencies, list) or len(dependencies) != count:
+        raise ToolError(
+            f"Parameter `step_dependencies` must be a list with one entry per step ({count})"
+        )
+    result = []
+    for index, entry in enumerate(dependencies):
+        if not isinstance(entry, list) or not all(
+            isinstance(dep, int) and not isinstance(dep, bool) for dep in entry
+        ):
+            raise ToolError(
+                f"step_dependencies[{index}] must be a list of step indices"
+            )
+        invalid = [dep for dep in entry if dep < 0 or dep >= count or dep == index]
+        if invalid:
+            raise ToolError(
+                f"step_dependencies[{index}] has invalid step indices {invalid}: "
+                f"use other steps' indices from 0 to {count - 1}"
+            )
+        result.append(sorted(set(entry)))
+
+    # Kahn's algorithm: every step must become reachable once its dependencies finish
+    remaining = [len(entry) for entry in result]
+    dependents: List[List[int]] = [[] for _ in range(count)]
+    for index, entry in enumerate(result):
+        for dep in entry:
+            dependents[dep].append(index)
+    ready = [index for index in range(count) if not remaining[index]]
+    visited = 0
+    while ready:
+        index = ready.pop()
+        visited += 1
+        for dependent in dependents[index]:
+            remaining[dependent] -= 1
+            if not remaining[dependent]:
+                ready.append(dependent)
+    if visited != count:
+        cycle = [index for index in range(count) if remaining[index]]
+        raise ToolError(
+            f"Parameter `step_dependencies` has a cycle among steps {cycle}"
+        )
+    return result
+
+
 class PlanningTool(BaseTool):
     """
     A planning tool that allows the agent to create and manage plans for solving complex tasks.
@@ -48,6 +110,11 @@ class PlanningTool(BaseTool):
                 "type": "array",
                 "items": {"type": "string"},
             },
+            "step_dependencies": {
+                "description": "For each step, the 0-based indices of the steps it depends on (one entry per step). Steps whose dependencies are completed can run in parallel; use [] for steps that can start right away. Optional for create and update; by default each step depends on the previous one.",
+                "type": "array",
+                "items": {"type": "array", "items": {"type": "integer"}},
+            },
             "step_index": {
                 "description": "Index of the step to update (0-based). Required for mark_step command.",
                 "type": "integer",
@@ -66,7 +133,7 @@ class PlanningTool(BaseTool):
         "additionalProperties": False,
     }
 
-    plans: dict = {}  # Dictionary to store plans by plan_id
+    plans: dict = Field(default_factory=dict)  # Plans by plan_id, per tool instance
     _current_plan_id: Optional[str] = None  # Track the current active plan
 
     async def execute(
@@ -78,6 +145,7 @@ class PlanningTool(BaseTool):
         plan_id: Optional[str] = None,
         title: Optional[str] = None,
         steps: Optional[List[str]] = None,
+        step_dependencies: Optional[List[List[int]]] = None,
         step_index: Optional[int] = None,
         step_status: Optional[
             Literal["not_started", "in_progress", "completed", "blocked"]
@@ -93,15 +161,16 @@ class PlanningTool(BaseTool):
         - plan_id: Unique identifier for the plan
         - title: Title for the plan (used with create command)
         - steps: List of steps for the plan (used with create command)
+        - step_dependencies: Indices of the steps each step depends on (used with create and update commands)
         - step_index: Index of the step to update (used with mark_step command)
         - step_status: Status to set for a step (used with mark_step command)
         - step_notes: Additional notes for a step (used with mark_step command)
         """
 
         if command == "create":
-            return self._create_plan(plan_id, title, steps)
+            return self._create_plan(plan_id, title, steps, step_dependencies)
         elif command == "update":
-            return self._update_plan(plan_id, title, steps)
+            return self._update_plan(plan_id, title, steps, step_dependencies)
         elif command == "list":
             return self._list_plans()
         elif command == "get":
@@ -117,8 +186,31 @@ class PlanningTool(BaseTool):
                 f"Unrecognized command: {command}. Allowed commands are: create, update, list, get, set_active, mark_step, delete"
             )
 
+    def is_idempotent(self, command: Optional[str] = None, **kwargs) -> bool:
+        return command in ("list", "get")
+
+    def modified_paths(self, **kwargs) -> Optional[List[str]]:
+        return []
+
+    def memo_version(self) -> str:
+        # Planning flows also update step statuses on the tool directly
+        return json.dumps([self.plans, self._current_plan_id], sort_keys=True)
+
+    def dump_state(self) -> Dict:
+        """Return all plans and the active plan for run checkpoints."""
+        return {"plans": self.plans, "current_plan_id": self._current_plan_id}
+
+    def load_state(self, state: Dict) -> None:
+        """Restore plans saved by `dump_state`."""
+        self.plans = state.get("plans", {})
+        self._current_plan_id = state.get("current_plan_id")
+
     def _create_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        step_dependencies: Optional[List[List[int]]] = None,
     ) -> ToolResult:
         """Create a new plan with the given ID, title, and steps."""
         if not plan_id:
@@ -141,6 +233,11 @@ class PlanningTool(BaseTool):
                 "Parameter `steps` must be a non-empty list of strings for command: create"
             )
 
+        if step_dependencies is None:
+            dependencies = linear_dependencies(len(steps))
+        else:
+            dependencies = _validate_dependencies(step_dependencies, len(steps))
+
         # Create a new plan with initialized step statuses
         plan = {
             "plan_id": plan_id,
@@ -148,6 +245,7 @@ class PlanningTool(BaseTool):
             "steps": steps,
             "step_statuses": ["not_started"] * len(steps),
             "step_notes": [""] * len(steps),
+            "step_dependencies": dependencies,
         }
 
         self.plans[plan_id] = plan
@@ -158,7 +256,11 @@ class PlanningTool(BaseTool):
         )
 
     def _update_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        step_dependencies: Optional[List[List[int]]] = None,
     ) -> ToolResult:
         """Update an existing plan with new title or steps."""
         if not plan_id:
@@ -198,10 +300,19 @@ class PlanningTool(BaseTool):
                     new_statuses.append("not_started")
                     new_notes.append("")
 
+            # Keep the dependencies while the number of steps is unchanged
+            if len(steps) != len(old_steps):
+                plan["step_dependencies"] = linear_dependencies(len(steps))
+
             plan["steps"] = steps
             plan["step_statuses"] = new_statuses
             plan["step_notes"] = new_notes
 
+        if step_dependencies is not None:
+            plan["step_dependencies"] = _validate_dependencies(
+                step_dependencies, len(plan["steps"])
+            )
+
         return ToolResult(
             output=f"Plan updated successfully: {plan_id}\n\n{self._format_plan(plan)}"
         )
@@ -345,7 +456,12 @@ class PlanningTool(BaseTool):
         output += f"Status: {completed} completed, {in_progress} in progress, {blocked} blocked, {not_started} not started\n\n"
         output += "Steps:\n"
 
-        # Add each step with its status and notes
+        # Show dependencies only when the steps do not simply run in order
+        dependencies = plan_dependencies(plan)
+        if dependencies == linear_dependencies(total_steps):
+            dependencies = [[] for _ in range(total_steps)]
+
+        # Add each step with its status, dependencies and notes
         for i, (step, status, notes) in enumerate(
             zip(plan["steps"], plan["step_statuses"], plan["step_notes"])
         ):
@@ -356,7 +472,12 @@ class PlanningTool(BaseTool):
                 "blocked": "[!]",
             }.get(status, "[ ]")
 
-            output += f"{i}. {status_symbol} {step}\n"
+            after = (
+                f" (after {', '.join(map(str, dependencies[i]))})"
+                if dependencies[i]
+                else ""
+            )
+            output += f"{i}. {status_symbol} {step}{after}\n"
             if notes:
                 output += f"   Notes: {notes}\n"
 
@@ -1,11 +1,16 @@
+import asyncio
 import multiprocessing
 import sys
 from io import StringIO
-from typing import Dict
+from typing import Dict, Optional
 
 from app.tool.base import BaseTool
 
 
+# Interval at which the event loop checks whether the code has finished
+_POLL_INTERVAL = 0.05
+
+
 class PythonExecute(BaseTool):
     """A tool for executing Python code with timeout and safety restrictions."""
 
@@ -22,6 +27,13 @@ class PythonExecute(BaseTool):
         "required": ["code"],
     }
 
+    def verbatim_output(self) -> bool:
+        return True
+
+    def timeout_for(self, timeout: int = 5, **kwargs) -> Optional[float]:
+        # The code has its own `timeout`; allow for starting the worker processes
+        return timeout + 10
+
     def _run_code(self, code: str, result_dict: dict, safe_globals: dict) -> None:
         original_stdout = sys.stdout
         try:
@@ -62,14 +74,24 @@ class PythonExecute(BaseTool):
                 target=self._run_code, args=(code, result, safe_globals)
             )
             proc.start()
-            proc.join(timeout)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            try:
+                # Poll instead of proc.join() so the event loop is not blocked
+                while proc.is_alive() and loop.time() < deadline:
+                    await asyncio.sleep(_POLL_INTERVAL)
 
-            # timeout process
-            if proc.is_alive():
-                proc.terminate()
-                proc.join(1)
-                return {
-                    "observation": f"Execution timeout after {timeout} seconds",
-                    "success": False,
-                }
-            return dict(result)
+                # timeout process
+                if proc.is_alive():
+                    return {
+                        "observation": f"Execution timeout after {timeout} seconds",
+                        "success": False,
+                    }
+                return dict(result)
+            finally:
+                # Also reached when the call is cancelled
+                if proc.is_alive():
+                    proc.terminate()
+                    await asyncio.to_thread(proc.join, 1)
+                    if proc.is_alive():
+                        proc.kill()
@@ -126,6 +126,7 @@ class SandboxBrowserTool(SandboxToolsBase):
         },
     }
     browser_message: Optional[ThreadMessage] = Field(default=None, exclude=True)
+    default_timeout: Optional[float] = 120.0
 
     def __init__(
         self, sandbox: Optional[Sandbox] = None, thread_id: Optional[str] = None, **data
@@ -75,6 +75,9 @@ class SandboxFilesTool(SandboxToolsBase):
     # workspace_path: str = Field(default="/workspace", exclude=True)
     # sandbox: Optional[Sandbox] = Field(default=None, exclude=True)
 
+    def verbatim_output(self) -> bool:
+        return True
+
     def __init__(
         self, sandbox: Optional[Sandbox] = None, thread_id: Optional[str] = None, **data
     ):
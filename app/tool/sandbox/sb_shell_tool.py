@@ -81,6 +81,22 @@ class SandboxShellTool(SandboxToolsBase):
         },
     }
 
+    def verbatim_output(self) -> bool:
+        return True
+
+    def timeout_for(
+        self, blocking: bool = False, timeout: int = 60, **kwargs
+    ) -> Optional[float]:
+        # Blocking commands wait up to `timeout` inside the sandbox
+        return timeout + 30 if blocking else 60
+
+    async def cancel(self, session_name: Optional[str] = None, **kwargs) -> Optional[str]:
+        """Kill the tmux session the cancelled command was running in."""
+        if session_name:
+            await self._terminate_command(session_name)
+            return f"Session '{session_name}' was terminated."
+        return None
+
     def __init__(
         self, sandbox: Optional[Sandbox] = None, thread_id: Optional[str] = None, **data
     ):
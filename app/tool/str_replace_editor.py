@@ -7,6 +7,8 @@ from collections import defaultdict
 from pathlib import Path
 from typing import Any, DefaultDict, List, Literal, Optional, get_args
 
+from pydantic import PrivateAttr
+
 from app.config import config
 from app.exceptions import ToolError
 from app.tool import BaseTool
@@ -101,10 +103,50 @@ class StrReplaceEditor(BaseTool):
         },
         "required": ["command", "path"],
     }
-    _file_history: DefaultDict[PathLike, List[str]] = defaultdict(list)
+    _file_history: DefaultDict[PathLike, List[str]] = PrivateAttr(
+        default_factory=lambda: defaultdict(list)
+    )
     _local_operator: LocalFileOperator = LocalFileOperator()
     _sandbox_operator: SandboxFileOperator = SandboxFileOperator()
 
+    def dump_state(self) -> dict[str, Any]:
+        """Return the undo history for run checkpoints."""
+        return {
+            "file_history": {
+                str(path): history
+                for path, history in self._file_history.items()
+                if history
+            }
+        }
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        """Restore the undo history saved by `dump_state`."""
+        self._file_history = defaultdict(list, state.get("file_history", {}))
+
+    def verbatim_output(self) -> bool:
+        return True
+
+    def is_idempotent(self, command: Optional[str] = None, **kwargs) -> bool:
+        return command == "view"
+
+    def dependent_paths(self, path: Optional[str] = None, **kwargs) -> List[str]:
+        return [path] if path else []
+
+    def modified_paths(self, path: Optional[str] = None, **kwargs) -> List[str]:
+        return [path] if path else []
+
+    def supersession_key(
+        self,
+        command: Optional[str] = None,
+        path: Optional[str] = None,
+        view_range: Optional[List[int]] = None,
+        **kwargs,
+    ) -> Optional[str]:
+        # Only full views supersede; a ranged view shows part of the file
+        if command == "view" and path and not view_range:
+            return f"view:{path}"
+        return None
+
     # def _get_operator(self, use_sandbox: bool) -> FileOperator:
     def _get_operator(self) -> FileOperator:
         """Get the appropriate file operator based on execution mode."""
@@ -0,0 +1,287 @@
+"""
+Spawn Subagents - 하위 에이전트 병렬 실행 도구
+==============================================
+여러 부분으로 나뉘는 작업(여러 모듈 조사, 여러 자료 수집 등)을 하나의 메모리에서
+순차적으로 처리하면 컨텍스트가 빠르게 커지고 시간이 오래 걸립니다.
+`spawn_subagents`는 부분 작업마다 작은 메모리와 제한된 도구를 가진 하위
+`ToolCallAgent`를 만들어 동시에 실행하고, 각자의 요약 결과만 부모에게 돌려줍니다.
+
+- 하위 에이전트 도구: 부모 도구 중 작업별로 지정한 것 (기본: 공유해도 안전한 모든 도구)
+  - 세션을 가진 도구(`bash` 등)는 `BaseTool.background_instance()`로 별도 인스턴스 사용
+  - 브라우저, 사람에게 묻기, 계획, 백그라운드 작업, 하위 에이전트 생성, 도구 요청은 제외
+- 동시 실행: 호출 하나 안에서는 `max_parallel`, LLM 요청은 프로세스 전체에서
+  `[llm] max_concurrent_requests`로 제한
+- 결과: 하위 에이전트의 마지막 보고(없으면 마지막 관찰)를 `result_chars` 이내로 압축
+
+설정 (config.toml):
+    [subagents]
+    max_tasks = 6
+    max_parallel = 3
+    max_steps = 10
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from pydantic import Field
+
+from app.config import SubagentSettings, config
+from app.exceptions import ToolError
+from app.logger import logger
+from app.prompt.subagent import (
+    CONTEXT_PROMPT,
+    NEXT_STEP_PROMPT,
+    SYSTEM_PROMPT,
+    TASK_PROMPT,
+)
+from app.schema import Memory
+from app.tool.ask_human import AskHuman
+from app.tool.background_jobs import JobResult, JobStatus
+from app.tool.base import BaseTool, ToolResult
+from app.tool.browser_use_tool import BrowserUseTool
+from app.tool.planning import PlanningTool
+from app.tool.terminate import Terminate
+from app.tool.tool_collection import ToolCollection
+from app.tool.tool_router import RequestTools
+from app.utils.observation import truncate_head_tail
+
+
+_SPAWN_SUBAGENTS_DESCRIPTION = """Split a multi-part task into independent sub-tasks and run each one in a separate sub-agent, in parallel.
+Each sub-agent starts with an empty memory, works only on its own task with a limited tool set, and returns a condensed final report.
+Use it when the parts do not depend on each other (e.g. investigate several modules, research several topics, edit unrelated files).
+Do not use it for small tasks or for steps that need each other's results; sub-agents cannot talk to each other or to the user."""
+
+
+@dataclass
+class SubagentOutcome:
+    """하위 에이전트 하나의 실행 결과."""
+
+    index: int
+    task: str
+    status: str
+    report: str
+    steps: int = 0
+    elapsed: float = 0.0
+
+    def describe(self, result_chars: int) -> str:
+        title = self.task.strip().splitlines()[0] if self.task.strip() else ""
+        if len(title) > 80:
+            title = title[:77] + "..."
+        report = truncate_head_tail(self.report.strip(), result_chars) or "(no report)"
+        return (
+            f"### [{self.index}] {title}\n"
+            f"status: {self.status} ({self.steps} steps, {self.elapsed:.1f}s)\n"
+            f"{report}"
+        )
+
+
+class SpawnSubagents(BaseTool):
+    """부분 작업을 하위 에이전트에 나눠 동시에 실행하는 도구."""
+
+    name: str = "spawn_subagents"
+    description: str = _SPAWN_SUBAGENTS_DESCRIPTION
+    parameters: dict = {
+        "type": "object",
+        "properties": {
+            "tasks": {
+                "type": "array",
+                "description": "Independent sub-tasks, one sub-agent each.",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "task": {
+                            "type": "string",
+                            "description": "Self-contained instructions for the sub-agent, including every detail it needs.",
+                        },
+                        "tools": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "(optional) Names of the tools this sub-agent may use. Defaults to all shareable tools.",
+                        },
+                    },
+                    "required": ["task"],
+                },
+            },
+            "context": {
+                "type": "string",
+                "description": "(optional) Shared background given to every sub-agent (findings so far, constraints, file locations).",
+            },
+            "max_steps": {
+                "type": "integer",
+                "description": "(optional) Step limit per sub-agent.",
+            },
+        },
+        "required": ["tasks"],
+    }
+
+    # 부모 에이전트의 도구 모음 (하위 에이전트 도구는 여기서 고름)
+    tools: Optional[ToolCollection] = Field(default=None, exclude=True)
+    settings: SubagentSettings = Field(
+        default_factory=lambda: config.subagent_config, exclude=True
+    )
+
+    def supports_background(self) -> bool:
+        return True
+
+    def _excluded_tool_names(self) -> set:
+        """하위 에이전트와 공유할 수 없거나 부모 전용인 도구."""
+        return {
+            self.name,
+            Terminate.tool_name(),
+            AskHuman.tool_name(),
+            PlanningTool.tool_name(),
+            BrowserUseTool.tool_name(),
+            JobStatus.tool_name(),
+            JobResult.tool_name(),
+            RequestTools.tool_name(),
+        }
+
+    def _shareable_tools(self) -> Dict[str, BaseTool]:
+        if self.tools is None:
+            return {}
+        excluded = self._excluded_tool_names()
+        return {
+            name: tool
+            for name, tool in self.tools.tool_map.items()
+            if name not in excluded
+        }
+
+    def _scoped_tools(self, requested: Optional[List[str]]) -> List[BaseTool]:
+        shareable = self._shareable_tools()
+        if requested is None:
+            names = list(shareable)
+        else:
+            unknown = [name for name in requested if name not in shareable]
+            if unknown:
+                raise ToolError(
+                    f"Tools not available to sub-agents: {', '.join(unknown)}. "
+                    f"Available: {', '.join(shareable) or '(none)'}"
+                )
+            names = list(dict.fromkeys(requested))
+        return [shareable[name].background_instance() for name in names]
+
+    async def execute(
+        self,
+        tasks: List[Dict[str, Any]],
+        context: Optional[str] = None,
+        max_steps: Optional[int] = None,
+        **kwargs,
+    ) -> ToolResult:
+        settings = self.settings
+        if not tasks:
+            raise ToolError("`tasks` must contain at least one sub-task")
+        if len(tasks) > settings.max_tasks:
+            raise ToolError(
+                f"Too many sub-tasks ({len(tasks)}); at most {settings.max_tasks} per call"
+            )
+        for spec in tasks:
+            if not isinstance(spec, dict) or not str(spec.get("task", "")).strip():
+                raise ToolError("Every sub-task needs a non-empty `task`")
+
+        # 실행 전에 도구 이름을 모두 검증해 일부만 시작되는 일이 없도록 함
+        scoped = [self._scoped_tools(spec.get("tools")) for spec in tasks]
+        max_steps = max_steps or settings.max_steps
+
+        slots = asyncio.Semaphore(settings.max_parallel)
+
+        async def run_one(index: int, spec: Dict[str, Any], tools: List[BaseTool]):
+            async with slots:
+                return await self._run_subagent(
+                    index, spec["task"], tools, context, max_steps
+                )
+
+        logger.info(f"🧩 Spawning {len(tasks)} sub-agent(s)")
+        outcomes = await asyncio.gather(
+            *(
+                run_one(index, spec, tools)
+                for index, (spec, tools) in enumerate(zip(tasks, scoped), start=1)
+            )
+        )
+
+        completed = sum(outcome.status == "completed" for outcome in outcomes)
+        sections = [
+            f"Sub-agent results ({completed}/{len(outcomes)} completed):"
+        ] + [outcome.describe(settings.result_chars) for outcome in outcomes]
+        return ToolResult(output="\n\n".join(sections))
+
+    async def _run_subagent(
+        self,
+        index: int,
+        task: str,
+        tools: List[BaseTool],
+        context: Optional[str],
+        max_steps: int,
+    ) -> SubagentOutcome:
+        # app.agent가 app.tool을 임포트하므로 순환 임포트를 피하기 위해 지연 임포트
+        from app.agent.toolcall import ToolCallAgent
+
+        agent = ToolCallAgent(
+            name=f"subagent-{index}",
+            system_prompt=SYSTEM_PROMPT.format(directory=config.workspace_root),
+            next_step_prompt=NEXT_STEP_PROMPT,
+            available_tools=ToolCollection(*tools, Terminate()),
+            memory=Memory(max_messages=self.settings.max_messages),
+            max_steps=max_steps,
+            # 부모 도구를 공유하므로 정리는 아래에서 별도 인스턴스만 수행
+            cleanup_on_finish=False,
+            background_jobs=False,
+            # 부모 실행의 예산이 하위 에이전트 사용량까지 포함해 측정함
+            budget=None,
+        )
+        if context:
+            agent.update_memory("user", CONTEXT_PROMPT.format(context=context))
+
+        started = time.monotonic()
+        try:
+            summary = await agent.run(TASK_PROMPT.format(task=task))
+            status = "completed" if self._terminated(agent) else "incomplete"
+            report = self._final_report(agent) or summary
+        except Exception as e:
+            logger.error(f"Sub-agent {index} failed: {e}")
+            status, report = "failed", f"{type(e).__name__}: {e}"
+        finally:
+            await self._cleanup_own_tools(tools)
+
+        return SubagentOutcome(
+            index=index,
+            task=task,
+            status=status,
+            report=report,
+            steps=sum(1 for msg in agent.memory.messages if msg.role == "assistant"),
+            elapsed=time.monotonic() - started,
+        )
+
+    @staticmethod
+    def _terminated(agent) -> bool:
+        terminate = Terminate.tool_name()
+        return any(
+            msg.role == "tool" and msg.name == terminate
+            for msg in agent.memory.messages
+        )
+
+    @staticmethod
+    def _final_report(agent) -> Optional[str]:
+        """마지막 assistant 보고, 없으면 마지막 도구 관찰."""
+        messages = agent.memory.messages
+        for msg in reversed(messages):
+            if msg.role == "assistant" and msg.content and msg.content.strip():
+                return msg.content
+        for msg in reversed(messages):
+            if msg.role == "tool" and msg.name != Terminate.tool_name() and msg.content:
+                return msg.content
+        return None
+
+    async def _cleanup_own_tools(self, tools: List[BaseTool]) -> None:
+        """부모와 공유하지 않는(하위 에이전트 전용으로 만든) 도구만 정리합니다."""
+        shared = set(map(id, self.tools.tool_map.values())) if self.tools else set()
+        for tool in tools:
+            if id(tool) in shared or not asyncio.iscoroutinefunction(
+                getattr(tool, "cleanup", None)
+            ):
+                continue
+            try:
+                await tool.cleanup()
+            except Exception as e:
+                logger.warning(f"Error cleaning up sub-agent tool '{tool.name}': {e}")
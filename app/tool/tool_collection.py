@@ -1,9 +1,47 @@
 """Collection classes for managing multiple tools."""
-from typing import Any, Dict, List
+import asyncio
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
 
+from app.events import ToolCallProgress, emit
 from app.exceptions import ToolError
 from app.logger import logger
-from app.tool.base import BaseTool, ToolFailure, ToolResult
+from app.replay import recordable
+from app.tool.background_jobs import (
+    BACKGROUND_PARAMETER,
+    BACKGROUND_PARAMETER_SCHEMA,
+    JOB_TIMEOUT,
+    BackgroundJob,
+    JobManager,
+)
+from app.tool.base import (
+    BaseTool,
+    CachedToolResult,
+    ProgressCallback,
+    ToolFailure,
+    ToolProgress,
+    ToolResult,
+)
+from app.tool.tool_memo import MemoEntry, ToolMemo, memo_key
+from app.tool.tool_metrics import metrics_enabled, tool_metrics
+from app.tracing import span
+from app.utils.json_schema import Validator, compile_schema
+
+
+# Tools running at once in `execute_all` unless a cap is given
+EXECUTE_ALL_CONCURRENCY = 8
+
+# Added to the schema of tools that stream partial output (`BaseTool.supports_streaming`)
+STOP_PARAMETER = "stop_on"
+STOP_PARAMETER_SCHEMA = {
+    "type": "string",
+    "description": (
+        "(optional) Regular expression checked against each line of output as it "
+        "arrives. On the first match the call is stopped and returns the output so "
+        "far, e.g. `error` to stop at the first compiler error."
+    ),
+}
 
 
 class ToolCollection:
@@ -13,37 +51,327 @@ class ToolCollection:
         arbitrary_types_allowed = True
 
     def __init__(self, *tools: BaseTool):
+        # Bumped whenever the tool set (or anything else in to_params) changes
+        self.version = 0
+        self._params_cache: Optional[Tuple[int, List[Dict[str, Any]]]] = None
+        self._validators: Dict[str, Tuple[Any, Validator]] = {}
+        self._jobs: Optional[JobManager] = None
         self.tools = tools
         self.tool_map = {tool.name: tool for tool in tools}
+        # Set by the agent for the duration of a run
+        self.memo: Optional[ToolMemo] = None
 
     def __iter__(self):
         return iter(self.tools)
 
+    @property
+    def tools(self) -> Tuple[BaseTool, ...]:
+        return self._tools
+
+    @tools.setter
+    def tools(self, tools) -> None:
+        self._tools = tuple(tools)
+        self.version += 1
+
+    @property
+    def jobs(self) -> Optional[JobManager]:
+        """Set by the agent when it offers background jobs."""
+        return self._jobs
+
+    @jobs.setter
+    def jobs(self, jobs: Optional[JobManager]) -> None:
+        self._jobs = jobs
+        self.version += 1
+
     def to_params(self) -> List[Dict[str, Any]]:
-        return [tool.to_param() for tool in self.tools]
+        """Tool definitions for the LLM, rebuilt only when the collection changes.
+
+        The returned list is shared between calls and must not be mutated.
+        """
+        cache = self._params_cache
+        if cache is not None and cache[0] == self.version:
+            return cache[1]
+        params = [self._tool_param(tool) for tool in self.tools]
+        self._params_cache = (self.version, params)
+        return params
+
+    def validate_arguments(self, tool: BaseTool, tool_input: Any) -> List[str]:
+        """Check arguments against the tool's JSON schema (compiled once per tool)."""
+        cached = self._validators.get(tool.name)
+        if cached is None or cached[0] is not tool.parameters:
+            cached = (tool.parameters, compile_schema(tool.parameters))
+            self._validators[tool.name] = cached
+        return cached[1]({} if tool_input is None else tool_input)
 
+    def _tool_param(self, tool: BaseTool) -> Dict[str, Any]:
+        """The tool's definition plus the collection-level arguments it accepts."""
+        param = tool.to_param()
+        extra = {}
+        if self.jobs is not None and tool.supports_background():
+            extra[BACKGROUND_PARAMETER] = BACKGROUND_PARAMETER_SCHEMA
+        if tool.supports_streaming():
+            extra[STOP_PARAMETER] = STOP_PARAMETER_SCHEMA
+        if not extra:
+            return param
+        schema = param["function"].get("parameters") or {"type": "object"}
+        param["function"]["parameters"] = {
+            **schema,
+            "properties": {**schema.get("properties", {}), **extra},
+        }
+        return param
+
+    @recordable("tool.execute")
     async def execute(
-        self, *, name: str, tool_input: Dict[str, Any] = None
+        self,
+        *,
+        name: str,
+        tool_input: Dict[str, Any] = None,
+        call_id: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> ToolResult:
+        """Execute a tool by name.
+
+        Args:
+            name: Tool name
+            tool_input: Tool arguments
+            call_id: Id of the LLM tool call (used by the memo)
+            timeout: Time limit overriding the tool's `timeout_for`
+        """
         tool = self.tool_map.get(name)
         if not tool:
             return ToolFailure(error=f"Tool {name} is invalid")
+
+        background = False
+        if tool_input and BACKGROUND_PARAMETER in tool_input:
+            tool_input = dict(tool_input)
+            background = bool(tool_input.pop(BACKGROUND_PARAMETER))
+        stop_on = None
+        if tool_input and STOP_PARAMETER in tool_input and tool.supports_streaming():
+            tool_input = dict(tool_input)
+            try:
+                stop_on = self._compile_stop_pattern(tool_input.pop(STOP_PARAMETER))
+            except re.error as e:
+                return self._rejected(
+                    name,
+                    f"Invalid `{STOP_PARAMETER}` pattern (the tool was not run): {e}",
+                )
+
+        # Reject invalid arguments before any side effects
+        errors = self.validate_arguments(tool, tool_input)
+        if errors:
+            return self._rejected(
+                name,
+                f"Invalid arguments for `{name}` (the tool was not run):\n"
+                + "\n".join(f"- {error}" for error in errors),
+            )
+
+        if background and self.jobs is not None and tool.supports_background():
+            try:
+                return self._start_job(name, tool, tool_input, stop_on)
+            except ToolError as e:
+                return ToolFailure(error=e.message)
+
+        memo = self.memo
+        idempotent = memo is not None and tool.is_idempotent(**(tool_input or {}))
+        if idempotent:
+            key = memo_key(name, tool_input or {})
+            entry = memo.get(key, tool.memo_version())
+            if entry is not None:
+                logger.info(f"Reusing result of an identical '{name}' call")
+                result = self._cached_result(entry)
+                self._record(name, 0.0, result, cached=True)
+                return result
+
+        started = time.perf_counter()
+        result = None
         try:
-            result = await tool(**tool_input)
-            return result
+            with span("tool.execute", tool=name):
+                result = await tool.call_with_timeout(
+                    call_timeout=timeout,
+                    on_progress=self._progress_callback(tool, name, call_id, stop_on),
+                    **tool_input,
+                )
         except ToolError as e:
-            return ToolFailure(error=e.message)
+            result = ToolFailure(error=e.message)
+            return result
+        finally:
+            if memo is not None and not idempotent:
+                memo.invalidate(name, tool.modified_paths(**(tool_input or {})))
+            # `result` is still None when the call raised or was cancelled
+            self._record(
+                name,
+                time.perf_counter() - started,
+                result,
+                error=True if result is None else None,
+            )
 
-    async def execute_all(self) -> List[ToolResult]:
-        """Execute all tools in the collection sequentially."""
-        results = []
-        for tool in self.tools:
+        # A call stopped by `stop_on` returned partial output; don't reuse it
+        if idempotent and stop_on is None and not getattr(result, "error", None):
+            memo.put(
+                key,
+                result,
+                tool.dependent_paths(**tool_input),
+                call_id=call_id,
+                version=tool.memo_version(),
+            )
+        return result
+
+    def _start_job(
+        self,
+        name: str,
+        tool: BaseTool,
+        tool_input: Dict[str, Any],
+        stop_on: Optional[Pattern] = None,
+    ) -> ToolResult:
+        async def run_job():
+            instance = tool.background_instance()
+            started = time.perf_counter()
+            result = None
             try:
-                result = await tool()
-                results.append(result)
-            except ToolError as e:
-                results.append(ToolFailure(error=e.message))
-        return results
+                with span("tool.execute", tool=name, background=True):
+                    result = await instance.call_with_timeout(
+                        call_timeout=JOB_TIMEOUT,
+                        on_progress=self._progress_callback(
+                            instance, name, job.job_id, stop_on, job
+                        ),
+                        **tool_input,
+                    )
+                    return result
+            finally:
+                self._record(
+                    name,
+                    time.perf_counter() - started,
+                    result,
+                    error=True if result is None else None,
+                    background=True,
+                )
+                if instance is not tool and hasattr(instance, "cleanup"):
+                    await instance.cleanup()
+                # The job may have changed files while other calls were memoized
+                if self.memo is not None and not tool.is_idempotent(**tool_input):
+                    self.memo.invalidate(name, tool.modified_paths(**tool_input))
+
+        job = self.jobs.start(name, tool_input, run_job())
+        return ToolResult(
+            output=(
+                f"Started background job `{job.job_id}` for `{name}`. "
+                "You will be notified when it finishes; use `job_status` to check "
+                "progress or `job_result` to get (or wait for) its output."
+            )
+        )
+
+    @staticmethod
+    def _record(name: str, seconds: float, result: Any, **kwargs) -> None:
+        if metrics_enabled():
+            tool_metrics().record_call(name, seconds, result, **kwargs)
+
+    def _rejected(self, name: str, error: str) -> ToolFailure:
+        """A call refused before running (counted as a failed call)."""
+        result = ToolFailure(error=error)
+        self._record(name, 0.0, result)
+        return result
+
+    @staticmethod
+    def _compile_stop_pattern(pattern: Any) -> Optional[Pattern]:
+        if not pattern:
+            return None
+        if not isinstance(pattern, str):
+            raise re.error(f"expected a string, got {type(pattern).__name__}")
+        return re.compile(pattern)
+
+    @staticmethod
+    def _progress_callback(
+        tool: BaseTool,
+        name: str,
+        call_id: Optional[str],
+        stop_on: Optional[Pattern] = None,
+        job: Optional[BackgroundJob] = None,
+    ) -> Optional[ProgressCallback]:
+        """Relay partial output to the event stream (and the job), and apply `stop_on`."""
+        if not tool.supports_streaming():
+            return None
+
+        def on_progress(update: ToolProgress) -> Optional[str]:
+            emit(
+                ToolCallProgress,
+                tool_call_id=call_id or "",
+                name=name,
+                output=update.output,
+                error=update.error,
+                message=update.message,
+                progress=update.progress,
+            )
+            if update.message:
+                logger.info(f"⏳ {name}: {update.message}")
+            if job is not None:
+                job.record(update)
+            if stop_on is None:
+                return None
+            for line in (update.output + update.error).splitlines():
+                if stop_on.search(line):
+                    matched = line.strip()
+                    if len(matched) > 200:
+                        matched = matched[:197] + "..."
+                    return f"output matched `{stop_on.pattern}`: {matched}"
+            return None
+
+        return on_progress
+
+    @staticmethod
+    def _cached_result(entry: MemoEntry) -> CachedToolResult:
+        if isinstance(entry.result, ToolResult):
+            fields = {
+                field: getattr(entry.result, field)
+                for field in ToolResult.model_fields
+            }
+            return CachedToolResult(**fields, source_call_id=entry.call_id)
+        return CachedToolResult(output=entry.result, source_call_id=entry.call_id)
+
+    async def execute_all(
+        self,
+        inputs: Optional[Dict[str, Dict[str, Any]]] = None,
+        *,
+        names: Optional[Iterable[str]] = None,
+        max_concurrency: int = EXECUTE_ALL_CONCURRENCY,
+        timeout: Optional[float] = None,
+    ) -> List[Any]:
+        """Execute several tools concurrently, e.g. to health-check or warm them up.
+
+        Args:
+            inputs: Arguments by tool name (tools not listed get none)
+            names: Tools to run, in this order (default: every tool)
+            max_concurrency: Maximum tools running at once
+            timeout: Limit per tool overriding its `timeout_for`
+
+        Returns:
+            One result per tool, in the order of `names` (or the collection).
+            A tool that raises or times out yields a `ToolFailure` instead of
+            failing the others.
+        """
+        inputs = inputs or {}
+        if names is None:
+            tools = list(self.tools)
+        else:
+            tools = [self.tool_map.get(name) or name for name in names]
+        slots = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def run(tool) -> Any:
+            if not isinstance(tool, BaseTool):
+                return ToolFailure(error=f"Tool {tool} is invalid")
+            async with slots:
+                try:
+                    with span("tool.execute", tool=tool.name):
+                        return await tool.call_with_timeout(
+                            call_timeout=timeout, **inputs.get(tool.name, {})
+                        )
+                except ToolError as e:
+                    return ToolFailure(error=e.message)
+                except Exception as e:
+                    logger.warning(f"Tool '{tool.name}' failed in execute_all: {e}")
+                    return ToolFailure(error=f"{type(e).__name__}: {e}")
+
+        # gather keeps the input order regardless of completion order
+        return list(await asyncio.gather(*(run(tool) for tool in tools)))
 
     def get_tool(self, name: str) -> BaseTool:
         return self.tool_map.get(name)
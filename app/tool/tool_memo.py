@@ -0,0 +1,132 @@
+"""
+Tool Memo - 실행 단위 도구 호출 메모이제이션
+===========================================
+에이전트는 같은 읽기 전용 호출(바뀌지 않은 파일의 `str_replace_editor view`,
+같은 `web_search` 질의, `planning get`)을 자주 반복합니다.
+`ToolCollection.execute`에서 멱등 호출의 결과를 실행 단위로 기억해 재실행을 피합니다.
+
+- 키: 도구 이름 + 정규화된 인자(JSON, 키 정렬)
+- 멱등 여부는 도구가 `BaseTool.is_idempotent()`로 호출마다 선언
+- 무효화
+  - 의존 파일(`BaseTool.dependent_paths()`)의 mtime이 바뀐 경우 (조회 시 확인)
+  - 도구 내부 상태 버전(`BaseTool.memo_version()`)이 바뀐 경우 (도구를 직접 호출한 변경 포함)
+  - 같은 도구의 비멱등 호출 (예: `planning mark_step` 후 `planning get`)
+  - 파일을 수정하는 호출: `BaseTool.modified_paths()`가 경로를 알려주면 해당 경로와
+    상위/하위 경로에 의존하는 항목만, 알 수 없으면(`None`, 예: `bash`) 파일에 의존하는 모든 항목
+- 오류 결과는 기억하지 않음
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import PurePath
+from typing import Any, Dict, List, Optional, Tuple
+
+
+MemoKey = Tuple[str, str]
+
+
+def memo_key(name: str, tool_input: Dict[str, Any]) -> MemoKey:
+    """도구 이름과 정규화된 인자로 메모 키를 만듭니다."""
+    return name, json.dumps(
+        tool_input, sort_keys=True, separators=(",", ":"), default=str
+    )
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        # 샌드박스 안의 경로 등 로컬에서 확인할 수 없는 파일
+        return None
+
+
+def _overlaps(a: PurePath, b: PurePath) -> bool:
+    """두 경로가 같거나 한쪽이 다른 쪽의 상위 디렉토리인지 확인합니다."""
+    return a == b or a in b.parents or b in a.parents
+
+
+@dataclass
+class MemoEntry:
+    """기억된 도구 호출 결과 하나."""
+
+    name: str
+    result: Any
+    call_id: Optional[str] = None
+    mtimes: Dict[str, Optional[int]] = field(default_factory=dict)
+    version: Any = None
+    hits: int = 0
+
+    def is_fresh(self, version: Any = None) -> bool:
+        return version == self.version and all(
+            _mtime(path) == mtime for path, mtime in self.mtimes.items()
+        )
+
+
+class ToolMemo:
+    """실행 하나 동안 유지되는 멱등 도구 호출 결과 캐시."""
+
+    def __init__(self):
+        self._entries: Dict[MemoKey, MemoEntry] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: MemoKey, version: Any = None) -> Optional[MemoEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if not entry.is_fresh(version):
+            del self._entries[key]
+            self.misses += 1
+            return None
+        entry.hits += 1
+        self.hits += 1
+        return entry
+
+    def put(
+        self,
+        key: MemoKey,
+        result: Any,
+        paths: List[str],
+        call_id: Optional[str] = None,
+        version: Any = None,
+    ) -> None:
+        self._entries[key] = MemoEntry(
+            name=key[0],
+            result=result,
+            call_id=call_id,
+            mtimes={path: _mtime(path) for path in paths},
+            version=version,
+        )
+
+    def invalidate(self, name: str, modified_paths: Optional[List[str]]) -> None:
+        """비멱등 호출 이후 영향을 받을 수 있는 항목을 제거합니다.
+
+        Args:
+            name: 실행된 도구 이름 (같은 도구의 항목은 모두 제거)
+            modified_paths: 호출이 수정한 경로. None이면 어떤 파일이든 바뀌었을 수 있음
+        """
+        modified = (
+            None
+            if modified_paths is None
+            else [PurePath(path) for path in modified_paths]
+        )
+        for key, entry in list(self._entries.items()):
+            if entry.name == name:
+                del self._entries[key]
+            elif entry.mtimes and (
+                modified is None
+                or any(
+                    _overlaps(PurePath(path), changed)
+                    for path in entry.mtimes
+                    for changed in modified
+                )
+            ):
+                del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,283 @@
+"""
+Tool Metrics - 도구 실행 지표
+=============================
+`ToolCollection.execute`를 거치는 모든 도구 호출을 도구 이름과 에이전트별로 집계합니다.
+`browser_use`, `crawl4ai`, 샌드박스 중 무엇이 병목인지 로그를 뒤지지 않고 확인할 수 있습니다.
+
+집계 항목:
+- 호출 수, 오류율(검증 실패 포함), 메모 재사용/백그라운드 작업 수
+- 지연 시간 히스토그램 (평균, 최대, p50/p95 추정)
+- 출력 크기: 도구 결과의 UTF-8 바이트, 대화에 들어간 관찰의 토큰 수
+- 잘림 비율: 상한을 넘어 잘리거나 블롭으로 옮겨진 관찰의 비율
+
+- 지표는 세션 범위 (`current_session().data`)로, `tool_metrics()`로 프로세스 안에서 조회
+- 에이전트 이름은 `metrics_agent()` 범위에서 가져옴 (`BaseAgent.run`이 설정, 하위 에이전트는 자기 이름)
+- 가장 바깥 실행이 끝나면 그 실행의 요약을 로그로 남기고 JSON으로 저장한 뒤 초기화
+  (`directory`, 파일마다 실행 하나의 지표)
+
+설정 (config.toml):
+    [tool_metrics]
+    enabled = true
+    directory = "metrics"
+"""
+
+import bisect
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.config import PROJECT_ROOT, config
+from app.logger import logger
+from app.session import current_session
+
+
+# 지연 시간 히스토그램 구간 상한 (초). 마지막 구간은 그 이상
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+
+_SESSION_KEY = "tool_metrics"
+_NO_AGENT = "-"
+
+_metrics_agent: ContextVar[Optional[str]] = ContextVar("metrics_agent", default=None)
+
+
+@dataclass
+class ToolStats:
+    """도구 하나(에이전트 하나)의 누적 지표."""
+
+    calls: int = 0
+    errors: int = 0
+    cached: int = 0
+    background: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    output_bytes: int = 0
+    observations: int = 0
+    observation_tokens: int = 0
+    truncated: int = 0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.calls if self.calls else 0.0
+
+    @property
+    def truncation_rate(self) -> float:
+        return self.truncated / self.observations if self.observations else 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """히스토그램에서 추정한 백분위 지연 (해당 구간의 상한, 마지막 구간은 최대값)."""
+        if not self.calls:
+            return 0.0
+        target = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                if index < len(LATENCY_BUCKETS):
+                    return min(LATENCY_BUCKETS[index], self.max_seconds)
+                break
+        return self.max_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "cached": self.cached,
+            "background": self.background,
+            "total_seconds": round(self.total_seconds, 3),
+            "mean_seconds": round(self.mean_seconds, 3),
+            "p50_seconds": round(self.percentile(0.5), 3),
+            "p95_seconds": round(self.percentile(0.95), 3),
+            "max_seconds": round(self.max_seconds, 3),
+            "latency_histogram": {
+                **{f"le_{bound:g}": count for bound, count in zip(LATENCY_BUCKETS, self.buckets)},
+                "inf": self.buckets[-1],
+            },
+            "output_bytes": self.output_bytes,
+            "observation_tokens": self.observation_tokens,
+            "truncated": self.truncated,
+            "truncation_rate": round(self.truncation_rate, 4),
+        }
+
+
+class ToolMetrics:
+    """(에이전트, 도구)별 지표 모음."""
+
+    def __init__(self):
+        self.stats: Dict[Tuple[str, str], ToolStats] = {}
+        self.started_at = time.time()
+
+    def _stats(self, tool: str, agent: Optional[str]) -> ToolStats:
+        key = (agent or _metrics_agent.get() or _NO_AGENT, tool)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = ToolStats()
+        return stats
+
+    def record_call(
+        self,
+        tool: str,
+        seconds: float,
+        result: Any = None,
+        error: Optional[bool] = None,
+        cached: bool = False,
+        background: bool = False,
+        agent: Optional[str] = None,
+    ) -> None:
+        """도구 호출 하나를 기록합니다 (`error`가 없으면 결과의 `error`로 판단)."""
+        stats = self._stats(tool, agent)
+        stats.calls += 1
+        if error is None:
+            error = bool(getattr(result, "error", None))
+        stats.errors += bool(error)
+        stats.cached += cached
+        stats.background += background
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.output_bytes += _output_bytes(result)
+
+    def record_observation(
+        self, tool: str, tokens: int, truncated: bool, agent: Optional[str] = None
+    ) -> None:
+        """대화에 추가된 도구 관찰의 토큰 수와 잘림 여부를 기록합니다."""
+        stats = self._stats(tool, agent)
+        stats.observations += 1
+        stats.observation_tokens += tokens
+        stats.truncated += truncated
+
+    def by_tool(self) -> Dict[str, ToolStats]:
+        """에이전트를 합친 도구별 지표."""
+        merged: Dict[str, ToolStats] = {}
+        for (_, tool), stats in self.stats.items():
+            total = merged.setdefault(tool, ToolStats())
+            total.calls += stats.calls
+            total.errors += stats.errors
+            total.cached += stats.cached
+            total.background += stats.background
+            total.total_seconds += stats.total_seconds
+            total.max_seconds = max(total.max_seconds, stats.max_seconds)
+            total.buckets = [a + b for a, b in zip(total.buckets, stats.buckets)]
+            total.output_bytes += stats.output_bytes
+            total.observations += stats.observations
+            total.observation_tokens += stats.observation_tokens
+            total.truncated += stats.truncated
+        return merged
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON으로 저장할 수 있는 지표 사본."""
+        return {
+            "started_at": self.started_at,
+            "collected_at": time.time(),
+            "tools": {tool: stats.to_dict() for tool, stats in self.by_tool().items()},
+            "by_agent": [
+                {"agent": agent, "tool": tool, **stats.to_dict()}
+                for (agent, tool), stats in sorted(self.stats.items())
+            ],
+        }
+
+    def summary(self) -> str:
+        """총 실행 시간 순 도구별 요약 표."""
+        rows = sorted(
+            self.by_tool().items(), key=lambda item: item[1].total_seconds, reverse=True
+        )
+        lines = [
+            f"{'tool':<24} {'calls':>5} {'err%':>5} {'total s':>8} {'p50 s':>6} "
+            f"{'p95 s':>6} {'KB out':>8} {'tokens':>8} {'trunc%':>6}"
+        ]
+        for tool, stats in rows:
+            lines.append(
+                f"{tool[:24]:<24} {stats.calls:>5} {stats.error_rate * 100:>5.1f} "
+                f"{stats.total_seconds:>8.2f} {stats.percentile(0.5):>6.2f} "
+                f"{stats.percentile(0.95):>6.2f} {stats.output_bytes / 1024:>8.1f} "
+                f"{stats.observation_tokens:>8} {stats.truncation_rate * 100:>6.1f}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, directory: Path, name: str) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{name}.json"
+        path.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+        return path
+
+    def clear(self) -> None:
+        self.stats.clear()
+        self.started_at = time.time()
+
+
+def _output_bytes(result: Any) -> int:
+    """결과 텍스트의 UTF-8 바이트 수 (이미지 데이터 제외)."""
+    if result is None:
+        return 0
+    text = str(result)
+    return len(text.encode("utf-8", errors="ignore")) if text else 0
+
+
+def tool_metrics() -> ToolMetrics:
+    """현재 세션의 도구 지표."""
+    data = current_session().data
+    metrics = data.get(_SESSION_KEY)
+    if metrics is None:
+        metrics = data[_SESSION_KEY] = ToolMetrics()
+    return metrics
+
+
+def metrics_enabled() -> bool:
+    return config.tool_metrics_config.enabled
+
+
+@contextmanager
+def metrics_agent(name: str) -> Iterator[None]:
+    """블록 안의 도구 호출을 에이전트 `name`의 호출로 기록합니다.
+
+    가장 바깥 범위(하위 에이전트가 아닌 실행)가 끝나면 `report_tool_metrics()`를 호출합니다.
+    """
+    outermost = _metrics_agent.get() is None
+    token = _metrics_agent.set(name)
+    try:
+        yield
+    finally:
+        _metrics_agent.reset(token)
+        if outermost:
+            report_tool_metrics()
+
+
+def report_tool_metrics() -> Optional[Path]:
+    """현재 세션의 지표 요약을 로그로 남기고 설정된 디렉토리에 JSON으로 저장합니다.
+
+    보고한 지표는 초기화되므로 다음 보고에는 그 이후의 호출만 포함됩니다.
+    """
+    settings = config.tool_metrics_config
+    metrics = tool_metrics()
+    if not settings.enabled or not metrics.stats:
+        return None
+    try:
+        logger.info(f"📊 Tool metrics:\n{metrics.summary()}")
+        if not settings.directory:
+            return None
+        session = current_session()
+        name = (
+            f"tool-metrics-{session.session_id}-"
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        )
+        try:
+            path = metrics.dump(PROJECT_ROOT / settings.directory, name)
+        except OSError as e:
+            logger.warning(f"Failed to write tool metrics: {e}")
+            return None
+        logger.info(f"📊 Tool metrics written to {path}")
+        return path
+    finally:
+        metrics.clear()
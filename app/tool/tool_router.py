@@ -0,0 +1,293 @@
+"""
+Tool Router - 단계별 도구 선택
+==============================
+에이전트는 매 요청마다 모든 도구의 스키마를 보냅니다. `browser_use` 하나만으로도
+스키마가 크고, MCP 서버가 여러 개 연결되면 도구 목록이 대화 자체보다 길어집니다.
+`ToolRouter`는 매 `think`마다 지금 단계에 필요한 도구만 골라 요청 입력 토큰을 줄입니다.
+
+선택 순서 (`max_tools`에 도달하면 이후 항목은 생략):
+1. 항상 포함: 에이전트가 고정한 도구(`ToolCallAgent.pinned_tools`), `ask_human`, `request_tools`
+   (고정 도구가 많아도 나머지 후보에 최소 `top_k`개 자리를 남김)
+2. `request_tools`로 요청된 도구 (`sticky_steps` 단계 동안 유지)
+3. 에이전트가 지정한 현재 단계의 도구 (`ToolCallAgent.preferred_tools`)
+4. 최근 `recent_steps`개 응답에서 사용한 도구
+5. 최근 대화와 도구 이름/설명의 키워드 일치 (로컬 BM25, 상위 `top_k`개)
+
+- 숨겨진 도구도 호출하면 그대로 실행됨 (라우터는 LLM에 보내는 스키마만 줄임)
+- 도구가 `min_tools`개 이하면 모든 도구를 보냄
+- 같은 선택이 반복되면 같은 목록 객체를 재사용 (LLM의 도구 토큰 캐시가 그대로 적중)
+
+설정 (config.toml):
+    [tool_router]
+    enabled = true
+    max_tools = 8
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pydantic import Field
+
+from app.config import ToolRouterSettings, config
+from app.exceptions import ToolError
+from app.logger import logger
+from app.tool.ask_human import AskHuman
+from app.tool.base import BaseTool, ToolResult
+from app.utils.archival_memory import tokenize
+
+
+_REQUEST_TOOLS_DESCRIPTION = """Only the tools relevant to the current step are offered; more tools are available on request.
+Call without arguments to list every available tool with a one-line summary.
+Pass `names` to enable tools for the next steps, then call them in your next response."""
+
+# 문장 끝: 마침표 뒤 공백 + 대문자 또는 한글 (`e.g.` 같은 약어에서 자르지 않도록)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z가-힣])")
+
+# BM25 파라미터 (도구 설명 길이 차이를 보정)
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def _summary(tool: BaseTool, limit: int = 100) -> str:
+    """도구 설명의 첫 문장 (목록 표시용)."""
+    text = _SENTENCE_END.split(" ".join((tool.description or "").split()), 1)[0]
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _tool_terms(tool: BaseTool) -> List[str]:
+    """도구 이름(단어 단위)과 설명, 인자 이름에서 색인할 토큰."""
+    properties = (tool.parameters or {}).get("properties") or {}
+    text = " ".join(
+        [tool.name.replace("_", " "), tool.description or ""]
+        + [name.replace("_", " ") for name in properties]
+    )
+    return tokenize(text)
+
+
+class ToolRouter:
+    """매 단계 LLM에 보낼 도구를 고릅니다.
+
+    Args:
+        settings: 라우터 설정 (기본: `[tool_router]`)
+        aliases: 도구 이름 -> 추가 키워드 (예: 한국어 표현). 최근 대화에
+            키워드가 포함되면 해당 도구를 키워드 일치 후보에 우선 포함
+    """
+
+    def __init__(
+        self,
+        settings: Optional[ToolRouterSettings] = None,
+        aliases: Optional[Dict[str, Sequence[str]]] = None,
+    ):
+        self.settings = settings or config.tool_router_config
+        self.aliases = {
+            name: [keyword.lower() for keyword in keywords]
+            for name, keywords in (aliases or {}).items()
+        }
+        # request_tools로 요청된 도구 -> 남은 단계 수
+        self._requested: Dict[str, int] = {}
+        # 마지막으로 라우팅한 도구 모음 (request_tools가 목록을 보여줄 때 사용)
+        self._tools = None
+        # 색인과 선택 목록은 (도구 모음, 버전)마다 다시 만듦
+        self._index_key: Optional[Tuple[int, int]] = None
+        self._index: Dict[str, Counter] = {}
+        self._idf: Dict[str, float] = {}
+        self._avg_length = 0.0
+        self._subsets: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        self._subset_key: Optional[Tuple[int, int]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.enabled
+
+    @property
+    def tools(self):
+        """마지막으로 라우팅한 도구 모음 (아직 없으면 None)."""
+        return self._tools
+
+    def reset(self) -> None:
+        self._requested.clear()
+
+    def request(self, names: Iterable[str]) -> None:
+        """도구를 다음 `sticky_steps` 단계 동안 선택에 포함합니다."""
+        for name in names:
+            self._requested[name] = self.settings.sticky_steps
+
+    def select(
+        self,
+        tools,
+        messages: Sequence[Any],
+        query: str = "",
+        preferred: Sequence[str] = (),
+        pinned: Sequence[str] = (),
+    ) -> List[Dict[str, Any]]:
+        """이번 단계에 보낼 도구 정의 목록을 반환합니다.
+
+        Args:
+            tools: 에이전트의 `ToolCollection`
+            messages: 대화 메시지 (최근 사용한 도구를 찾는 데 사용)
+            query: 키워드 일치에 사용할 최근 대화 내용
+            preferred: 현재 단계에 우선 포함할 도구 이름
+            pinned: 항상 포함할 도구 이름
+
+        반환 목록은 공유되므로 수정하면 안 됩니다.
+        """
+        self._tools = tools
+        params = tools.to_params()
+        requested = self._advance_requested()
+        if not self.enabled or len(tools.tools) <= self.settings.min_tools:
+            return params
+
+        available = tools.tool_map
+        always = list(pinned) + [AskHuman.tool_name(), RequestTools.tool_name()]
+        candidates = [
+            always,
+            requested,
+            list(preferred),
+            self._recently_used(messages),
+        ]
+        selected: List[str] = []
+        for group in candidates:
+            for name in group:
+                if name in available and name not in selected:
+                    selected.append(name)
+        for name in self._keyword_matches(tools, query):
+            if name not in selected:
+                selected.append(name)
+
+        # 우선순위 순으로 자르되, 항상 포함할 도구는 남김
+        pinned_names = [name for name in always if name in available]
+        rest = [name for name in selected if name not in pinned_names]
+        # 고정 도구가 많은 에이전트(Manus)도 요청/최근/키워드 도구를 받도록 최소 top_k개
+        budget = max(self.settings.max_tools - len(pinned_names), self.settings.top_k)
+        chosen = set(pinned_names + rest[:budget])
+        if len(chosen) >= len(available):
+            return params
+
+        # 순서는 도구 모음 순서를 유지 (선택이 같으면 같은 목록 객체를 재사용)
+        key = tuple(tool.name for tool in tools.tools if tool.name in chosen)
+        if self._subset_key != (id(tools), tools.version):
+            self._subsets.clear()
+            self._subset_key = (id(tools), tools.version)
+        subset = self._subsets.get(key)
+        if subset is None:
+            subset = [
+                param for param in params if param["function"]["name"] in chosen
+            ]
+            self._subsets[key] = subset
+            logger.debug(
+                f"🧭 Routing {len(subset)}/{len(params)} tools: {', '.join(key)}"
+            )
+        return subset
+
+    def _advance_requested(self) -> List[str]:
+        """요청된 도구의 남은 단계를 하나 줄이고, 이번 단계에 포함할 이름을 반환합니다."""
+        active = list(self._requested)
+        for name in active:
+            self._requested[name] -= 1
+            if self._requested[name] <= 0:
+                del self._requested[name]
+        return active
+
+    def _recently_used(self, messages: Sequence[Any]) -> List[str]:
+        names: List[str] = []
+        steps = 0
+        for msg in reversed(messages):
+            if msg.role != "assistant":
+                continue
+            steps += 1
+            if steps > self.settings.recent_steps:
+                break
+            for call in msg.tool_calls or []:
+                if call.function.name not in names:
+                    names.append(call.function.name)
+        return names
+
+    def _build_index(self, tools) -> None:
+        if self._index_key == (id(tools), tools.version):
+            return
+        self._index = {tool.name: Counter(_tool_terms(tool)) for tool in tools.tools}
+        document_frequency: Counter = Counter()
+        for terms in self._index.values():
+            document_frequency.update(terms.keys())
+        count = max(len(self._index), 1)
+        self._idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+        lengths = [sum(terms.values()) for terms in self._index.values()]
+        self._avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        self._index_key = (id(tools), tools.version)
+
+    def _keyword_matches(self, tools, query: str) -> List[str]:
+        """최근 대화와 가장 관련 있는 도구 이름 (점수 순, 최대 `top_k`개)."""
+        if not query or self.settings.top_k <= 0:
+            return []
+        self._build_index(tools)
+        lowered = query.lower()
+        query_terms = set(tokenize(query))
+        scores: Dict[str, float] = {}
+        for name, terms in self._index.items():
+            length = sum(terms.values())
+            norm = _BM25_K1 * (
+                1 - _BM25_B + _BM25_B * length / (self._avg_length or 1.0)
+            )
+            score = 0.0
+            for term in query_terms & terms.keys():
+                tf = terms[term]
+                score += self._idf[term] * tf * (_BM25_K1 + 1) / (tf + norm)
+            if any(keyword in lowered for keyword in self.aliases.get(name, ())):
+                # 별칭이 직접 언급되면 설명 일치보다 우선
+                score += 100.0
+            if score > 0:
+                scores[name] = score
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return ranked[: self.settings.top_k]
+
+
+class RequestTools(BaseTool):
+    """라우터가 숨긴 도구를 보여주고 다음 단계에 포함시키는 도구."""
+
+    name: str = "request_tools"
+    description: str = _REQUEST_TOOLS_DESCRIPTION
+    parameters: dict = {
+        "type": "object",
+        "properties": {
+            "names": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "(optional) Names of the tools to enable. Omit to list all tools.",
+            },
+        },
+    }
+
+    router: Optional[ToolRouter] = Field(default=None, exclude=True)
+
+    def modified_paths(self, **kwargs) -> Optional[List[str]]:
+        return []
+
+    async def execute(self, names: Optional[List[str]] = None, **kwargs) -> ToolResult:
+        if self.router is None or self.router.tools is None:
+            raise ToolError("No tool router is attached to this agent")
+        tools = self.router.tools.tool_map
+
+        if not names:
+            lines = [
+                f"- {tool.name}: {_summary(tool)}"
+                for tool in tools.values()
+                if tool.name != self.name
+            ]
+            return ToolResult(output="Available tools:\n" + "\n".join(lines))
+
+        unknown = [name for name in names if name not in tools]
+        if unknown:
+            raise ToolError(
+                f"Unknown tools: {', '.join(unknown)}. "
+                "Call `request_tools` without arguments to list them."
+            )
+        self.router.request(names)
+        return ToolResult(
+            output=f"Enabled for the next steps: {', '.join(names)}. "
+            "Call them in your next response."
+        )
@@ -190,13 +190,27 @@ class WebSearch(BaseTool):
         },
         "required": ["query"],
     }
-    _search_engine: dict[str, WebSearchEngine] = {
-        "google": GoogleSearchEngine(),
-        "baidu": BaiduSearchEngine(),
-        "duckduckgo": DuckDuckGoSearchEngine(),
-        "bing": BingSearchEngine(),
-    }
+    # Built on first search (see `search_engines`); Bing opens an HTTP session
+    _search_engine: Optional[dict[str, WebSearchEngine]] = None
     content_fetcher: WebContentFetcher = WebContentFetcher()
+    # Covers engine fallbacks; the retry rounds wait `retry_delay` between them
+    default_timeout: Optional[float] = 240.0
+
+    def is_idempotent(self, **kwargs) -> bool:
+        # Repeating a query within one run returns the same results
+        return True
+
+    @property
+    def search_engines(self) -> dict[str, WebSearchEngine]:
+        """Search engines by name, created on first use."""
+        if self._search_engine is None:
+            self._search_engine = {
+                "google": GoogleSearchEngine(),
+                "baidu": BaiduSearchEngine(),
+                "duckduckgo": DuckDuckGoSearchEngine(),
+                "bing": BingSearchEngine(),
+            }
+        return self._search_engine
 
     async def execute(
         self,
@@ -295,7 +309,7 @@ class WebSearch(BaseTool):
         failed_engines = []
 
         for engine_name in engine_order:
-            engine = self._search_engine[engine_name]
+            engine = self.search_engines[engine_name]
             logger.info(f"🔎 Attempting search with {engine_name.capitalize()}...")
             search_items = await self._perform_search_with_engine(
                 engine, query, num_results, search_params
@@ -372,15 +386,15 @@ class WebSearch(BaseTool):
         )
 
         # Start with preferred engine, then fallbacks, then remaining engines
-        engine_order = [preferred] if preferred in self._search_engine else []
+        engine_order = [preferred] if preferred in self.search_engines else []
         engine_order.extend(
             [
                 fb
                 for fb in fallbacks
-                if fb in self._search_engine and fb not in engine_order
+                if fb in self.search_engines and fb not in engine_order
             ]
         )
-        engine_order.extend([e for e in self._search_engine if e not in engine_order])
+        engine_order.extend([e for e in self.search_engines if e not in engine_order])
 
         return engine_order
 
@@ -0,0 +1,302 @@
+"""
+Tracing - 핫패스 트레이싱 스팬
+==============================
+스텝의 실행 시간이 어디에 쓰이는지(LLM 지연, 도구 실행, 스크린샷 캡처,
+MCP 왕복, 샌드박스 명령) 확인할 수 있도록 주요 경로에 스팬을 기록합니다.
+
+- 비활성화 시: `span()`은 공유 no-op 컨텍스트를 반환하고 `traced`는 원래 함수를 그대로 호출
+- 활성화 시: 스팬을 메모리에 모았다가 종료 시(또는 `flush_traces()` 호출 시) 내보냄
+  - OTLP 호환 JSON 파일 (`traces/<trace>.json`)
+  - Chrome trace 파일 (`traces/<trace>.chrome.json`, ui.perfetto.dev에서 플레임 차트로 확인)
+  - 선택적으로 OTLP/HTTP 수집기(`endpoint`/v1/traces)로 전송
+
+설정 (config.toml):
+    [tracing]
+    enabled = true
+    directory = "traces"
+    chrome_trace = true
+    endpoint = "http://localhost:4318"
+
+사용 예:
+    with span("tool.execute", tool=name):
+        result = await tool(**tool_input)
+
+    @traced("llm.ask")
+    async def ask(self, ...): ...
+"""
+
+import asyncio
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.config import PROJECT_ROOT, TracingSettings, config
+from app.logger import logger
+
+
+class Span:
+    """완료되었거나 진행 중인 스팬 하나."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+        "track",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional["Span"],
+        track: int,
+        attributes: Dict[str, Any],
+    ):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = attributes
+        self.error: Optional[str] = None
+        self.track = track
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class Tracer:
+    """스팬을 수집하고 OTLP JSON / Chrome trace 형식으로 내보내는 트레이서."""
+
+    def __init__(self, settings: Optional[TracingSettings] = None):
+        self.settings = settings or config.tracing_config
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._tracks: Dict[int, int] = {}
+
+    def _track(self) -> int:
+        """Chrome trace의 tid로 쓸 트랙 번호 (asyncio 태스크 또는 스레드 단위)."""
+        try:
+            key = id(asyncio.current_task())
+        except RuntimeError:
+            key = threading.get_ident()
+        with self._lock:
+            return self._tracks.setdefault(key, len(self._tracks) + 1)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        current = Span(name, _current_span.get(), self._track(), attributes)
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            current.end_ns = time.time_ns()
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(current)
+
+    def drain(self) -> List[Span]:
+        with self._lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+    def export(self) -> Optional[Path]:
+        """수집된 스팬을 파일(및 설정된 수집기)로 내보냅니다.
+
+        Returns:
+            작성된 OTLP JSON 파일 경로. 내보낼 스팬이 없으면 None.
+        """
+        spans = self.drain()
+        if not spans:
+            return None
+
+        payload = self._otlp_payload(spans)
+        directory = PROJECT_ROOT / self.settings.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{spans[0].trace_id[:8]}"
+        path = directory / f"{stem}.json"
+        path.write_text(json.dumps(payload), encoding="utf-8")
+        if self.settings.chrome_trace:
+            (directory / f"{stem}.chrome.json").write_text(
+                json.dumps(self._chrome_payload(spans)), encoding="utf-8"
+            )
+        logger.info(f"Wrote {len(spans)} trace spans to {path}")
+
+        if self.settings.endpoint:
+            self._post(payload)
+        return path
+
+    def _post(self, payload: dict) -> None:
+        url = self.settings.endpoint.rstrip("/") + "/v1/traces"
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+        except Exception as e:
+            logger.warning(f"Failed to send trace spans to {url}: {e}")
+
+    def _otlp_payload(self, spans: List[Span]) -> dict:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": self.settings.service_name}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.tracing"},
+                            "spans": [_otlp_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    @staticmethod
+    def _chrome_payload(spans: List[Span]) -> dict:
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": span.name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": span.start_ns / 1000,
+                    "dur": (span.end_ns - span.start_ns) / 1000,
+                    "pid": 1,
+                    "tid": span.track,
+                    "args": {
+                        **{k: _plain(v) for k, v in span.attributes.items()},
+                        **({"error": span.error} if span.error else {}),
+                    },
+                }
+                for span in spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+
+def _plain(value: Any) -> Any:
+    return value if isinstance(value, (str, int, float, bool)) else str(value)
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[dict]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            encoded_value = {"boolValue": value}
+        elif isinstance(value, int):
+            encoded_value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            encoded_value = {"doubleValue": value}
+        else:
+            encoded_value = {"stringValue": str(value)}
+        encoded.append({"key": key, "value": encoded_value})
+    return encoded
+
+
+def _otlp_span(span: Span) -> dict:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": (
+            {"code": 2, "message": span.error} if span.error else {"code": 1}
+        ),
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+_tracer: Optional[Tracer] = None
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_NOOP_SPAN = nullcontext()
+
+
+def span(name: str, **attributes):
+    """스팬 컨텍스트를 반환합니다. 트레이싱이 꺼져 있으면 공유 no-op 컨텍스트를 반환합니다."""
+    if _tracer is None:
+        return _NOOP_SPAN
+    return _tracer.span(name, **attributes)
+
+
+def traced(name: str):
+    """비동기 함수 전체를 스팬으로 감싸는 데코레이터."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return await func(*args, **kwargs)
+            with _tracer.span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def set_span_attributes(**attributes) -> None:
+    """현재 스팬에 속성을 추가합니다. 트레이싱이 꺼져 있으면 아무 것도 하지 않습니다."""
+    if _tracer is None:
+        return
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def is_tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def enable_tracing(settings: Optional[TracingSettings] = None) -> Tracer:
+    """트레이싱을 켭니다. 프로세스 종료 시 수집된 스팬을 내보냅니다."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(settings)
+        atexit.register(flush_traces)
+    return _tracer
+
+
+def flush_traces() -> Optional[Path]:
+    """지금까지 수집된 스팬을 내보냅니다."""
+    if _tracer is None:
+        return None
+    try:
+        return _tracer.export()
+    except Exception as e:
+        logger.warning(f"Failed to export trace spans: {e}")
+        return None
+
+
+if config.tracing_config.enabled:
+    enable_tracing()
@@ -0,0 +1,195 @@
+"""
+Archival Memory - 밀려난 대화 기록 검색 메모리
+==============================================
+`Memory` 창(기본 100개)에서 밀려난 메시지와 도구 출력을 로컬 BM25 색인에
+보관하고, 에이전트가 `think` 하기 전에 현재 대화와 관련된 조각을 찾아줍니다.
+
+- 외부 의존성 없는 순수 파이썬 BM25 (역색인)
+- 긴 도구 출력은 줄 단위로 잘라 여러 조각으로 색인
+- 같은 내용의 조각은 한 번만 색인
+- 보관 조각 수가 상한을 넘으면 가장 오래된 조각부터 제거
+
+사용 예:
+    archive = ArchivalMemory()
+    memory = Memory(archive=archive)  # 밀려난 메시지가 자동으로 색인됨
+    hits = archive.search("database schema", top_k=5)
+"""
+
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
+
+
+if TYPE_CHECKING:
+    from app.schema import MessageRecord
+
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the this "
+    "to was were will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """소문자 단어 토큰으로 분리합니다 (한글 포함, 불용어 및 한 글자 토큰 제외)."""
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and token not in _STOPWORDS
+    ]
+
+
+@dataclass(slots=True)
+class ArchivedSnippet:
+    """색인된 대화 조각."""
+
+    doc_id: int
+    role: str
+    source: str
+    text: str
+
+
+class ArchivalMemory:
+    """밀려난 대화 기록에 대한 BM25 검색 색인.
+
+    Args:
+        chunk_chars: 조각 하나의 최대 길이(문자)
+        max_snippets: 보관할 최대 조각 수
+        k1: BM25 단어 빈도 포화 계수
+        b: BM25 문서 길이 정규화 계수
+    """
+
+    def __init__(
+        self,
+        chunk_chars: int = 800,
+        max_snippets: int = 5000,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.chunk_chars = chunk_chars
+        self.max_snippets = max_snippets
+        self.k1 = k1
+        self.b = b
+
+        self.snippets: Dict[int, ArchivedSnippet] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._digests: Dict[str, int] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self.snippets)
+
+    # ------------------------------------------------------------------ #
+    # 색인
+    # ------------------------------------------------------------------ #
+
+    def add_messages(self, messages: Iterable["MessageRecord"]) -> None:
+        """메시지들을 색인합니다. 시스템 메시지는 제외합니다."""
+        for message in messages:
+            self.add_message(message)
+
+    def add_message(self, message: "MessageRecord") -> None:
+        if message.role == "system":
+            return
+        parts = [message.content] if message.content else []
+        for call in message.tool_calls or []:
+            parts.append(f"{call.function.name}({call.function.arguments})")
+        source = message.name if message.role == "tool" and message.name else message.role
+        for chunk in self._chunks("\n".join(parts)):
+            self.add(chunk, role=message.role, source=source)
+
+    def add(self, text: str, role: str, source: str) -> None:
+        """텍스트 조각 하나를 색인합니다."""
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        if digest in self._digests:
+            return
+        terms = Counter(tokenize(text))
+        if not terms:
+            return
+
+        doc_id = self._next_id
+        self._next_id += 1
+        self.snippets[doc_id] = ArchivedSnippet(doc_id, role, source, text)
+        self._doc_terms[doc_id] = terms
+        self._digests[digest] = doc_id
+        length = sum(terms.values())
+        self._lengths[doc_id] = length
+        self._total_length += length
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+
+        while len(self.snippets) > self.max_snippets:
+            self._remove(next(iter(self.snippets)))
+
+    def _remove(self, doc_id: int) -> None:
+        snippet = self.snippets.pop(doc_id)
+        self._digests.pop(hashlib.sha1(snippet.text.encode("utf-8")).hexdigest(), None)
+        self._total_length -= self._lengths.pop(doc_id)
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def _chunks(self, text: str) -> Iterator[str]:
+        """줄 경계를 기준으로 `chunk_chars` 이하의 조각으로 나눕니다."""
+        text = text.strip()
+        if len(text) <= self.chunk_chars:
+            if text:
+                yield text
+            return
+
+        buffer: List[str] = []
+        size = 0
+        for line in text.split("\n"):
+            while len(line) > self.chunk_chars:
+                if buffer:
+                    yield "\n".join(buffer)
+                    buffer, size = [], 0
+                yield line[: self.chunk_chars]
+                line = line[self.chunk_chars :]
+            if size + len(line) > self.chunk_chars and buffer:
+                yield "\n".join(buffer)
+                buffer, size = [], 0
+            if line.strip():
+                buffer.append(line)
+                size += len(line) + 1
+        if buffer:
+            yield "\n".join(buffer)
+
+    # ------------------------------------------------------------------ #
+    # 검색
+    # ------------------------------------------------------------------ #
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[float, ArchivedSnippet]]:
+        """질의와 관련도가 높은 순서로 최대 `top_k`개의 조각을 반환합니다."""
+        if not self.snippets or top_k <= 0:
+            return []
+
+        total_docs = len(self.snippets)
+        average_length = self._total_length / total_docs
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self._lengths[doc_id] / average_length
+                )
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (
+                    tf + norm
+                )
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(score, self.snippets[doc_id]) for doc_id, score in best]
@@ -0,0 +1,104 @@
+"""
+Blob Store - 대용량 도구 출력 저장소
+====================================
+도구 출력(파일 뷰, 크롤링 마크다운, bash 로그 등)을 내용 기반 주소(SHA-256)로
+디스크에 저장합니다. 메모리에는 앞/뒤 미리보기와 핸들만 남기고,
+전체 내용은 `read_blob` 도구로 필요한 부분만 다시 읽어올 수 있습니다.
+"""
+
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+from app.config import config
+
+
+BLOB_HANDLE_PREFIX = "blob:"
+BLOB_DIGEST_LENGTH = 16
+
+_HANDLE_PATTERN = re.compile(rf"^(?:{BLOB_HANDLE_PREFIX})?([0-9a-f]{{{BLOB_DIGEST_LENGTH}}})$")
+
+
+class BlobStore:
+    """내용 기반 주소 지정 방식의 온디스크 blob 저장소.
+
+    같은 내용은 항상 같은 핸들을 가지므로 중복 저장되지 않습니다.
+    저장 위치를 지정하지 않으면 현재 워크스페이스의 `.blobs` 디렉토리를 사용합니다.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self._root = Path(root) if root else None
+
+    @property
+    def root(self) -> Path:
+        """blob 저장 디렉토리를 반환합니다."""
+        return self._root or config.workspace_root / ".blobs"
+
+    @staticmethod
+    def digest(text: str) -> str:
+        """텍스트의 내용 주소(축약된 SHA-256)를 계산합니다."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:BLOB_DIGEST_LENGTH]
+
+    @staticmethod
+    def parse_handle(handle: str) -> str:
+        """`blob:<digest>` 또는 `<digest>` 형태의 핸들에서 digest를 추출합니다.
+
+        Raises:
+            ValueError: 핸들 형식이 올바르지 않은 경우
+        """
+        match = _HANDLE_PATTERN.match((handle or "").strip())
+        if not match:
+            raise ValueError(f"Invalid blob handle: {handle}")
+        return match.group(1)
+
+    def _path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, text: str) -> str:
+        """텍스트를 저장하고 핸들을 반환합니다. 이미 존재하면 다시 쓰지 않습니다."""
+        digest = self.digest(text)
+        path = self._path_for(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, path)
+        return f"{BLOB_HANDLE_PREFIX}{digest}"
+
+    def get(self, handle: str) -> str:
+        """핸들에 해당하는 전체 텍스트를 읽어옵니다.
+
+        Raises:
+            ValueError: 핸들 형식이 올바르지 않은 경우
+            FileNotFoundError: 해당 blob이 존재하지 않는 경우
+        """
+        path = self._path_for(self.parse_handle(handle))
+        if not path.exists():
+            raise FileNotFoundError(f"Blob not found: {handle}")
+        return path.read_text(encoding="utf-8")
+
+    def exists(self, handle: str) -> bool:
+        """핸들에 해당하는 blob이 존재하는지 확인합니다."""
+        try:
+            return self._path_for(self.parse_handle(handle)).exists()
+        except ValueError:
+            return False
+
+    @staticmethod
+    def preview(text: str, handle: str, head_chars: int, tail_chars: int) -> str:
+        """전체 텍스트 대신 메모리에 남길 앞/뒤 미리보기를 생성합니다."""
+        if len(text) <= head_chars + tail_chars:
+            return text
+
+        head = text[:head_chars]
+        tail = text[-tail_chars:] if tail_chars > 0 else ""
+        omitted = text[head_chars : len(text) - len(tail)]
+        notice = (
+            f"\n\n... [{omitted.count(chr(10)) + 1} lines / {len(omitted)} chars omitted. "
+            f"Full output ({len(text)} chars, {text.count(chr(10)) + 1} lines) stored as "
+            f"`{handle}`; use the `read_blob` tool with offset, line range or grep "
+            "to page through it] ...\n\n"
+        )
+        return head + notice + tail
@@ -0,0 +1,176 @@
+"""
+JSON Repair - 도구 호출 인자 파싱/복구
+======================================
+LLM이 만든 도구 인자 JSON은 긴 `file_text`에 섞인 제어 문자, 마지막 쉼표,
+출력 토큰 한도로 잘린 괄호 때문에 자주 깨집니다. 잘못된 JSON마다 스텝 전체를 다시
+요청하는 대신, 빠른 파싱을 먼저 시도하고 실패할 때만 정해진 복구 단계를 적용합니다.
+
+복구 단계 (한 번씩, 순서대로):
+1. 문자열 안의 이스케이프되지 않은 제어 문자 허용 (`json.loads(strict=False)`)
+2. 코드 펜스/앞뒤 설명 문장 제거 (첫 `{`부터 마지막 `}`까지)
+3. 문자열 밖의 마지막 쉼표 제거 (`[1, 2,]`, `{"a": 1,}`)
+4. 응답이 잘린 경우(`finish_reason == "length"`)에만: 열린 문자열/괄호 닫기,
+   실패하면 마지막 완전한 항목까지 잘라낸 뒤 닫기
+
+4단계로 닫힌 인자는 값이 잘렸을 수 있으므로, 호출하는 쪽(ToolCallAgent)은
+멱등(`is_idempotent`)인 도구만 실행하고 나머지는 더 작은 호출로 다시 요청합니다.
+
+`MAX_REPAIR_CHARS`보다 긴 입력은 복구하지 않습니다.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+
+MAX_REPAIR_CHARS = 2_000_000
+
+REPAIR_CONTROL_CHARS = "unescaped control characters"
+REPAIR_EXTRACTED = "text around the JSON object"
+REPAIR_TRAILING_COMMAS = "trailing commas"
+REPAIR_COMPLETED = "truncated JSON completed"
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _loads(text: str) -> Any:
+    # strict=False: 문자열 안의 제어 문자(탭, 줄바꿈 등)를 그대로 허용
+    return json.loads(text, strict=False)
+
+
+def _strip_trailing_commas(text: str) -> Tuple[str, bool]:
+    """문자열 밖에서 `}`/`]` 바로 앞의 쉼표를 제거합니다."""
+    out: List[str] = []
+    in_string = escape = changed = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            out.append(ch)
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "}]":
+            index = len(out) - 1
+            while index >= 0 and out[index] in " \t\r\n":
+                index -= 1
+            if index >= 0 and out[index] == ",":
+                del out[index]
+                changed = True
+        out.append(ch)
+    return "".join(out), changed
+
+
+def _complete(text: str) -> Optional[str]:
+    """잘린 JSON의 열린 문자열과 괄호를 닫아 파싱 가능한 텍스트를 만듭니다."""
+    stack: List[str] = []
+    in_string = escape = False
+    # 문자열 밖 쉼표 위치와 그때의 괄호 상태 (마지막 완전한 항목까지 자를 때 사용)
+    commas: List[Tuple[int, Tuple[str, ...]]] = []
+    for index, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]":
+            if not stack or stack[-1] != ch:
+                return None
+            stack.pop()
+        elif ch == ",":
+            commas.append((index, tuple(stack)))
+
+    if not stack and not in_string:
+        return None
+
+    candidate = text[:-1] if escape else text
+    if in_string:
+        candidate += '"'
+    candidate = candidate.rstrip()
+    if candidate.endswith(","):
+        candidate = candidate[:-1]
+    closed = candidate + "".join(reversed(stack))
+    try:
+        _loads(closed)
+        return closed
+    except ValueError:
+        pass
+
+    # 예: `{"a": 1, "b` / `{"a": 1, "b":` -> 마지막 완전한 항목 `{"a": 1` 까지 자르고 닫기
+    for index, open_stack in reversed(commas):
+        closed = text[:index] + "".join(reversed(open_stack))
+        try:
+            _loads(closed)
+            return closed
+        except ValueError:
+            continue
+    return None
+
+
+def parse_tool_arguments(
+    text: Optional[str], truncated: bool = False
+) -> Tuple[Any, List[str]]:
+    """도구 인자 JSON을 파싱하고, 필요하면 복구합니다.
+
+    Args:
+        text: LLM이 보낸 인자 문자열 (비어 있으면 `{}`)
+        truncated: 응답이 출력 토큰 한도로 잘렸는지 여부 (괄호 닫기 허용)
+
+    Returns:
+        (파싱된 값, 적용한 복구 목록). 복구 없이 파싱되면 목록은 비어 있음
+
+    Raises:
+        json.JSONDecodeError: 복구 후에도 파싱할 수 없는 경우 (원래 오류)
+    """
+    if not text or not text.strip():
+        return {}, []
+    try:
+        return json.loads(text), []
+    except json.JSONDecodeError as error:
+        original_error = error
+
+    if len(text) > MAX_REPAIR_CHARS:
+        raise original_error
+
+    repairs: List[str] = []
+    candidate = text
+    try:
+        return _loads(candidate), [REPAIR_CONTROL_CHARS]
+    except ValueError:
+        pass
+
+    start, end = candidate.find("{"), candidate.rfind("}")
+    stripped = candidate.strip()
+    if start > 0 and (end > start or truncated) and not stripped.startswith("["):
+        candidate = candidate[start : end + 1 if end > start else None]
+        repairs.append(REPAIR_EXTRACTED)
+        try:
+            return _loads(candidate), repairs
+        except ValueError:
+            pass
+
+    candidate, changed = _strip_trailing_commas(candidate)
+    if changed:
+        repairs.append(REPAIR_TRAILING_COMMAS)
+        try:
+            return _loads(candidate), repairs
+        except ValueError:
+            pass
+
+    if truncated:
+        completed = _complete(candidate)
+        if completed is not None:
+            repairs.append(REPAIR_COMPLETED)
+            return _loads(completed), repairs
+
+    raise original_error
@@ -0,0 +1,304 @@
+"""
+JSON Schema Validator - 도구 인자 검증기
+========================================
+도구의 `parameters`(JSON Schema)를 한 번 컴파일해 검사 함수 트리로 만들고,
+LLM이 보낸 인자를 도구 실행 전에 검증합니다. 잘못된 인자가 도구 내부 깊은 곳에서
+실패하는 대신, 어떤 인자가 왜 잘못됐는지 정확한 오류를 바로 돌려줄 수 있습니다.
+
+외부 의존성(`jsonschema`) 없이 도구 스키마에서 쓰는 키워드만 지원합니다:
+- `type`(목록 포함), `enum`, `const`
+- 문자열: `minLength`, `maxLength`, `pattern`
+- 숫자: `minimum`, `maximum`, `exclusiveMinimum`, `exclusiveMaximum`
+- 배열: `items`, `minItems`, `maxItems`
+- 객체: `properties`, `required`, `additionalProperties`
+- `anyOf`/`oneOf`(둘 다 하나 이상 일치로 검사), `allOf`
+
+그 밖의 키워드(`$ref`, `format` 등)는 무시합니다. 검증은 확실히 잘못된 인자만 걸러내는 용도입니다.
+
+사용 예:
+    validate = compile_schema(tool.parameters)
+    errors = validate({"command": "veiw"})
+    # ["`command`: 'veiw' is not one of ['view', 'create', ...]", ...]
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+
+Check = Callable[[Any, str, List[str]], None]
+Validator = Callable[[Any], List[str]]
+
+MAX_ERRORS = 10
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+    # bool은 int의 하위 클래스이므로 제외
+    "integer": lambda value: not isinstance(value, bool)
+    and (
+        isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+    ),
+    "number": lambda value: not isinstance(value, bool)
+    and isinstance(value, (int, float)),
+}
+
+_JSON_TYPE_NAMES = {
+    dict: "object",
+    list: "array",
+    str: "string",
+    bool: "boolean",
+    int: "integer",
+    float: "number",
+    type(None): "null",
+}
+
+
+def _describe(value: Any) -> str:
+    """오류 메시지용 값 요약 (타입 + 짧은 repr)."""
+    kind = _JSON_TYPE_NAMES.get(type(value), type(value).__name__)
+    text = repr(value)
+    if len(text) > 40:
+        text = text[:37] + "..."
+    return f"{kind} {text}"
+
+
+def _label(path: str) -> str:
+    return f"`{path}`" if path else "arguments"
+
+
+def _child(path: str, key: Any) -> str:
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return f"{path}.{key}" if path else str(key)
+
+
+def _compile(schema: Any) -> Optional[Check]:
+    """스키마 하나를 검사 함수로 컴파일합니다. 검사할 것이 없으면 None."""
+    if not isinstance(schema, dict):
+        return None
+
+    checks: List[Check] = []
+
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else list(types)
+        known = [_TYPE_CHECKS[name] for name in names if name in _TYPE_CHECKS]
+        if known and len(known) == len(names):
+            expected = " or ".join(names)
+
+            def check_type(value, path, errors, known=known, expected=expected):
+                if not any(check(value) for check in known):
+                    errors.append(
+                        f"{_label(path)}: expected {expected}, got {_describe(value)}"
+                    )
+
+            checks.append(check_type)
+
+    if "enum" in schema:
+        options = list(schema["enum"])
+
+        def check_enum(value, path, errors, options=options):
+            if value not in options:
+                errors.append(f"{_label(path)}: {value!r} is not one of {options}")
+
+        checks.append(check_enum)
+
+    if "const" in schema:
+        const = schema["const"]
+
+        def check_const(value, path, errors, const=const):
+            if value != const:
+                errors.append(f"{_label(path)}: must be {const!r}")
+
+        checks.append(check_const)
+
+    checks.extend(_compile_string(schema))
+    checks.extend(_compile_number(schema))
+    checks.extend(_compile_array(schema))
+    checks.extend(_compile_object(schema))
+    checks.extend(_compile_combinators(schema))
+
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value, path, errors, checks=tuple(checks)):
+        for check in checks:
+            check(value, path, errors)
+
+    return check_all
+
+
+def _compile_string(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    if min_length is not None or max_length is not None:
+
+        def check_length(value, path, errors):
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                errors.append(f"{_label(path)}: must be at least {min_length} characters")
+            if max_length is not None and len(value) > max_length:
+                errors.append(f"{_label(path)}: must be at most {max_length} characters")
+
+        checks.append(check_length)
+
+    pattern = schema.get("pattern")
+    if isinstance(pattern, str):
+        try:
+            compiled = re.compile(pattern)
+        except re.error:
+            compiled = None
+        if compiled is not None:
+
+            def check_pattern(value, path, errors):
+                if isinstance(value, str) and not compiled.search(value):
+                    errors.append(f"{_label(path)}: does not match pattern {pattern!r}")
+
+            checks.append(check_pattern)
+    return checks
+
+
+def _compile_number(schema: Dict[str, Any]) -> List[Check]:
+    bounds = [
+        (schema.get("minimum"), lambda value, bound: value >= bound, ">="),
+        (schema.get("maximum"), lambda value, bound: value <= bound, "<="),
+        (schema.get("exclusiveMinimum"), lambda value, bound: value > bound, ">"),
+        (schema.get("exclusiveMaximum"), lambda value, bound: value < bound, "<"),
+    ]
+    # draft-04의 boolean exclusiveMinimum/Maximum은 지원하지 않음
+    bounds = [
+        (bound, test, symbol)
+        for bound, test, symbol in bounds
+        if isinstance(bound, (int, float)) and not isinstance(bound, bool)
+    ]
+    if not bounds:
+        return []
+
+    def check_bounds(value, path, errors):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return
+        for bound, test, symbol in bounds:
+            if not test(value, bound):
+                errors.append(f"{_label(path)}: must be {symbol} {bound}, got {value}")
+
+    return [check_bounds]
+
+
+def _compile_array(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    item_check = _compile(schema.get("items"))
+    if item_check is not None:
+
+        def check_items(value, path, errors):
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    item_check(item, _child(path, index), errors)
+
+        checks.append(check_items)
+
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+    if min_items is not None or max_items is not None:
+
+        def check_size(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{_label(path)}: must have at least {min_items} items")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{_label(path)}: must have at most {max_items} items")
+
+        checks.append(check_size)
+    return checks
+
+
+def _compile_object(schema: Dict[str, Any]) -> List[Check]:
+    properties = schema.get("properties") or {}
+    property_checks = {
+        name: check
+        for name, check in (
+            (name, _compile(subschema)) for name, subschema in properties.items()
+        )
+        if check is not None
+    }
+    required = list(schema.get("required") or [])
+    additional = schema.get("additionalProperties", True)
+    additional_check = _compile(additional) if isinstance(additional, dict) else None
+    if not property_checks and not required and additional is True:
+        return []
+
+    def check_object(value, path, errors):
+        if not isinstance(value, dict):
+            return
+        for name in required:
+            if name not in value:
+                where = f" in {_label(path)}" if path else ""
+                errors.append(f"missing required argument `{name}`{where}")
+        for name, item in value.items():
+            check = property_checks.get(name)
+            if check is not None:
+                check(item, _child(path, name), errors)
+            elif name not in properties:
+                if additional is False:
+                    errors.append(
+                        f"{_label(_child(path, name))}: unexpected argument "
+                        f"(expected one of {sorted(properties)})"
+                    )
+                elif additional_check is not None:
+                    additional_check(item, _child(path, name), errors)
+
+    return [check_object]
+
+
+def _compile_combinators(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    for keyword in ("anyOf", "oneOf"):
+        options = [_compile(option) for option in schema.get(keyword) or []]
+        if not options or any(option is None for option in options):
+            # 제약 없는 선택지가 있으면 항상 통과
+            continue
+
+        def check_any(value, path, errors, options=options):
+            option_errors: List[str] = []
+            for option in options:
+                attempt: List[str] = []
+                option(value, path, attempt)
+                if not attempt:
+                    return
+                option_errors = option_errors or attempt
+            errors.append(
+                f"{_label(path)}: does not match any allowed schema "
+                f"(first mismatch: {option_errors[0]})"
+            )
+
+        checks.append(check_any)
+
+    for option in schema.get("allOf") or []:
+        check = _compile(option)
+        if check is not None:
+            checks.append(check)
+    return checks
+
+
+def compile_schema(schema: Optional[Dict[str, Any]]) -> Validator:
+    """도구 인자 스키마를 검증 함수로 컴파일합니다.
+
+    반환된 함수는 인자(dict)를 받아 오류 메시지 목록(유효하면 빈 목록)을 돌려줍니다.
+    """
+    check = _compile(schema)
+
+    def validate(arguments: Any) -> List[str]:
+        if check is None:
+            return []
+        errors: List[str] = []
+        check(arguments, "", errors)
+        return errors[:MAX_ERRORS]
+
+    return validate
@@ -0,0 +1,204 @@
+"""
+Observation Compressor - 도구 출력 압축
+=======================================
+도구 출력이 거의 그대로 메모리에 들어가면 진행 표시줄, ANSI 코드, 반복 줄,
+들여쓰기된 JSON 때문에 같은 정보에 더 많은 토큰을 쓰게 됩니다.
+메모리에 넣기 전에 토큰을 줄이는 후처리를 적용합니다.
+
+처리 순서:
+1. ANSI 이스케이프 시퀀스 제거
+2. 캐리지 리턴(`\\r`) 진행 표시 갱신은 마지막 상태만 유지
+3. (선택, 기본 꺼짐) 연속된 동일한 줄은 한 줄과 반복 횟수로 압축 (run-length encoding)
+4. (선택, 기본 꺼짐) 출력 전체가 JSON이면 공백 없이 다시 직렬화
+   (중복 키와 숫자 표기가 바뀔 수 있음)
+5. 상한(토큰 `max_tokens`, 문자 `max_observe`)을 넘으면 에이전트가 blob 저장소로 옮기고,
+   읽어올 방법이 없으면 줄 경계 기준으로 앞/뒤를 남기고 가운데를 생략 (`truncate`)
+
+설정 (config.toml):
+    [observation]
+    max_tokens = 4000
+    repeat_threshold = 3
+"""
+
+import json
+import re
+from typing import Callable, List, Optional
+
+from app.config import ObservationSettings, config
+
+
+_ANSI_PATTERN = re.compile(
+    r"\x1b\[[0-?]*[ -/]*[@-~]"  # CSI (색상, 커서 이동)
+    r"|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)"  # OSC (창 제목, 하이퍼링크)
+    r"|\x1b[@-Z\\-_]"  # 2바이트 시퀀스
+)
+
+
+def strip_ansi(text: str) -> str:
+    return _ANSI_PATTERN.sub("", text)
+
+
+def collapse_progress(text: str) -> str:
+    """`\\r`로 덮어쓰는 진행 표시 줄은 터미널처럼 마지막으로 보이는 상태만 남깁니다."""
+    if "\r" not in text:
+        return text
+    lines = []
+    for line in text.replace("\r\n", "\n").split("\n"):
+        if "\r" in line:
+            segments = [segment for segment in line.split("\r") if segment.strip()]
+            line = segments[-1] if segments else ""
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def collapse_repeats(text: str, threshold: int = 3) -> str:
+    """연속으로 `threshold`번 이상 반복되는 줄을 한 줄과 반복 횟수로 바꿉니다."""
+    lines = text.split("\n")
+    if len(lines) < threshold:
+        return text
+
+    collapsed: List[str] = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        run = 1
+        while index + run < len(lines) and lines[index + run] == line:
+            run += 1
+        if run >= threshold and line.strip():
+            collapsed.append(line)
+            collapsed.append(f"[previous line repeated {run - 1} more times]")
+        else:
+            collapsed.extend([line] * run)
+        index += run
+    return "\n".join(collapsed)
+
+
+def minify_json(text: str) -> str:
+    """출력 전체가 JSON 객체/배열이면 공백 없이 다시 직렬화합니다."""
+    stripped = text.strip()
+    if not stripped or stripped[0] not in "{[" or stripped[-1] not in "}]":
+        return text
+    try:
+        data = json.loads(stripped)
+    except ValueError:
+        return text
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def truncate_head_tail(
+    text: str,
+    limit: int,
+    measure: Callable[[str], int] = len,
+    head_ratio: float = 0.7,
+) -> str:
+    """`measure` 기준(문자 수 또는 토큰 수)으로 `limit` 이하가 되도록 가운데를 생략합니다.
+
+    줄 경계에서 자르며, 한 줄이 너무 길어 줄 단위로 담을 수 없으면 문자 단위로 자릅니다.
+    """
+    total = measure(text)
+    if total <= limit:
+        return text
+
+    lines = text.split("\n")
+    head_budget = int(limit * head_ratio)
+    tail_budget = limit - head_budget
+
+    head: List[str] = []
+    head_used = 0
+    for line in lines:
+        cost = measure(line) + 1
+        if head_used + cost > head_budget:
+            break
+        head.append(line)
+        head_used += cost
+
+    tail: List[str] = []
+    tail_used = 0
+    for line in reversed(lines[len(head) :]):
+        cost = measure(line) + 1
+        if tail_used + cost > tail_budget:
+            break
+        tail.append(line)
+        tail_used += cost
+    tail.reverse()
+
+    if head_used + tail_used < limit // 2:
+        # 아주 긴 줄 때문에 줄 단위로는 예산을 거의 못 쓰는 경우: 평균 밀도로 문자 위치 추정
+        chars_per_unit = len(text) / max(total, 1)
+        head_text = text[: int(head_budget * chars_per_unit)]
+        tail_chars = int(tail_budget * chars_per_unit)
+        tail_text = text[-tail_chars:] if tail_chars > 0 else ""
+        omitted = len(text) - len(head_text) - len(tail_text)
+        return f"{head_text}\n... [{omitted} chars omitted] ...\n{tail_text}"
+
+    omitted_lines = lines[len(head) : len(lines) - len(tail)]
+    omitted_chars = sum(len(line) + 1 for line in omitted_lines)
+    notice = (
+        f"... [{len(omitted_lines)} lines / {omitted_chars} chars omitted "
+        f"from the middle of the output] ..."
+    )
+    return "\n".join(head + [notice] + tail)
+
+
+class ObservationCompressor:
+    """설정에 따라 도구 출력에 압축 단계를 적용합니다.
+
+    Args:
+        settings: 압축 설정 (기본값: `config.observation_config`)
+    """
+
+    def __init__(self, settings: Optional[ObservationSettings] = None):
+        self.settings = settings or config.observation_config
+
+    def compress(self, text: str, verbatim: bool = False) -> str:
+        """설정된 압축 단계(1~4)를 적용한 출력을 반환합니다.
+
+        `verbatim`이면(파일 내용, 셸 출력 등 `BaseTool.verbatim_output`) 원문을
+        바꾸는 3~4단계는 건너뜁니다. 에이전트가 이 출력을 `str_replace`의
+        `old_str` 등에 그대로 옮겨 쓰기 때문입니다.
+        """
+        settings = self.settings
+        if not settings.enabled or not text:
+            return text
+
+        if settings.strip_ansi and "\x1b" in text:
+            text = strip_ansi(text)
+        if settings.collapse_progress:
+            text = collapse_progress(text)
+        if verbatim:
+            return text
+        if settings.collapse_repeats:
+            text = collapse_repeats(text, settings.repeat_threshold)
+        if settings.minify_json:
+            text = minify_json(text)
+        return text
+
+    def exceeds_limit(
+        self,
+        text: str,
+        max_chars: Optional[int],
+        count_tokens: Callable[[str], int],
+    ) -> bool:
+        if max_chars and len(text) > max_chars:
+            return True
+        max_tokens = self.settings.max_tokens
+        # 토큰 수는 UTF-8 바이트 수(문자당 최대 4)를 넘지 않으므로 짧은 출력은 토큰화하지 않음
+        return bool(max_tokens) and len(text) * 4 > max_tokens and (
+            count_tokens(text) > max_tokens
+        )
+
+    def truncate(
+        self,
+        text: str,
+        max_chars: Optional[int],
+        count_tokens: Callable[[str], int],
+    ) -> str:
+        """토큰 상한과 문자 상한 안으로 앞/뒤를 남기고 가운데를 생략합니다."""
+        head_ratio = self.settings.head_ratio
+        if self.settings.max_tokens:
+            text = truncate_head_tail(
+                text, self.settings.max_tokens, count_tokens, head_ratio
+            )
+        if max_chars:
+            text = truncate_head_tail(text, max_chars, len, head_ratio)
+        return text
@@ -1,10 +1,15 @@
 import argparse
 import asyncio
 import sys
+from pathlib import Path
 
 from app.agent.manus import Manus
+from app.agent.pool import AgentPool
+from app.agent.run_checkpoint import RunCheckpointLog
+from app.batch import BatchRunner
 from app.config import config
 from app.logger import logger
+from app.replay import record_run
 
 
 async def main():
@@ -16,24 +21,154 @@ async def main():
     parser.add_argument(
         "--project", type=str, required=False, default="default", help="Project name (creates a separate folder)"
     )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        required=False,
+        metavar="RUN_ID",
+        help="Resume an interrupted run from its last completed step",
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        required=False,
+        metavar="JSONL",
+        help="Run every request in a JSONL file (request_id + prompt or title/body)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of batch requests running at once",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        required=False,
+        help="Batch results JSONL (default: <batch>.results.jsonl)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        required=False,
+        help="Per-request timeout in seconds for batch mode",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        required=False,
+        metavar="TRACE",
+        help="Record every LLM and tool call to a trace file (replay with `python -m app.replay TRACE`)",
+    )
+    parser.add_argument(
+        "--no-pool",
+        action="store_true",
+        help="Create a fresh agent per batch request instead of reusing warm agents",
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        required=False,
+        help="Wall-clock budget per run (overrides [budget] max_seconds)",
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        required=False,
+        help="Total token budget per run (overrides [budget] max_tokens)",
+    )
+    parser.add_argument(
+        "--max-cost",
+        type=float,
+        required=False,
+        help="Cost budget per run (overrides [budget] max_cost)",
+    )
     args = parser.parse_args()
 
-    # 워크스페이스 설정
-    project_dir = config.workspace_root / "projects" / args.project
+    # 에이전트 생성 전에 적용해야 새 에이전트의 기본 예산에 반영됨
+    for limit in ("max_seconds", "max_tokens", "max_cost"):
+        if getattr(args, limit) is not None:
+            setattr(config.budget_config, limit, getattr(args, limit))
+
+    if args.batch:
+        batch_path = Path(args.batch)
+        # 워커마다 MCP 연결이 유지된 에이전트 하나씩 재사용
+        pool = None if args.no_pool else AgentPool(Manus.create, size=args.concurrency)
+        runner = BatchRunner(
+            input_path=batch_path,
+            output_path=(
+                Path(args.output)
+                if args.output
+                else batch_path.with_suffix(".results.jsonl")
+            ),
+            agent_factory=Manus.create,
+            concurrency=args.concurrency,
+            timeout=args.timeout,
+            # 요청마다 projects/<project>/<request_id> 하위 디렉토리 사용
+            workspace_root=config.workspace_root / "projects" / args.project,
+            pool=pool,
+        )
+        try:
+            await runner.run()
+        finally:
+            if pool:
+                await pool.close()
+        return
+
+    snapshot = None
+    checkpoint_log = None
+    if args.resume:
+        try:
+            checkpoint_log = RunCheckpointLog.open(args.resume)
+            snapshot = checkpoint_log.load()
+        except FileNotFoundError as e:
+            logger.error(str(e))
+            return
+        if snapshot is None:
+            logger.error(f"Checkpoint log for run {args.resume} is empty.")
+            return
+        if snapshot["finished"]:
+            logger.info(f"Run {args.resume} already completed.")
+            return
+        # 중단된 실행의 워크스페이스를 그대로 사용
+        project_dir = Path(snapshot["meta"]["workspace_root"])
+    else:
+        # 워크스페이스 설정
+        project_dir = config.workspace_root / "projects" / args.project
+        if config.checkpoint_config.enabled:
+            checkpoint_log = RunCheckpointLog()
     config.set_workspace_root(project_dir)
     logger.info(f"Target workspace: {project_dir}")
 
     # Create and initialize Manus agent
-    agent = await Manus.create()
+    agent = await Manus.create(checkpoint_log=checkpoint_log)
     try:
+        if snapshot is not None:
+            checkpoint_log.resume(agent)
+            logger.info("Resuming your request...")
+            await agent.run()
+            logger.info("Request processing completed.")
+            return
+
         # Use command line prompt if provided, otherwise ask for input
         prompt = args.prompt if args.prompt else input("Enter your prompt: ")
         if not prompt.strip():
             logger.warning("Empty prompt provided.")
             return
 
+        if checkpoint_log:
+            checkpoint_log.write_meta(agent, prompt=prompt)
+            logger.info(
+                f"Run ID: {checkpoint_log.run_id} (resume with --resume {checkpoint_log.run_id})"
+            )
+
         logger.info("Processing your request...")
-        await agent.run(prompt)
+        if args.record:
+            with record_run(args.record, prompt=prompt, agent=agent):
+                await agent.run(prompt)
+            logger.info(f"Run recorded to {args.record}")
+        else:
+            await agent.run(prompt)
         logger.info("Request processing completed.")
     except KeyboardInterrupt:
         logger.warning("Operation interrupted.")
@@ -5,11 +5,15 @@ Manus 에이전트의 인터랙티브 모드 실행 엔트리 포인트.
 AI 기반 설계 에이전트로 "AI-Ready Context Package"를 생성합니다.
 """
 
+import argparse
 import asyncio
 import sys
 from enum import Enum
+from pathlib import Path
+from typing import Optional
 
 from app.agent.interactive_agent import InteractiveAgent
+from app.agent.run_checkpoint import RunCheckpointLog
 from app.config import config
 from app.logger import logger
 from app.utils.git_utils import clone_repo, get_repo_name, is_git_installed
@@ -24,15 +28,9 @@ class ProjectSource(Enum):
     NEW = "new"
     GITHUB = "github"
 
-async def run_interactive():
-    """Manus 에이전트를 인터랙티브 모드로 실행합니다."""
-    
-    print("\n" + "=" * 60)
-    print("(*) Manus Interactive CLI")
-    print("=" * 60)
-    print("\n웹 AI 빌더(v0, Bolt, ChatGPT 등)에 최적화된")
-    print("코드 패키지를 생성하는 AI 설계자입니다.\n")
-    
+def setup_project() -> tuple[Path, ProjectSource, str]:
+    """프로젝트 설정 마법사를 실행하고 (작업 디렉토리, 소스, 초기 컨텍스트)를 반환합니다."""
+
     # 1. 프로젝트 기본 정보
     print("-" * 60)
     print("(*) 프로젝트 설정")
@@ -109,19 +107,79 @@ async def run_interactive():
     else:
         context_message = f"나는 새로운 {project_type.value} 프로젝트를 만들고 싶어."
 
+    return project_dir, source, context_message
+
+
+async def run_interactive(resume_run_id: Optional[str] = None):
+    """Manus 에이전트를 인터랙티브 모드로 실행합니다.
+
+    Args:
+        resume_run_id: 중단된 실행을 이어서 진행할 실행 ID
+    """
+
+    print("\n" + "=" * 60)
+    print("(*) Manus Interactive CLI")
+    print("=" * 60)
+    print("\n웹 AI 빌더(v0, Bolt, ChatGPT 등)에 최적화된")
+    print("코드 패키지를 생성하는 AI 설계자입니다.\n")
+
+    snapshot = None
+    checkpoint_log = None
+    if resume_run_id:
+        try:
+            checkpoint_log = RunCheckpointLog.open(resume_run_id)
+            snapshot = checkpoint_log.load()
+        except FileNotFoundError as e:
+            print(f"[Fail] {e}")
+            return
+        if snapshot is None:
+            print(f"[Fail] 실행 {resume_run_id}의 체크포인트가 비어 있습니다.")
+            return
+
+        # 중단된 실행의 작업 디렉토리와 설정을 그대로 사용
+        meta = snapshot["meta"]
+        project_dir = Path(meta["workspace_root"])
+        source = ProjectSource(meta.get("source", ProjectSource.NEW.value))
+        context_message = ""
+        config.set_workspace_root(project_dir)
+        print(f"[Resume] 실행 {resume_run_id}을(를) 스텝 {snapshot['step']}부터 이어갑니다.")
+        print(f"[Dir] 작업 디렉토리: {project_dir}")
+        print("-" * 60 + "\n")
+    else:
+        project_dir, source, context_message = setup_project()
+        if config.checkpoint_config.enabled:
+            checkpoint_log = RunCheckpointLog()
+
     print("프로젝트 아이디어를 입력하면 완벽한 설계도를 만들어드립니다.")
     print("종료하려면 'exit' 또는 'quit'을 입력하세요.\n")
     print("-" * 60 + "\n")
     
-    agent = await InteractiveAgent.create()
+    agent = await InteractiveAgent.create(checkpoint_log=checkpoint_log)
     
     # 초기 컨텍스트 주입 (선택 사항: 자동 실행을 위해)
     # 여기서는 사용자에게 첫 입력을 맡길지, 자동으로 "분석해줘"를 날릴지 결정해야 함.
     # 사용자가 아이디어를 입력하게 하되, 시스템적으로 컨텍스트를 주입하는게 자연스러움.
     
-    first_turn = True
+    first_turn = snapshot is None
     
     try:
+        if snapshot is not None:
+            checkpoint_log.resume(agent)
+            if not snapshot["finished"] and snapshot["step"]:
+                # 처리 도중 중단된 요청을 마지막으로 완료된 스텝부터 이어서 실행
+                print("\n[Processing] 중단된 요청을 이어서 처리하고 있습니다...\n")
+                result = await agent.run()
+                print("\n" + "=" * 60)
+                print("[OK] Manus 출력")
+                print("=" * 60)
+                print(result if result else "작업이 완료되었습니다!")
+                print("\n" + "-" * 60 + "\n")
+        elif checkpoint_log:
+            checkpoint_log.write_meta(
+                agent, project_dir=str(project_dir), source=source.value
+            )
+            print(f"[Run] 실행 ID: {checkpoint_log.run_id} (이어서 실행: --resume {checkpoint_log.run_id})\n")
+
         while True:
             try:
                 if first_turn and source == ProjectSource.GITHUB:
@@ -169,8 +227,18 @@ async def run_interactive():
 
 def main():
     """메인 엔트리 포인트."""
+    parser = argparse.ArgumentParser(description="Run Manus interactive CLI")
+    parser.add_argument(
+        "--resume",
+        type=str,
+        required=False,
+        metavar="RUN_ID",
+        help="Resume an interrupted session from its last completed step",
+    )
+    args = parser.parse_args()
+
     try:
-        asyncio.run(run_interactive())
+        asyncio.run(run_interactive(args.resume))
     except KeyboardInterrupt:
         print("\n\n[Bye] 안녕히 가세요!")
         sys.exit(0)